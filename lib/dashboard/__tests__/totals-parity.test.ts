@@ -0,0 +1,221 @@
+/**
+ * @jest-environment node
+ *
+ * Parity of the converters' precomputed "totals" section (scripts/finance_import/totals.py)
+ * with the dashboard's own calculations: every number must be exactly equal.
+ */
+
+import { execFileSync, spawnSync } from "child_process";
+import { mkdtempSync, rmSync, writeFileSync } from "fs";
+import { tmpdir } from "os";
+import { join } from "path";
+import {
+  buildChartData,
+  buildCurrentData,
+  buildDataForPeriod,
+  buildRecordByMonth,
+} from "../dashboard-data";
+import {
+  calculateBillsTotal,
+  calculateExpensesTotal,
+  calculateIncomeTotal,
+  calculateInvestmentsTotal,
+  calculateNetCashflow,
+  calculateProfitLoss,
+  sumCategoryAmounts,
+} from "@/lib/calculations/calculations";
+import { createDefaultCategoryAmounts } from "@/lib/validation/schemas";
+import type {
+  CategoryAmounts,
+  MonthRecord,
+  MonthString,
+  PersonView,
+  Profile,
+} from "@/lib/types";
+
+type Fields = Record<string, number>;
+interface Totals {
+  profiles: string[];
+  months: Record<string, Record<string, Fields>>;
+  years: Record<string, Record<string, Fields>>;
+  rolling: Record<string, Record<string, Record<string, Fields>>>;
+}
+
+const PYTHON = process.env.PYTHON ?? "python3";
+const SCRIPT = join(__dirname, "../../../scripts/finance-totals.py");
+const hasPython = spawnSync(PYTHON, ["--version"]).status === 0;
+
+const PROFILES: Profile[] = [
+  { id: "wife", name: "Codru" },
+  { id: "me", name: "Paul" },
+];
+const KEYS = Object.keys(createDefaultCategoryAmounts()) as (keyof CategoryAmounts)[];
+
+// Deterministic amounts with awkward decimals, so summation order matters
+function makeRandom(seed: number): () => number {
+  let state = seed;
+  return () => {
+    state = (state * 16807) % 2147483647;
+    return state / 2147483647;
+  };
+}
+
+function makeRecords(): MonthRecord[] {
+  const random = makeRandom(16);
+  const records: MonthRecord[] = [];
+  for (const year of [2024, 2025]) {
+    for (let m = 1; m <= 12; m++) {
+      if (random() < 0.15) continue;
+      const people: MonthRecord["people"] = {};
+      for (const id of ["me", "wife", "guest"]) {
+        if (random() < 0.2) continue;
+        const amounts = createDefaultCategoryAmounts();
+        for (const key of KEYS) {
+          const scale = [1, 10, 1000, 100000][Math.floor(random() * 4)];
+          amounts[key] = Number((random() * scale).toFixed(Math.floor(random() * 4)));
+        }
+        people[id] = amounts;
+      }
+      records.push({
+        month: `${year}-${String(m).padStart(2, "0")}` as MonthString,
+        people,
+        meta: { updatedAt: "2026-01-01T00:00:00.000Z", isSaved: false },
+      });
+    }
+  }
+  return records;
+}
+
+function runTotals(records: MonthRecord[]): Totals {
+  const dir = mkdtempSync(join(tmpdir(), "totals-parity-"));
+  try {
+    const path = join(dir, "backup.json");
+    writeFileSync(path, JSON.stringify({ version: 3, data: records, profiles: PROFILES }));
+    return JSON.parse(execFileSync(PYTHON, [SCRIPT, path], { encoding: "utf-8" }));
+  } finally {
+    rmSync(dir, { recursive: true, force: true });
+  }
+}
+
+const describeIfPython = hasPython ? describe : describe.skip;
+
+describeIfPython("precomputed totals match the dashboard calculations", () => {
+  const records = makeRecords();
+  const recordByMonth = buildRecordByMonth(records);
+  // As finance-store getCombinedData
+  const getCombinedData = (month: MonthString): CategoryAmounts | null => {
+    const record = recordByMonth.get(month);
+    if (!record) return null;
+    const items = PROFILES.map((p) => record.people[p.id]).filter(
+      (d): d is CategoryAmounts => d != null
+    );
+    return items.length === 0 ? null : sumCategoryAmounts(items);
+  };
+  const views: PersonView[] = ["me", "wife", "guest", "combined"];
+  const dataFor = (month: MonthString, view: PersonView): CategoryAmounts | null =>
+    view === "combined"
+      ? getCombinedData(month)
+      : (recordByMonth.get(month)?.people[view] ?? null);
+  let totals: Totals;
+
+  beforeAll(() => {
+    totals = runTotals(records);
+  });
+
+  it("lists the profiles in combined order", () => {
+    expect(totals.profiles).toEqual(["wife", "me"]);
+  });
+
+  it("matches buildChartData for every month and view", () => {
+    let checked = 0;
+    for (const year of [2024, 2025]) {
+      for (const view of views) {
+        const withInvestments = buildChartData(recordByMonth, year, view, getCombinedData, true);
+        const beforeInvestments = buildChartData(recordByMonth, year, view, getCombinedData, false);
+        withInvestments.forEach((point, i) => {
+          const d = dataFor(point.monthStr, view);
+          const fields = totals.months[point.monthStr]?.[view];
+          if (!d) {
+            expect(fields).toBeUndefined();
+            return;
+          }
+          expect(fields).toEqual({
+            income: point.income,
+            bills: point.bills,
+            expenses: point.expenses,
+            restExpenses: point.restExpenses,
+            economii: point.economii,
+            investitii: point.investitii,
+            investments: point.investments,
+            profitLoss: beforeInvestments[i].cashflow,
+            cashflow: point.cashflow,
+            total: point.total,
+            savingsRate: point.savingsRate,
+          });
+          expect(fields.profitLoss).toBe(calculateProfitLoss(d));
+          expect(fields.investments).toBe(calculateInvestmentsTotal(d));
+          checked++;
+        });
+      }
+    }
+    expect(checked).toBeGreaterThan(50);
+  });
+
+  it("matches buildCurrentData for every year and view", () => {
+    for (const year of [2024, 2025]) {
+      for (const view of views) {
+        const current = buildCurrentData(recordByMonth, year, view, getCombinedData, true);
+        const fields = totals.years[String(year)]?.[view];
+        if (!current) {
+          expect(fields).toBeUndefined();
+          continue;
+        }
+        const period = buildDataForPeriod(recordByMonth, year, view, getCombinedData)!;
+        const before = buildCurrentData(recordByMonth, year, view, getCombinedData, false)!;
+        expect(fields).toEqual({
+          months: records.filter(
+            (r) => r.month.startsWith(`${year}-`) && dataFor(r.month, view)
+          ).length,
+          income: current.income,
+          bills: current.bills,
+          expenses: current.expenses,
+          investments: calculateInvestmentsTotal(period),
+          profitLoss: before.cashflow,
+          cashflow: current.cashflow,
+        });
+      }
+    }
+  });
+
+  it("matches sumCategoryAmounts over each trailing window", () => {
+    for (const window of ["3", "12"]) {
+      for (const record of records) {
+        const [y, m] = record.month.split("-").map(Number);
+        for (const view of views) {
+          const fields = totals.rolling[window][record.month]?.[view];
+          if (!dataFor(record.month, view)) {
+            expect(fields).toBeUndefined();
+            continue;
+          }
+          const datas: CategoryAmounts[] = [];
+          for (let k = Number(window) - 1; k >= 0; k--) {
+            const index = y * 12 + (m - 1) - k;
+            const month = `${Math.floor(index / 12)}-${String((index % 12) + 1).padStart(2, "0")}` as MonthString;
+            const d = dataFor(month, view);
+            if (d) datas.push(d);
+          }
+          const sum = sumCategoryAmounts(datas);
+          expect(fields).toEqual({
+            months: datas.length,
+            income: calculateIncomeTotal(sum),
+            bills: calculateBillsTotal(sum),
+            expenses: calculateExpensesTotal(sum),
+            investments: calculateInvestmentsTotal(sum),
+            profitLoss: calculateNetCashflow(sum, false),
+            cashflow: calculateNetCashflow(sum, true),
+          });
+        }
+      }
+    }
+  });
+});
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark the import converters on generated inputs.
+
+Usage:
+  python scripts/bench-converters.py
+  python scripts/bench-converters.py --sizes 1k,100k --formats table,tsv
+  python scripts/bench-converters.py --update-baseline
+
+For every format (table / strategy CSV for csv-to-finance-import.py, only-1 style CSV and
+two-header TSV for tsv-to-finance-json.py) and size, a deterministic input is generated once
+into --data-dir and parsed through the script's parsing entry point. Rows/sec and peak
+tracemalloc memory are printed and compared with the stored baseline
+(finance_import/bench/baseline.json), as is a digest of the converted months and amounts;
+the run exits with status 1 on a regression or a changed output.
+
+Baselines are machine-specific: run with --update-baseline on the machine that checks them.
+"""
+
+import argparse
+import json
+import tempfile
+from pathlib import Path
+
+from finance_import.bench.generators import GENERATORS, SIZES
+from finance_import.bench.harness import (
+    MEMORY_TOLERANCE,
+    SPEED_TOLERANCE,
+    Result,
+    load_baseline,
+    regressions,
+    run,
+    save_baseline,
+)
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+DEFAULT_BASELINE = SCRIPTS_DIR / "finance_import" / "bench" / "baseline.json"
+
+
+def parse_sizes(value: str) -> list[int]:
+    sizes = []
+    for part in value.split(","):
+        part = part.strip()
+        if part in SIZES:
+            sizes.append(SIZES[part])
+        elif part.isdigit():
+            sizes.append(int(part))
+        else:
+            raise argparse.ArgumentTypeError(f"Unknown size {part!r} (use {', '.join(SIZES)} or a row count)")
+    return sizes
+
+
+def parse_formats(value: str) -> list[str]:
+    formats = [f.strip() for f in value.split(",") if f.strip()]
+    unknown = [f for f in formats if f not in GENERATORS]
+    if unknown:
+        raise argparse.ArgumentTypeError(f"Unknown format(s) {', '.join(unknown)} (use {', '.join(GENERATORS)})")
+    return formats
+
+
+def print_result(r: Result) -> None:
+    print(
+        f"{r.fmt:>9} {r.rows:>9,} rows  {r.seconds:8.3f}s  {r.rows_per_sec:>12,.0f} rows/s  "
+        f"peak {r.peak_bytes / 1024 / 1024:8.1f} MiB  {r.months:>7,} months  {r.digest[:12]}",
+        flush=True,
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the CSV/TSV converters.")
+    parser.add_argument(
+        "--formats",
+        type=parse_formats,
+        default=list(GENERATORS),
+        help=f"Comma-separated formats (default: {','.join(GENERATORS)})",
+    )
+    parser.add_argument(
+        "--sizes",
+        type=parse_sizes,
+        default=list(SIZES.values()),
+        help=f"Comma-separated row counts or {', '.join(SIZES)} (default: all)",
+    )
+    parser.add_argument(
+        "--data-dir",
+        default=Path(tempfile.gettempdir()) / "m-finance-bench",
+        help="Where generated inputs are kept between runs (default: <tmp>/m-finance-bench)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed (default: 0)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timed runs per input; the best counts (default: 3)")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON path")
+    parser.add_argument("--update-baseline", action="store_true", help="Store these results as the baseline")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=SPEED_TOLERANCE,
+        help=f"Allowed rows/sec drop as a fraction (default: {SPEED_TOLERANCE})",
+    )
+    parser.add_argument(
+        "--memory-tolerance",
+        type=float,
+        default=MEMORY_TOLERANCE,
+        help=f"Allowed peak memory growth as a fraction (default: {MEMORY_TOLERANCE})",
+    )
+    parser.add_argument("--json", metavar="PATH", help="Also write the results as JSON")
+    args = parser.parse_args()
+
+    baseline_path = Path(args.baseline)
+    results = run(SCRIPTS_DIR, args.formats, args.sizes, Path(args.data_dir), args.repeat, args.seed, print_result)
+
+    if args.json:
+        Path(args.json).write_text(json.dumps([r._asdict() for r in results], indent=2) + "\n", encoding="utf-8")
+
+    baseline = load_baseline(baseline_path)
+    if args.update_baseline:
+        save_baseline(baseline_path, results, baseline)
+        print(f"Baseline updated: {baseline_path}")
+        return
+    if not baseline:
+        print(f"No baseline at {baseline_path} (run with --update-baseline to create one)")
+        return
+    problems = regressions(results, baseline, args.tolerance, args.memory_tolerance)
+    if problems:
+        print(f"{len(problems)} regression(s) against {baseline_path.name}:")
+        for problem in problems:
+            print(f"  {problem}")
+        raise SystemExit(1)
+    print(f"No regressions against {baseline_path.name}")
+
+
+if __name__ == "__main__":
+    main()
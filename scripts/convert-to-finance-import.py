@@ -0,0 +1,387 @@
+#!/usr/bin/env python3
+"""
+Convert any supported budget export to m-finance-dash backup JSON, detecting the format.
+
+Usage:
+  python scripts/convert-to-finance-import.py data/buget2025-strategie26.csv
+  python scripts/convert-to-finance-import.py data/buget-lunar.tsv data/finance-import.json --year 2025
+  python scripts/convert-to-finance-import.py "data/exports/*" data/finance-import.json
+  python scripts/convert-to-finance-import.py data/buget.xlsx --sheet Strategie --sheet Lunar
+  python scripts/convert-to-finance-import.py data --serve
+
+The input is opened once; its delimiter and format (table, strategy, simple or tsv, see
+finance_import.formats) are sniffed from a bounded prefix and the rows are handed to the
+parser that csv-to-finance-import.py or tsv-to-finance-json.py registered for that format,
+on the same read pass. A directory or glob may mix formats; files are parsed in parallel
+and merged by month and profile: rows of simple/tsv files for a month and profile that
+another file already has are combined by the --persons duplicates policy (default: summed),
+as tsv-to-finance-json.py does, and table/strategy files override by month, the later file
+winning, as csv-to-finance-import.py does.
+
+.xlsx workbooks are read directly, without a CSV export (see finance_import.xlsx): each
+sheet is sniffed and parsed like a file, and the sheets are merged like batch files. --sheet NAME (repeatable) picks sheets; empty sheets are skipped.
+
+Output options match the per-format scripts (--merge-into, --compact, --gzip,
+--shard-by-year, --totals, --validate, --columns, --stats). There is no sidecar cache here:
+use the per-format script for incremental reruns of one large file.
+
+--serve keeps running instead: it watches the input directory, re-converts only the files
+that change and serves the merged backup (and one backup per year) on localhost with ETags,
+so unchanged data costs a 304 (see finance_import.serve). The output path is not written.
+"""
+
+import argparse
+import time
+from datetime import datetime, timezone
+from functools import partial
+from pathlib import Path
+from typing import Iterable
+
+from finance_import.backup import DEFAULT_PROFILES, people_ids, used_profiles
+from finance_import.batch import expand_inputs, is_batch_input, merge_by_month, print_timings, run_batch
+from finance_import.cli import add_output_args, new_stats, report_stats, write_output
+from finance_import.formats import (
+    PERSON_FORMATS,
+    EmptyInputError,
+    ParseOptions,
+    closing_iter,
+    input_sheets,
+    load_script,
+    open_input,
+    parser_for,
+)
+from finance_import.line_items import LineItemClassifier, load_rules
+from finance_import.months import year_from_path
+from finance_import.persons import DEFAULT_PERSONS, PersonMap, group_people, load_persons
+from finance_import.records import MonthRecord
+from finance_import.serve import DEFAULT_HOST, DEFAULT_INTERVAL, DEFAULT_PORT, ServeState, serve
+from finance_import.stats import Stats, stage, timed
+from finance_import.writer import output_target
+from finance_import.xlsx import WORKBOOK_SUFFIXES
+
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# Importing the converters registers their parsers (also in spawned worker processes)
+CSV_SCRIPT = load_script(SCRIPTS_DIR / "csv-to-finance-import.py")
+TSV_SCRIPT = load_script(SCRIPTS_DIR / "tsv-to-finance-json.py")
+
+INPUT_SUFFIXES = (".csv", ".tsv", ".txt", *WORKBOOK_SUFFIXES)
+
+
+def convert_path(
+    input_path: Path,
+    year: int | None = None,
+    line_items: LineItemClassifier | None = None,
+    stats: Stats | None = None,
+    ambiguous: list[tuple[int, str, str]] | None = None,
+    sorted_input: bool = False,
+    workers: int | None = 1,
+    memory_budget: int | None = None,
+    persons: PersonMap | None = None,
+    sheet: str | None = None,
+    sources: bool = False,
+) -> tuple[str, Iterable[MonthRecord]]:
+    """
+    Sniff input_path (or sheet of an .xlsx workbook, default the first) and parse it with the
+    registered parser for its format; a large table or simple/tsv file is parsed by up to
+    workers processes (see finance_import.parallel) and memory_budget bounds the month
+    aggregates (see finance_import.spill). persons maps the persoana values of simple/tsv
+    files to profiles (see finance_import.persons). With sources, table and simple/tsv records
+    cite their month's first input row (MonthRecord.source).
+    Returns (format, records); the records stream and the file is closed once they are read.
+    """
+    with stage(stats, "format detection"):
+        inp = open_input(input_path, sheet)
+    try:
+        if inp.empty:
+            where = f" [{sheet}]" if sheet is not None else ""
+            raise EmptyInputError(f"{input_path}{where} is empty.")
+        options = ParseOptions(
+            stats=stats,
+            ambiguous=ambiguous,
+            sorted_input=sorted_input,
+            line_items=line_items,
+            default_year=year or year_from_path(input_path) or datetime.now(timezone.utc).year,
+            source=inp,
+            workers=workers,
+            memory_budget=memory_budget,
+            persons=persons,
+            sources=sources,
+        )
+        records = parser_for(inp.format)(timed(stats, inp.rows(), "read"), options)
+    except BaseException:
+        inp.close()
+        raise
+    return inp.format, closing_iter(records, inp)
+
+
+def convert_file(
+    input_path: Path,
+    year: int | None = None,
+    line_items: LineItemClassifier | None = None,
+    persons: PersonMap | None = None,
+    sheets: list[str] | None = None,
+    sources: bool = False,
+) -> list[tuple[str, list[MonthRecord]]]:
+    """
+    Batch worker: parse one file of any format to month records. Every sheet of a workbook
+    (or the given sheets) is parsed; empty sheets are skipped.
+    Returns (format, records) per sheet, for merge_parts().
+    """
+    selected = input_sheets(input_path, sheets)
+    if len(selected) == 1:
+        fmt, records = convert_path(input_path, year, line_items, persons=persons, sheet=selected[0], sources=sources)
+        return [(fmt, list(records))]
+    parts = []
+    for sheet in selected:
+        try:
+            fmt, records = convert_path(input_path, year, line_items, persons=persons, sheet=sheet, sources=sources)
+        except EmptyInputError:
+            continue
+        parts.append((fmt, list(records)))
+    return parts
+
+
+def merge_parts(
+    parts: Iterable[tuple[Path, str, list[MonthRecord]]], persons: PersonMap | None = None, stats: Stats | None = None
+) -> list[MonthRecord]:
+    """
+    Merge parsed files or sheets, (path, format, records) in input order, by month and profile.
+    Person/month parts (simple, tsv) are grouped with persons' duplicates policy, like
+    tsv-to-finance-json.py batch input; table and strategy parts override them by month, the
+    later part winning, like csv-to-finance-import.py batch input (the person/month parts
+    count as one part, at the first one's position). Returned sorted by month.
+    """
+    parts = list(parts)
+    person_parts = [records for _, fmt, records in parts if fmt in PERSON_FORMATS]
+    # Each month cites the first part's row for it (later assignments win, hence reversed)
+    sources = {r.month: r.source for records in reversed(person_parts) for r in reversed(records)}
+    items = ((r.month, r.people) for records in person_parts for r in records)
+    grouped: list[MonthRecord] | None = [
+        MonthRecord(month, people, sources[month])
+        for month, people in group_people(items, persons or DEFAULT_PERSONS, stats=stats)
+    ]
+    results = []
+    for path, fmt, records in parts:
+        if fmt not in PERSON_FORMATS:
+            results.append((path, records, 0.0))
+        elif grouped is not None:
+            results.append((path, grouped, 0.0))
+            grouped = None
+    return merge_by_month(results)
+
+
+def merge_files(
+    results: list[tuple[Path, list[tuple[str, list[MonthRecord]]], float]],
+    persons: PersonMap | None = None,
+    stats: Stats | None = None,
+) -> list[MonthRecord]:
+    """merge_parts() of convert_file() results, as run_batch() returns them."""
+    return merge_parts(((path, fmt, records) for path, parts, _ in results for fmt, records in parts), persons, stats)
+
+
+def format_profile_ids(fmt: str, persons: PersonMap | None = None) -> list[str]:
+    """Profile ids the records of a file in fmt use (for records that are still streaming)."""
+    if fmt in PERSON_FORMATS:
+        return (persons or DEFAULT_PERSONS).profile_ids
+    return [p["id"] for p in DEFAULT_PROFILES]
+
+
+def serve_directory(
+    args: argparse.Namespace, line_items: LineItemClassifier | None, persons: PersonMap | None
+) -> None:
+    """--serve: convert every input in the directory once, then watch and serve it."""
+    directory = Path(args.input)
+    if not directory.is_dir():
+        print(f"Error: --serve needs a directory to watch: {directory}")
+        raise SystemExit(1)
+    state = ServeState(
+        directory,
+        INPUT_SUFFIXES,
+        partial(convert_file, year=args.year, line_items=line_items, persons=persons, sheets=args.sheet),
+        args.workers,
+        args.compact,
+        args.totals,
+        persons.profiles() if persons is not None else None,
+        partial(merge_files, persons=persons),
+    )
+    start = time.perf_counter()
+    parsed = state.refresh()
+    print(f"Converted {len(parsed)} file(s) in {time.perf_counter() - start:.3f}s")
+    try:
+        serve(state, args.host, args.port, args.interval, args.allow_origin)
+    except OSError as e:
+        print(f"Error: cannot serve on {args.host}:{args.port}: {e}")
+        raise SystemExit(1)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Convert a budget CSV/TSV of any supported format to m-finance-dash backup JSON."
+    )
+    root = SCRIPTS_DIR.parent
+    parser.add_argument("input", help="Input file, directory or glob")
+    parser.add_argument(
+        "output",
+        nargs="?",
+        default=root / "data" / "finance-import.json",
+        help="Output JSON path (default: data/finance-import.json)",
+    )
+    parser.add_argument(
+        "--year",
+        type=int,
+        default=None,
+        help="Year for bare month names in simple/tsv files (default: from filename or current year)",
+    )
+    parser.add_argument(
+        "--sheet",
+        action="append",
+        metavar="NAME",
+        help="Worksheet of .xlsx input to convert (repeatable; default: every sheet, merged by month)",
+    )
+    parser.add_argument(
+        "--sorted",
+        action="store_true",
+        help="Table, simple and tsv input rows are in month order: write each month as soon as the next one "
+        "starts",
+    )
+    parser.add_argument(
+        "--rules",
+        metavar="PATH",
+        help="JSON line-item rules for strategy CSVs, added to the built-in ones (see finance_import.line_items)",
+    )
+    parser.add_argument(
+        "--persons",
+        metavar="PATH",
+        help="JSON map of persoana values in simple/tsv files to profile ids and the duplicate-row policy "
+        "(see finance_import.persons)",
+    )
+    parser.add_argument(
+        "--serve",
+        action="store_true",
+        help="Watch the input directory and serve the backup over HTTP, re-converting changed files",
+    )
+    parser.add_argument("--host", default=DEFAULT_HOST, help=f"With --serve, address to bind (default: {DEFAULT_HOST})")
+    parser.add_argument(
+        "--port", type=int, default=DEFAULT_PORT, help=f"With --serve, port to listen on (default: {DEFAULT_PORT})"
+    )
+    parser.add_argument(
+        "--interval",
+        type=float,
+        default=DEFAULT_INTERVAL,
+        help=f"With --serve, seconds between directory scans (default: {DEFAULT_INTERVAL:g})",
+    )
+    parser.add_argument(
+        "--allow-origin",
+        metavar="ORIGIN",
+        help="With --serve, let web pages from ORIGIN (e.g. http://localhost:3000) read the backup (CORS)",
+    )
+    add_output_args(
+        parser,
+        workers_help="Worker processes for directory/glob input, or for one large table/simple/tsv file "
+        "(default: one per CPU)",
+        memory_budget_help="Bound the month aggregates of one unsorted file to SIZE (e.g. 64M): sorted runs are "
+        "spilled to temp files and merged",
+    )
+    args = parser.parse_args()
+
+    target = output_target(Path(args.output), args.gzip, args.shard_by_year)
+    now_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    try:
+        line_items = (
+            load_rules(Path(args.rules), CSV_SCRIPT.LINE_ITEM_SKIP, CSV_SCRIPT.LINE_ITEM_TO_KEY) if args.rules else None
+        )
+        persons = load_persons(Path(args.persons)) if args.persons else None
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    if args.serve:
+        serve_directory(args, line_items, persons)
+        return
+    stats = new_stats(args, "convert-to-finance-import", target)
+
+    ambiguous: list[tuple[int, str, str]] = []
+    try:
+        if is_batch_input(args.input):
+            paths = expand_inputs(args.input, INPUT_SUFFIXES)
+            if not paths:
+                print(f"Error: no input files match: {args.input}")
+                raise SystemExit(1)
+            start = time.perf_counter()
+            with stats.stage("parsing"):
+                parse_file = partial(
+                    convert_file,
+                    year=args.year,
+                    line_items=line_items,
+                    persons=persons,
+                    sheets=args.sheet,
+                    sources=args.validate,
+                )
+                results = run_batch(paths, parse_file, args.workers)
+            file_months = [
+                (path, {r.month for _, records in parts for r in records}, seconds) for path, parts, seconds in results
+            ]
+            print_timings(file_months, time.perf_counter() - start)
+            with stats.stage("aggregation"):
+                records: Iterable[MonthRecord] = merge_files(results, persons, stats)
+            profile_ids = people_ids(records)
+        else:
+            input_path = Path(args.input)
+            if not input_path.exists():
+                print(f"Error: input file not found: {input_path}")
+                raise SystemExit(1)
+            sheets = input_sheets(input_path, args.sheet)
+            formats = []
+            sheet_results = []
+            for sheet in sheets:
+                try:
+                    fmt, records = convert_path(
+                        input_path,
+                        args.year,
+                        line_items,
+                        stats,
+                        ambiguous,
+                        args.sorted,
+                        args.workers,
+                        args.memory_budget,
+                        persons,
+                        sheet,
+                        args.validate,
+                    )
+                except EmptyInputError:
+                    if len(sheets) == 1:
+                        raise
+                    print(f"Skipped empty sheet: {input_path.name} [{sheet}]")
+                    continue
+                print(f"Detected {fmt} format: {input_path.name}" + (f" [{sheet}]" if sheet is not None else ""))
+                formats.append(fmt)
+                if len(sheets) > 1:
+                    sheet_results.append((input_path, fmt, list(records)))
+            if len(sheets) > 1:
+                if not sheet_results:
+                    raise EmptyInputError(f"{input_path}: every sheet is empty.")
+                # Several sheets are merged like batch files
+                with stats.stage("aggregation"):
+                    records = merge_parts(sheet_results, persons, stats)
+                profile_ids = people_ids(records)
+            else:
+                profile_ids = format_profile_ids(formats[0], persons)
+            stats.info.update(format=",".join(formats))
+        # Named by --persons, then the app's default profiles
+        profiles = used_profiles(profile_ids, persons.profiles() if persons is not None else None)
+        count = write_output(args, records, now_iso, stats, profiles)
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+
+    if ambiguous:
+        print(f"Warning: {len(ambiguous)} ambiguous number(s) read as thousands in dot-decimal columns")
+    if stats.skipped:
+        reasons = ", ".join(f"{n} {reason}" for reason, n in sorted(stats.skipped.items()))
+        print(f"Skipped row(s): {reasons}")
+    print(f"Wrote {count} month(s) to {target}")
+    report_stats(args, stats)
+
+
+if __name__ == "__main__":
+    main()
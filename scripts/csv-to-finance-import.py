@@ -6,29 +6,121 @@ Usage:
   python scripts/csv-to-finance-import.py
   python scripts/csv-to-finance-import.py data/buget2025-strategie26.csv
   python scripts/csv-to-finance-import.py data/buget2025-strategie26.csv data/finance-import.json
+  python scripts/csv-to-finance-import.py "data/exports/*.csv" data/finance-import.json
+  python scripts/csv-to-finance-import.py data/buget2025-strategie26.csv --horizon 2055-12 \
+      --growth investitii=0.07 --projection data/projection.json
 
-Output JSON can be imported in the app: Settings -> Import from file.
+Output JSON is a v3 full backup (records + profiles) and can be imported in the app:
+Settings -> Import from file. --merge-into upserts the converted months into an existing
+exported backup instead of writing them alone.
+
+The input may also be an .xlsx workbook: its first sheet is read directly, without a CSV
+export (see finance_import.xlsx; convert-to-finance-import.py converts several sheets).
+
+Rows are streamed from the reader straight into the JSON writer; only one aggregate per
+distinct month is held in memory. Pass --sorted when the input is already in month order
+to write each month as soon as the next one starts. A large table (16 MiB or more) read with
+--no-cache or --sorted is split into row-aligned byte ranges parsed in --workers processes,
+with the same output as a sequential pass (see finance_import.parallel). --memory-budget
+bounds the aggregates of an unsorted table: above the budget they are spilled to temp files
+as sorted runs and merged by month (see finance_import.spill).
+
+Reruns are incremental: a sidecar cache (<output>.cache) remembers the records produced by
+each range of input rows, so only changed or appended rows are parsed again, and the output
+is not rewritten when its content did not change. --full re-parses everything; --no-cache
+skips the sidecar entirely.
+
+Output is written atomically (temp file + rename). --compact writes minified JSON, --gzip
+compresses it (<output>.gz; decompress before importing in the app) and --shard-by-year
+writes one importable backup per year plus a <name>.manifest.json listing them. --totals
+adds the dashboard's per-month, yearly and rolling totals as a "totals" section (see
+finance_import.totals). --validate checks the records against the app's schema on the same
+pass and reports the first violations instead of writing records the app would drop (see
+finance_import.validate). --columns also writes <output>.columns, the amounts as columnar
+float64 arrays that scripts/finance-query.py sums and averages (see finance_import.columnar).
+
+A strategy CSV has one record per "incepand cu ..." period. --project writes a record for
+every month instead, each period lasting until the next one and the last until --horizon;
+--projection PATH also writes the running economii/investitii balances (with optional
+--growth rates and --opening balances) and the income estimates for the app's planning page
+(see finance_import.projection).
+
+--stats prints per-stage timings and row counters (rows seen, rows skipped by reason, cells
+that fell back to 0.0); --stats-json writes the same report as JSON and --profile dumps a
+cProfile of the parsing stage (see finance_import.stats).
 """
 
 import argparse
 import csv
 import json
 import re
+import time
+from array import array
 from datetime import datetime, timezone
+from functools import partial
+from itertools import chain, islice
 from pathlib import Path
+from typing import Iterable, Iterator
 
-# App schema version (must match lib/storage/storage.ts CURRENT_VERSION)
-SCHEMA_VERSION = 2
-
-# All CategoryAmounts keys (must match lib/types.ts)
-CATEGORY_KEYS = [
-    "venit", "bonuri", "extra",
-    "rate",
-    "apple", "intretinere", "internet", "gaz", "curent", "telefon", "netflix", "sala",
-    "educatie", "sanatate", "beauty", "haine",
-    "diverse", "transport", "cadouri", "vacante", "casa", "gadgets", "tazz", "alimente",
-    "economii", "investitii",
-]
+from finance_import.batch import (
+    expand_inputs,
+    is_batch_input,
+    merge_by_month,
+    print_timings,
+    run_batch,
+)
+from finance_import.cache import (
+    ConversionCache,
+    cache_key,
+    cache_path_for,
+    iter_chunks,
+    records_digest,
+)
+from finance_import.cli import add_output_args, new_stats, output_exists, output_key, report_stats, write_output
+from finance_import.formats import (
+    FORMAT_STRATEGY,
+    FORMAT_TABLE,
+    SNIFF_LINES,
+    ParseOptions,
+    SniffedInput,
+    closing_iter,
+    is_strategy_prefix,
+    open_input,
+    register_parser,
+)
+from finance_import.labels import FoldedIndex, fold
+from finance_import.line_items import SKIPPED, UNMAPPED, LineItemClassifier, load_rules
+from finance_import.months import MonthParser, month_name_to_num, parse_month
+from finance_import.numbers import detect_format, parse_column, parse_number
+from finance_import.parallel import map_ranges, read_rows, row_ranges, use_parallel
+from finance_import.projection import BALANCE_KEYS, Projection, default_horizon, project, projection_document
+from finance_import.records import (
+    CATEGORY_KEYS,
+    KEY_INDEX,
+    MonthRecord,
+    MonthSum,
+    amounts_to_dict,
+    cite_rows,
+    new_amounts,
+    settle,
+    sum_into,
+)
+from finance_import.spill import SpillingGroupBy
+from finance_import.stats import (
+    SKIP_BAD_MONTH,
+    SKIP_EMPTY_ROW,
+    SKIP_SHORT_ROW,
+    SKIP_UNMAPPED_LABEL,
+    SKIP_ZERO_AMOUNT,
+    Stats,
+    count_zero_fallbacks,
+    is_zero_fallback,
+    stage,
+    timed,
+)
+from finance_import.validate import BackupValidationError
+from finance_import.writer import COMPACT_SEPARATORS, atomic_open, output_target
+from finance_import.xlsx import WORKBOOK_SUFFIXES
 
 # Map CSV column headers (case-insensitive, stripped) -> app key.
 # Add your CSV header names here. Romanian labels from the app are included.
@@ -93,21 +185,10 @@ LINE_ITEM_TO_KEY = {
 # Skip these first-column values (totals / section headers)
 LINE_ITEM_SKIP = ("in *", "out", "diff", "incepand cu", "💋 kiss", "keep it stupid simple")
 
-# Romanian month names -> 01..12 (short and long)
-RO_MONTHS = {
-    "ian": "01", "ianuarie": "01",
-    "feb": "02", "februarie": "02",
-    "mar": "03", "martie": "03",
-    "apr": "04", "aprilie": "04",
-    "mai": "05",
-    "iun": "06", "iunie": "06",
-    "iul": "07", "iulie": "07",
-    "aug": "08", "august": "08",
-    "sep": "09", "septembrie": "09",
-    "oct": "10", "octombrie": "10",
-    "nov": "11", "noiembrie": "11",
-    "dec": "12", "decembrie": "12",
-}
+# Folded lookup index and compiled line-item rules, built once at import time.
+# More line items can come from a rules file (--rules, see finance_import.line_items).
+COLUMN_INDEX = FoldedIndex(COLUMN_TO_KEY)
+LINE_ITEMS = LineItemClassifier(LINE_ITEM_SKIP, LINE_ITEM_TO_KEY)
 
 
 def normalize_header(h: str) -> str:
@@ -134,86 +215,14 @@ def parse_incepand_month(value: str) -> str | None:
             break
     if not year:
         return None
-    for name, num in RO_MONTHS.items():
-        if name in rest:
+    for p in parts:
+        num = month_name_to_num(p)
+        if num:
             month_num = num
             break
     return f"{year}-{month_num}"
 
 
-def parse_month(value: str) -> str | None:
-    """Parse a month value to YYYY-MM. Returns None if invalid."""
-    if not value or not isinstance(value, str):
-        return None
-    s = value.strip()
-    if not s:
-        return None
-
-    # Already YYYY-MM
-    m = re.match(r"^(\d{4})-(\d{1,2})$", s)
-    if m:
-        y, mo = m.group(1), m.group(2).zfill(2)
-        if 1 <= int(mo) <= 12:
-            return f"{y}-{mo}"
-
-    # DD.MM.YYYY or D.M.YYYY
-    m = re.match(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})$", s.replace(" ", ""))
-    if m:
-        d, mo, y = m.group(1), m.group(2).zfill(2), m.group(3)
-        if 1 <= int(mo) <= 12:
-            return f"{y}-{mo}"
-
-    # MM.YYYY or M.YYYY
-    m = re.match(r"^(\d{1,2})\.(\d{4})$", s.replace(" ", ""))
-    if m:
-        mo, y = m.group(1).zfill(2), m.group(2)
-        if 1 <= int(mo) <= 12:
-            return f"{y}-{mo}"
-
-    # "Ian 2025", "Ianuarie 2025", "2025 Ian"
-    parts = s.split()
-    if len(parts) >= 2:
-        for i, p in enumerate(parts):
-            if p.isdigit() and len(p) == 4:
-                year = p
-                rest = " ".join(parts[:i] + parts[i + 1 :]).lower()
-                for name, num in RO_MONTHS.items():
-                    if name in rest or rest.startswith(name):
-                        return f"{year}-{num}"
-                break
-
-    return None
-
-
-def parse_number(value: str) -> float:
-    """
-    Parse a number. Handles European format: dot = thousands (2.500 -> 2500), comma = decimal (1,5 -> 1.5).
-    Also accepts dot as decimal (2.5 -> 2.5).
-    """
-    if value is None or (isinstance(value, str) and not value.strip()):
-        return 0.0
-    s = str(value).strip().replace(" ", "")
-    # Strip trailing "**" or similar
-    if s:
-        s = re.sub(r"\*+.*$", "", s).strip() or s
-    if not s:
-        return 0.0
-    # European: 2.500 = 2500 (thousands), 1,5 = 1.5 (decimal). If comma present, treat as decimal separator.
-    if "," in s:
-        s = s.replace(".", "").replace(",", ".")
-    else:
-        # No comma: if single dot and 3 digits after, treat as thousands (2.500 -> 2500)
-        if "." in s:
-            before, _, after = s.partition(".")
-            if after.isdigit() and len(after) == 3 and (not before or before.isdigit()):
-                s = before + after  # integer
-            # else keep as float (e.g. 2.5)
-    try:
-        return float(s)
-    except ValueError:
-        return 0.0
-
-
 def default_category_amounts() -> dict[str, float]:
     return {k: 0.0 for k in CATEGORY_KEYS}
 
@@ -242,65 +251,64 @@ def build_header_to_key(fieldnames: list[str]) -> tuple[str | None, dict[str, st
         if month_col is None and n in MONTH_COLUMN_NAMES:
             month_col = n
             continue
-        if n in COLUMN_TO_KEY:
-            header_to_key[n] = COLUMN_TO_KEY[n]
-        else:
-            # Try without diacritics for key lookup (e.g. "Intretinere" -> intretinere)
-            key = n
-            for csv_candidate, app_key in COLUMN_TO_KEY.items():
-                if normalize_for_compare(csv_candidate) == normalize_for_compare(n):
-                    header_to_key[n] = app_key
-                    break
+        app_key = COLUMN_INDEX.get(n)  # exact, then without diacritics ("Intretinere" -> intretinere)
+        if app_key:
+            header_to_key[n] = app_key
     return month_col, header_to_key
 
 
 def normalize_for_compare(s: str) -> str:
     """Remove common diacritics for fuzzy header match."""
-    replacements = {"ă": "a", "â": "a", "î": "i", "ș": "s", "ț": "t", "ş": "s", "ţ": "t"}
-    t = s.lower()
-    for a, b in replacements.items():
-        t = t.replace(a, b)
-    return t
+    return fold(s)
 
 
 def normalize_line_label(s: str) -> str:
-    """Normalize first-column label for LINE_ITEM_TO_KEY lookup."""
-    t = " ".join(s.strip().lower().split())
-    for skip in LINE_ITEM_SKIP:
-        if skip in t or t.startswith("incepand"):
-            return ""
-    return t
-
+    """Normalize first-column label for LINE_ITEM_TO_KEY lookup ("" for skipped labels)."""
+    return LINE_ITEMS.normalize(s)
 
-def _line_item_to_app_key(label: str) -> str | None:
-    app_key = LINE_ITEM_TO_KEY.get(label)
-    if app_key:
-        return app_key
-    for csv_label, key in LINE_ITEM_TO_KEY.items():
-        if normalize_for_compare(csv_label) == normalize_for_compare(label):
-            return key
-    return None
 
+# At most this many ambiguous number cells are listed after a conversion
+MAX_REPORTED_AMBIGUOUS = 20
 
 # Strategy CSV: (label_col, amount_col) pairs - top block uses (1,2), period blocks also use (3,4)
 STRATEGY_LABEL_AMOUNT_PAIRS = [(1, 2), (3, 4)]
 
 
-def parse_strategy_csv(rows: list[list[str]]) -> list[tuple[str, dict[str, float]]]:
+def parse_strategy_csv(
+    rows: Iterable[list[str]], line_items: LineItemClassifier = LINE_ITEMS
+) -> list[tuple[str, dict[str, float]]]:
     """
     Parse strategy-format CSV: STRATEGY_LABEL_COL = label, STRATEGY_AMOUNT_COL = amount.
     Rows before first 'incepand cu ...' = base (recurring) amounts.
     Each 'incepand cu ...' starts a period; following line items add/overwrite until next 'incepand cu'.
     Returns list of (month_str, category_amounts).
     """
-    base_amounts = default_category_amounts()
-    result: list[tuple[str, dict[str, float]]] = []
+    return [(month, amounts_to_dict(amounts)) for month, amounts in iter_strategy_periods(rows, line_items=line_items)]
+
+
+def iter_strategy_periods(
+    rows: Iterable[list[str]], stats: Stats | None = None, line_items: LineItemClassifier = LINE_ITEMS
+) -> Iterator[tuple[str, array]]:
+    """
+    Streaming form of parse_strategy_csv: yields each (month_str, amounts vector) once its period ends.
+    Periods without their own line items share the base vector; yielded vectors must not be modified.
+    Label cells are classified by line_items. With stats, counts rows, skipped line items (zero
+    amount, unmapped label) and amount cells that fell back to 0.0.
+    """
+    classify = line_items.classify
+    base_amounts = new_amounts()
     current_month: str | None = None
-    current_amounts = default_category_amounts()
+    # Until the first period the line items build the base itself; each period then starts
+    # sharing the base vector and copies it on its first line item
+    current_amounts = base_amounts
     seen_incepand = False
 
     for row in rows:
+        if stats is not None:
+            stats.count("rows")
         if not row:
+            if stats is not None:
+                stats.skip(SKIP_EMPTY_ROW)
             continue
         col0_for_incepand = (row[0] or "").strip().replace("\n", " ").lower()
         label_cell_1 = (row[1] if len(row) > 1 else "") or ""
@@ -310,52 +318,542 @@ def parse_strategy_csv(rows: list[list[str]]) -> list[tuple[str, dict[str, float
         if "incepand cu" in col0_for_incepand or "incepand cu" in label_lower:
             seen_incepand = True
             if current_month:
-                result.append((current_month, {k: v for k, v in current_amounts.items()}))
+                yield current_month, current_amounts
             month = parse_incepand_month((row[0] or "") + " " + label_cell_1)
             current_month = month
-            # Start with copy of base for this period
-            current_amounts = {k: v for k, v in base_amounts.items()}
+            current_amounts = base_amounts
             continue
 
         # Try each (label_col, amount_col) pair
         for label_col, amount_col in STRATEGY_LABEL_AMOUNT_PAIRS:
             if len(row) <= max(label_col, amount_col):
                 continue
-            label_cell = (row[label_col] or "").strip().replace("\n", " ")
-            amount_cell = (row[amount_col] or "").strip()
-            label = normalize_line_label(label_cell)
-            if not label:
+            key_index = classify(row[label_col] or "")
+            if key_index == SKIPPED:
                 continue
+            amount_cell = (row[amount_col] or "").strip()
             amount = parse_number(amount_cell)
             if amount == 0:
+                if stats is not None:
+                    stats.skip(SKIP_ZERO_AMOUNT)
+                    stats.count("zeroFallbackCells", is_zero_fallback(amount_cell, amount))
                 continue
-            app_key = _line_item_to_app_key(label)
-            if not app_key or app_key not in current_amounts:
+            if key_index == UNMAPPED:
+                if stats is not None:
+                    stats.skip(SKIP_UNMAPPED_LABEL)
                 continue
+            if seen_incepand and current_amounts is base_amounts:
+                current_amounts = array("d", base_amounts)
             # Add so multiple line items mapping to same key sum
-            current_amounts[app_key] = current_amounts.get(app_key, 0) + amount
-            if not seen_incepand:
-                base_amounts[app_key] = base_amounts.get(app_key, 0) + amount
-            elif current_month is None:
+            current_amounts[key_index] += amount
+            if seen_incepand and current_month is None:
                 current_month = datetime.now(timezone.utc).strftime("%Y-%m")
 
     if current_month:
-        result.append((current_month, {k: v for k, v in current_amounts.items()}))
+        yield current_month, current_amounts
 
-    return result
 
+def is_strategy_format(rows: Iterable[list[str]]) -> bool:
+    """
+    Heuristic: first cell contains 'cheltuieli' or a row has 'incepand cu' in col0. Only the
+    first SNIFF_LINES rows are looked at (the same bounded prefix open_input sniffs).
+    """
+    return is_strategy_prefix(islice(rows, SNIFF_LINES))
 
-def is_strategy_format(rows: list[list[str]]) -> bool:
-    """Heuristic: first cell contains 'cheltuieli' or any row has 'incepand cu' in col0."""
-    if not rows:
-        return False
-    first_cell = (rows[0][0] or "").lower().replace("\n", " ")
-    if "cheltuieli" in first_cell:
-        return True
-    for row in rows:
-        if row and "incepand cu" in (row[0] or "").lower():
-            return True
-    return False
+
+def iter_csv_rows(path: Path) -> Iterator[list[str]]:
+    """Yield raw CSV rows from path without reading the whole file."""
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        yield from csv.reader(f)
+
+
+# Rows per batch in the table format; each batch is parsed column by column
+TABLE_BLOCK_ROWS = 4096
+
+
+def iter_table_rows(
+    rows: Iterable[list[str]],
+    stats: Stats | None = None,
+    ambiguous: list[tuple[int, str, str]] | None = None,
+    start_row: int = 2,
+    formats: dict[int, str] | None = None,
+    first_rows: dict[str, int] | None = None,
+) -> Iterator[tuple[str, array]]:
+    """
+    Table format: first row = headers, one row per month. Yields (month_str, amounts vector)
+    per data row. Rows with an unparseable month use the current month and are counted in
+    stats.skipped["badMonth"]; rows shorter than the header are skipped ("shortRow").
+
+    Amount columns are parsed in blocks of TABLE_BLOCK_ROWS with parse_column; each column's
+    number format is detected once, from the first block, unless formats (column index ->
+    number format, see detect_table_formats) is given. Cells that read as thousands in a
+    dot-decimal column are appended to ambiguous as (row_number, header, raw_cell), and with
+    first_rows, the row_number of each month's first row is recorded in it.
+    """
+    it = iter(rows)
+    fieldnames = next(it, None)
+    if not fieldnames:
+        return
+    month_idx, columns = table_columns(fieldnames, stats)
+    formats = dict(formats) if formats else {}
+    month_parser = MonthParser()
+    width = len(fieldnames)
+
+    block: list[list[str]] = []
+    row_numbers: list[int] = []
+    for row_number, row in enumerate(it, start=start_row):
+        if len(row) < width:
+            if stats is not None:
+                stats.count("rows")
+                stats.skip(SKIP_SHORT_ROW)
+            continue
+        block.append(row)
+        row_numbers.append(row_number)
+        if len(block) >= TABLE_BLOCK_ROWS:
+            yield from _parse_table_block(
+                block, row_numbers, fieldnames, month_idx, month_parser, columns, formats, stats, ambiguous, first_rows
+            )
+            block, row_numbers = [], []
+    if block:
+        yield from _parse_table_block(
+            block, row_numbers, fieldnames, month_idx, month_parser, columns, formats, stats, ambiguous, first_rows
+        )
+
+
+def table_columns(fieldnames: list[str], stats: Stats | None = None) -> tuple[int | None, list[tuple[int, int]]]:
+    """
+    Month column index (None when there is none) and (column index, KEY_INDEX position) for
+    every amount column, in column order; a later column wins for the same key.
+    """
+    with stage(stats, "header mapping"):
+        month_col_norm, header_to_key = build_header_to_key(fieldnames)
+        month_idx = None
+        columns: list[tuple[int, int]] = []
+        for i, h in enumerate(fieldnames):
+            n = normalize_header(h)
+            if month_idx is None and n == month_col_norm:
+                month_idx = i
+            if n in header_to_key:
+                columns.append((i, KEY_INDEX[header_to_key[n]]))
+    return month_idx, columns
+
+
+def detect_table_formats(fieldnames: list[str], data_rows: Iterable[list[str]]) -> dict[int, str]:
+    """
+    Number format per amount column, detected from the first block of full-width rows exactly
+    as iter_table_rows does, so a file parsed in pieces reads every column the same way.
+    """
+    width = len(fieldnames)
+    block = list(islice((row for row in data_rows if len(row) >= width), TABLE_BLOCK_ROWS))
+    if not block:
+        return {}
+    _, columns = table_columns(fieldnames)
+    return {i: detect_format([row[i] for row in block]) for i, _ in columns}
+
+
+def _parse_table_block(
+    block: list[list[str]],
+    row_numbers: list[int],
+    fieldnames: list[str],
+    month_idx: int | None,
+    month_parser: MonthParser,
+    columns: list[tuple[int, int]],
+    formats: dict[int, str],
+    stats: Stats | None,
+    ambiguous: list[tuple[int, str, str]] | None,
+    first_rows: dict[str, int] | None = None,
+) -> Iterator[tuple[str, array]]:
+    if stats is not None:
+        stats.count("rows", len(block))
+    values: dict[int, list[float]] = {}
+    for i, _ in columns:
+        if i in values:
+            continue
+        cells = [row[i] for row in block]
+        if i not in formats:
+            formats[i] = detect_format(cells)
+        parsed = parse_column(cells, formats[i])
+        values[i] = parsed.values
+        if stats is not None:
+            stats.count("zeroFallbackCells", count_zero_fallbacks(cells, parsed.values))
+        if ambiguous is not None:
+            ambiguous.extend((row_numbers[j], fieldnames[i], cells[j]) for j in parsed.ambiguous)
+
+    for j, row in enumerate(block):
+        month_value = row[month_idx].strip() if month_idx is not None else ""
+        month = month_parser(month_value)
+        if not month:
+            month = datetime.now(timezone.utc).strftime("%Y-%m")
+            if month_value and stats is not None:
+                stats.skip(SKIP_BAD_MONTH)
+        if first_rows is not None:
+            first_rows.setdefault(month, row_numbers[j])
+        amounts = new_amounts()
+        for i, key_index in columns:
+            amounts[key_index] = values[i][j]
+        yield month, amounts
+
+
+def aggregate_by_month(
+    items: Iterable[tuple[str, array | MonthSum]],
+    sorted_input: bool = False,
+    settled: bool = True,
+    memory_budget: int | None = None,
+    stats: Stats | None = None,
+) -> Iterator[tuple[str, array | MonthSum]]:
+    """
+    Sum amounts per month and yield (month_str, amounts vector) in month order.
+    Memory is one aggregate per distinct month; duplicate months are summed exactly (MonthSum),
+    so the result does not depend on how the rows were split. With settled=False, summed months
+    are yielded as MonthSum for further merging. With sorted_input, a month is yielded as soon as
+    a later month is seen; a row that goes back in time raises ValueError. With memory_budget
+    (bytes), unsorted aggregates beyond the budget are spilled to temp files as sorted runs and
+    merged at the end (see finance_import.spill); the spilled run count goes to stats.
+    """
+    finish = settle if settled else (lambda a: a)
+    if memory_budget is not None and not sorted_input:
+        groups = SpillingGroupBy(sum_into, memory_budget)
+        try:
+            for month, amounts in items:
+                groups.add(month, amounts)
+            if stats is not None:
+                stats.count("spilledRuns", groups.spilled)
+            for month, amounts in groups.items():
+                yield month, finish(amounts)
+        finally:
+            groups.close()
+        return
+    pending: dict[str, array | MonthSum] = {}
+    last_flushed: str | None = None
+    for month, amounts in items:
+        if sorted_input:
+            if last_flushed is not None and month <= last_flushed:
+                raise ValueError(f"Input is not sorted by month: {month} after {last_flushed}")
+            for done in sorted(m for m in pending if m < month):
+                yield done, finish(pending.pop(done))
+                last_flushed = done
+        acc = pending.get(month)
+        pending[month] = amounts if acc is None else sum_into(acc, amounts)
+    for month in sorted(pending):
+        yield month, finish(pending.pop(month))
+
+
+def iter_months(
+    input_path: Path,
+    stats: Stats | None = None,
+    sorted_input: bool = False,
+    ambiguous: list[tuple[int, str, str]] | None = None,
+    line_items: LineItemClassifier = LINE_ITEMS,
+    workers: int | None = 1,
+    memory_budget: int | None = None,
+    first_rows: dict[str, int] | None = None,
+) -> Iterator[tuple[str, array]]:
+    """
+    Detect the format of input_path and return an iterator of (month_str, amounts vector) in
+    month order. Raises ValueError for an empty file or a table without a header row.
+    The format is sniffed from a bounded prefix and parsing continues on the same handle.
+    A large table is split into byte ranges parsed by up to workers processes (see
+    finance_import.parallel); the result is the same as a sequential pass. memory_budget bounds
+    the table's month aggregates (see aggregate_by_month). With first_rows, the table's rows
+    are tracked as iter_table_rows does (month -> row number of its first row).
+    """
+    with stage(stats, "format detection"):
+        inp = open_input(input_path)
+    if inp.empty or inp.format == FORMAT_STRATEGY or not inp.header:
+        with inp:
+            if inp.empty:
+                raise ValueError("CSV is empty.")
+            if inp.format == FORMAT_STRATEGY:
+                # Strategy format: first column = label, second = amount; "incepand cu ..." starts period
+                return iter(_strategy_months(timed(stats, inp.rows(), "read"), stats, line_items))
+            raise ValueError("CSV has no header row.")
+    # Table format (also used for persoana/luna sheets): first row = headers, one row per month
+    rows = timed(stats, inp.rows(), "read")
+    if use_parallel(input_path, workers):
+        with inp:
+            return _parallel_table_months(
+                inp, rows, stats, ambiguous, sorted_input, workers, memory_budget, first_rows
+            )
+    return closing_iter(_table_months(rows, stats, ambiguous, sorted_input, memory_budget, first_rows), inp)
+
+
+def _table_months(
+    rows: Iterable[list[str]],
+    stats: Stats | None,
+    ambiguous: list[tuple[int, str, str]] | None,
+    sorted_input: bool,
+    memory_budget: int | None = None,
+    first_rows: dict[str, int] | None = None,
+) -> Iterator[tuple[str, array]]:
+    items = timed(stats, iter_table_rows(rows, stats, ambiguous, first_rows=first_rows), "parsing")
+    months = aggregate_by_month(items, sorted_input, memory_budget=memory_budget, stats=stats)
+    return iter(timed(stats, months, "aggregation"))
+
+
+def _parallel_table_months(
+    inp: SniffedInput,
+    rows: Iterable[list[str]],
+    stats: Stats | None,
+    ambiguous: list[tuple[int, str, str]] | None,
+    sorted_input: bool,
+    workers: int | None,
+    memory_budget: int | None = None,
+    first_rows: dict[str, int] | None = None,
+) -> Iterator[tuple[str, array]]:
+    """
+    _table_months for one large file: column number formats are detected here from the first
+    block, then byte ranges of the file are parsed in worker processes and their per-month
+    partial sums merged in file order (exactly, see MonthSum). Consumes the header and first
+    block from rows; the workers read the file themselves.
+    """
+    it = iter(rows)
+    fieldnames = next(it)
+    formats = detect_table_formats(fieldnames, it)
+    _, ranges = row_ranges(inp.path)
+    parse = partial(
+        _parse_table_range,
+        delimiter=inp.delimiter,
+        fieldnames=fieldnames,
+        formats=formats,
+        want_ambiguous=ambiguous is not None,
+        want_rows=first_rows is not None,
+    )
+
+    def partials() -> Iterator[tuple[str, array | MonthSum]]:
+        row_offset = 2
+        for months, counters, skipped, part_ambiguous, part_rows, row_count in map_ranges(
+            parse, inp.path, ranges, workers
+        ):
+            if stats is not None:
+                stats.add_counts(counters, skipped)
+            if ambiguous is not None:
+                ambiguous.extend((row_offset + n, header, cell) for n, header, cell in part_ambiguous)
+            if first_rows is not None:
+                for month, n in part_rows.items():
+                    first_rows.setdefault(month, row_offset + n)
+            row_offset += row_count
+            yield from months
+
+    items = timed(stats, partials(), "parsing")
+    months = aggregate_by_month(items, sorted_input, memory_budget=memory_budget, stats=stats)
+    return iter(timed(stats, months, "aggregation"))
+
+
+def _parse_table_range(
+    path: Path,
+    start: int,
+    end: int,
+    delimiter: str,
+    fieldnames: list[str],
+    formats: dict[int, str],
+    want_ambiguous: bool,
+    want_rows: bool = False,
+) -> tuple[
+    list[tuple[str, array | MonthSum]], dict[str, int], dict[str, int], list[tuple[int, str, str]], dict[str, int], int
+]:
+    """
+    Worker: parse the table rows in bytes [start, end) of path. Returns the per-month partial
+    sums (unsettled), the counters and skips, ambiguous cells and (with want_rows) each month's
+    first row, with row numbers relative to the range, and the number of rows read.
+    """
+    stats = Stats()
+    ambiguous: list[tuple[int, str, str]] | None = [] if want_ambiguous else None
+    first_rows: dict[str, int] | None = {} if want_rows else None
+    rows = chain([fieldnames], read_rows(path, start, end, delimiter))
+    table = iter_table_rows(rows, stats, ambiguous, start_row=0, formats=formats, first_rows=first_rows)
+    months = list(aggregate_by_month(table, settled=False))
+    return months, stats.counters, stats.skipped, ambiguous or [], first_rows or {}, stats.counters.get("rows", 0)
+
+
+def _strategy_months(
+    rows: Iterable[list[str]], stats: Stats | None, line_items: LineItemClassifier
+) -> list[tuple[str, array]]:
+    periods = timed(stats, iter_strategy_periods(rows, stats, line_items), "parsing")
+    with stage(stats, "aggregation"):
+        return sorted(periods, key=lambda p: p[0])
+
+
+def convert_cached(
+    input_path: Path,
+    cache_file: Path,
+    full: bool = False,
+    stats: Stats | None = None,
+    ambiguous: list[tuple[int, str, str]] | None = None,
+    line_items: LineItemClassifier = LINE_ITEMS,
+) -> tuple[list[MonthRecord], ConversionCache]:
+    """
+    Like iter_months, but reuse the sidecar cache: only row ranges that changed since the last
+    run are parsed. full ignores the existing cache. Returns the records and the cache, which
+    the caller saves once the output is written. Stats only count the rows parsed in this run.
+    """
+    with stage(stats, "format detection"):
+        inp = open_input(input_path)
+    with inp:
+        return _convert_cached(inp, cache_file, full, stats, ambiguous, line_items)
+
+
+def _convert_cached(
+    inp: SniffedInput,
+    cache_file: Path,
+    full: bool,
+    stats: Stats | None,
+    ambiguous: list[tuple[int, str, str]] | None,
+    line_items: LineItemClassifier,
+) -> tuple[list[MonthRecord], ConversionCache]:
+    rows = iter(timed(stats, inp.rows(), "read"))
+    header = next(rows, None)
+    if header is None:
+        raise ValueError("CSV is empty.")
+    strategy = inp.format == FORMAT_STRATEGY
+    if not strategy and not header:
+        raise ValueError("CSV has no header row.")
+    # Line-item rules only affect the strategy format
+    rules = line_items.fingerprint() if strategy else None
+    formats: dict[int, str] | None = None
+    if not strategy:
+        # Column number formats come from the file's first block, as when streaming, not from
+        # each range: the rows read to detect them are parsed with the first range
+        first_block: list[list[str]] = []
+
+        def peek() -> Iterator[list[str]]:
+            for row in rows:
+                first_block.append(row)
+                yield row
+
+        formats = detect_table_formats(header, peek())
+        rows = chain(first_block, rows)
+    # A format change in the first block invalidates every cached range
+    key = cache_key("csv-to-finance-import", strategy, header, rules, sorted(formats.items()) if formats else None)
+    cache = ConversionCache(cache_file, key, enabled=not full)
+
+    if strategy:
+        # Periods depend on every earlier row, so the whole file is one cached range
+        def parse_chunk(chunk: list[list[str]], state: str | None, offset: int):
+            with stage(stats, "parsing"):
+                return [MonthRecord(m, {"me": a}) for m, a in iter_strategy_periods(chunk, stats, line_items)], None
+
+        chunks: Iterable[list[list[str]]] = [[header, *rows]]
+    else:
+
+        def parse_chunk(chunk: list[list[str]], state: str | None, offset: int):
+            with stage(stats, "parsing"):
+                # Rows are always tracked here, so reused ranges can be cited by a later --validate run
+                first_rows: dict[str, int] = {}
+                table = iter_table_rows([header, *chunk], stats, ambiguous, offset + 2, formats, first_rows)
+                months = list(aggregate_by_month(table, settled=False))
+                return [MonthRecord(m, {"me": a}, (inp.name, first_rows[m])) for m, a in months], None
+
+        chunks = iter_chunks(rows)
+
+    first_rows: dict[str, int] = {}
+
+    def partials() -> Iterator[tuple[str, array | MonthSum]]:
+        for part in cache.convert(chunks, parse_chunk):
+            for r in part:
+                if r.source is not None:
+                    first_rows.setdefault(r.month, r.source[1])
+                yield r.month, r.people["me"]
+
+    with stage(stats, "aggregation"):
+        months = sorted(partials(), key=lambda p: p[0]) if strategy else aggregate_by_month(partials())
+        records = [MonthRecord(m, {"me": a, "wife": a}) for m, a in months]
+        return list(cite_rows(records, inp.name, first_rows)), cache
+
+
+def convert_file(
+    input_path: Path, line_items: LineItemClassifier = LINE_ITEMS, sources: bool = False
+) -> list[MonthRecord]:
+    """
+    Batch worker: parse one CSV to month records (me and wife share one vector). With sources,
+    table records cite their month's first row (MonthRecord.source).
+    """
+    first_rows: dict[str, int] | None = {} if sources else None
+    months = iter_months(input_path, line_items=line_items, first_rows=first_rows)
+    records = [MonthRecord(month, {"me": amounts, "wife": amounts}) for month, amounts in months]
+    return list(cite_rows(records, input_path.name, first_rows))
+
+
+def parse_table(rows: Iterator[list[str]], options: ParseOptions) -> Iterator[MonthRecord]:
+    """Registered parser for the table format (me and wife share one vector)."""
+    first_rows: dict[str, int] | None = {} if options.sources and options.source is not None else None
+    if options.source is not None and use_parallel(options.source.path, options.workers):
+        months = _parallel_table_months(
+            options.source,
+            rows,
+            options.stats,
+            options.ambiguous,
+            options.sorted_input,
+            options.workers,
+            options.memory_budget,
+            first_rows,
+        )
+    else:
+        months = _table_months(
+            rows, options.stats, options.ambiguous, options.sorted_input, options.memory_budget, first_rows
+        )
+    records = (MonthRecord(month, {"me": amounts, "wife": amounts}) for month, amounts in months)
+    return cite_rows(records, options.source.name, first_rows) if first_rows is not None else records
+
+
+def parse_strategy(rows: Iterator[list[str]], options: ParseOptions) -> list[MonthRecord]:
+    """Registered parser for the strategy format (me and wife share one vector)."""
+    months = _strategy_months(rows, options.stats, options.line_items or LINE_ITEMS)
+    return [MonthRecord(month, {"me": amounts, "wife": amounts}) for month, amounts in months]
+
+
+register_parser(FORMAT_TABLE, parse_table)
+register_parser(FORMAT_STRATEGY, parse_strategy)
+
+
+def project_strategy(
+    input_path: Path,
+    horizon: str | None = None,
+    growth: dict[str, float] | None = None,
+    opening: dict[str, float] | None = None,
+    stats: Stats | None = None,
+    line_items: LineItemClassifier = LINE_ITEMS,
+) -> Projection:
+    """
+    Parse a strategy CSV and expand its periods to every month until horizon (default: the
+    December of the last period's year), see finance_import.projection.
+    """
+    with stage(stats, "format detection"):
+        inp = open_input(input_path)
+    with inp:
+        if inp.format != FORMAT_STRATEGY:
+            raise ValueError(f"--project needs a strategy CSV ('incepand cu ...' periods): {input_path}")
+        periods = _strategy_months(timed(stats, inp.rows(), "read"), stats, line_items)
+    if not periods:
+        raise ValueError(f"No 'incepand cu ...' periods to project: {input_path}")
+    with stage(stats, "projection"):
+        return project(periods, horizon or default_horizon(periods), growth, opening)
+
+
+def _month_arg(value: str) -> str:
+    month = parse_month(value)
+    if month is None:
+        raise argparse.ArgumentTypeError(f"not a month: {value!r} (use YYYY-MM)")
+    return month
+
+
+def _balance_arg(value: str) -> tuple[str, float]:
+    """KEY=NUMBER for --growth / --opening (KEY one of BALANCE_KEYS)."""
+    key, sep, number = value.partition("=")
+    key = key.strip()
+    if not sep or key not in BALANCE_KEYS:
+        raise argparse.ArgumentTypeError(f"expected KEY=NUMBER with KEY one of {', '.join(BALANCE_KEYS)}: {value!r}")
+    try:
+        return key, float(number)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"not a number: {number!r}") from None
+
+
+def _growth_arg(value: str) -> tuple[str, float]:
+    """KEY=RATE for --growth: an annual rate above -1 (-1 would wipe the balance out every month)."""
+    key, rate = _balance_arg(value)
+    if not rate > -1.0:
+        raise argparse.ArgumentTypeError(f"growth rate must be greater than -1 (-100%): {value!r}")
+    return key, rate
 
 
 def main() -> None:
@@ -367,7 +865,7 @@ def main() -> None:
         "input",
         nargs="?",
         default=root / "data" / "buget2025-strategie26.csv",
-        help="Input CSV path (default: data/buget2025-strategie26.csv)",
+        help="Input CSV path, directory or glob (default: data/buget2025-strategie26.csv)",
     )
     parser.add_argument(
         "output",
@@ -375,80 +873,176 @@ def main() -> None:
         default=root / "data" / "finance-import.json",
         help="Output JSON path (default: data/finance-import.json)",
     )
+    parser.add_argument(
+        "--sorted",
+        action="store_true",
+        help="Input rows are in month order: write each month as soon as the next one starts",
+    )
+    parser.add_argument(
+        "--full",
+        action="store_true",
+        help="Ignore the sidecar cache and re-parse every row (the cache is rebuilt)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Stream without reading or writing the sidecar cache (implied by --sorted and --memory-budget)",
+    )
+    parser.add_argument(
+        "--project",
+        action="store_true",
+        help="Strategy CSV: write a record for every month, each period lasting until the next one "
+        "(the last until --horizon)",
+    )
+    parser.add_argument(
+        "--horizon",
+        type=_month_arg,
+        metavar="YYYY-MM",
+        help="With --project, last projected month (default: December of the last period's year)",
+    )
+    parser.add_argument(
+        "--growth",
+        type=_growth_arg,
+        action="append",
+        default=[],
+        metavar="KEY=RATE",
+        help="With --project, annual growth rate of the economii or investitii balance (e.g. investitii=0.07)",
+    )
+    parser.add_argument(
+        "--opening",
+        type=_balance_arg,
+        action="append",
+        default=[],
+        metavar="KEY=AMOUNT",
+        help="With --project, economii or investitii balance before the first projected month",
+    )
+    parser.add_argument(
+        "--projection",
+        metavar="PATH",
+        help="Write the projected balances and the app's income estimates as JSON to PATH (implies --project)",
+    )
+    parser.add_argument(
+        "--rules",
+        metavar="PATH",
+        help="JSON line-item rules for strategy CSVs, added to the built-in ones (see finance_import.line_items)",
+    )
+    add_output_args(
+        parser,
+        workers_help="Worker processes for directory/glob input, or for one large table streamed with --no-cache "
+        "or --sorted (default: one per CPU)",
+        memory_budget_help="Bound the month aggregates of an unsorted table to SIZE (e.g. 64M): sorted runs are "
+        "spilled to temp files and merged (implies --no-cache)",
+    )
     args = parser.parse_args()
 
     input_path = Path(args.input)
     output_path = Path(args.output)
+    target = output_target(output_path, args.gzip, args.shard_by_year)
+    now_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+
+    merge_into = Path(args.merge_into) if args.merge_into else None
+    try:
+        line_items = load_rules(Path(args.rules), LINE_ITEM_SKIP, LINE_ITEM_TO_KEY) if args.rules else LINE_ITEMS
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    stats = new_stats(args, "csv-to-finance-import", target)
+
+    projecting = args.project or bool(args.projection)
+    if is_batch_input(args.input):
+        if projecting:
+            print("Error: --project takes one strategy CSV, not a directory or glob")
+            raise SystemExit(1)
+        paths = expand_inputs(args.input, (".csv", *WORKBOOK_SUFFIXES))
+        if not paths:
+            print(f"Error: no CSV files match: {args.input}")
+            raise SystemExit(1)
+        start = time.perf_counter()
+        try:
+            with stats.stage("parsing"):
+                results = run_batch(
+                    paths, partial(convert_file, line_items=line_items, sources=args.validate), args.workers
+                )
+            print_timings(results, time.perf_counter() - start)
+            with stats.stage("aggregation"):
+                merged = merge_by_month(results)
+            count = write_output(args, merged, now_iso, stats)
+        except ValueError as e:
+            print(f"Error: {e}")
+            raise SystemExit(1)
+        print(f"Wrote {count} month(s) to {target}")
+        report_stats(args, stats)
+        return
 
     if not input_path.exists():
         print(f"Error: input file not found: {input_path}")
         print("Usage: python scripts/csv-to-finance-import.py [input.csv] [output.json]")
         raise SystemExit(1)
 
-    now_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    ambiguous: list[tuple[int, str, str]] = []
+    cache = None
+    projection = None
+    try:
+        if projecting:
+            growth, opening = dict(args.growth), dict(args.opening)
+            projection = project_strategy(input_path, args.horizon, growth, opening, stats, line_items)
+            records: Iterable[MonthRecord] = [
+                MonthRecord(m, {"me": a, "wife": a}) for m, a in zip(projection.months, projection.amounts)
+            ]
+        elif args.no_cache or args.sorted or args.memory_budget:
+            # --validate cites the input rows of bad records
+            first_rows: dict[str, int] | None = {} if args.validate else None
+            months = iter_months(
+                input_path, stats, args.sorted, ambiguous, line_items, args.workers, args.memory_budget, first_rows
+            )
+            records = cite_rows((MonthRecord(m, {"me": a, "wife": a}) for m, a in months), input_path.name, first_rows)
+        else:
+            records, cache = convert_cached(
+                input_path, cache_path_for(output_path), args.full, stats, ambiguous, line_items
+            )
+    except ValueError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
 
-    # Read raw rows to detect format
-    with open(input_path, newline="", encoding="utf-8-sig") as f:
-        raw_rows = list(csv.reader(f))
-
-    records: list[dict] = []
-
-    if raw_rows and is_strategy_format(raw_rows):
-        # Strategy format: first column = label, second = amount; "incepand cu ..." starts period
-        parsed = parse_strategy_csv(raw_rows)
-        for month_str, amounts in parsed:
-            records.append({
-                "month": month_str,
-                "people": {
-                    "me": amounts,
-                    "wife": {k: v for k, v in amounts.items()},
-                },
-                "meta": {"updatedAt": now_iso, "isSaved": False},
-            })
-        records.sort(key=lambda r: r["month"])
-    else:
-        # Table format: first row = headers, one row per month
-        if not raw_rows:
-            print("Error: CSV is empty.")
-            raise SystemExit(1)
-        fieldnames = raw_rows[0]
-        rows_as_dicts = [dict(zip(fieldnames, row)) for row in raw_rows[1:] if len(row) >= len(fieldnames)]
-        if not fieldnames:
-            print("Error: CSV has no header row.")
-            raise SystemExit(1)
+    if projection is not None and args.projection:
+        document = projection_document(projection, ["me", "wife"], growth, opening)
+        with atomic_open(Path(args.projection)) as f:
+            if args.compact:
+                json.dump(document, f, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+            else:
+                json.dump(document, f, ensure_ascii=False, indent=2)
+        print(f"Wrote the projection of {len(projection.months)} month(s) to {args.projection}")
 
-        month_col_norm, header_to_key = build_header_to_key(fieldnames)
-        month_col_raw = None
-        for h in fieldnames:
-            if normalize_header(h) == month_col_norm:
-                month_col_raw = h
-                break
-
-        skipped = 0
-        for row in rows_as_dicts:
-            month_value = row.get(month_col_raw or "", "").strip() if month_col_raw else ""
-            month = parse_month(month_value)
-            if not month:
-                month = datetime.now(timezone.utc).strftime("%Y-%m")
-                if month_value:
-                    skipped += 1
-            amounts = row_to_category_amounts(row, header_to_key)
-            records.append({
-                "month": month,
-                "people": {"me": amounts, "wife": {k: v for k, v in amounts.items()}},
-                "meta": {"updatedAt": now_iso, "isSaved": False},
-            })
-        records.sort(key=lambda r: r["month"])
-        if skipped:
-            print(f"Skipped {skipped} row(s) with invalid month (used fallback).")
-
-    schema = {"version": SCHEMA_VERSION, "data": records}
-
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(schema, f, ensure_ascii=False, indent=2)
-
-    print(f"Wrote {len(records)} month(s) to {output_path}")
+    if cache is not None:
+        print(f"Parsed {cache.parsed} row range(s), reused {cache.reused} from {cache.path.name}")
+        stats.info.update(rangesParsed=cache.parsed, rangesReused=cache.reused)
+        digest = output_key(args, records_digest(records))
+        # A merge target can change between runs, so merged output is always rewritten
+        if merge_into is None and digest == cache.output_digest and output_exists(args, target):
+            cache.save(digest)
+            print(f"Output unchanged: {target}")
+            report_stats(args, stats)
+            return
+    try:
+        count = write_output(args, records, now_iso, stats)
+    except BackupValidationError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    except ValueError as e:
+        hint = " (drop --sorted to accept unsorted input)" if args.sorted else ""
+        print(f"Error: {e}{hint}")
+        raise SystemExit(1)
+    if cache is not None:
+        cache.save(digest)
+
+    if stats.skipped.get(SKIP_BAD_MONTH):
+        print(f"Skipped {stats.skipped[SKIP_BAD_MONTH]} row(s) with invalid month (used fallback).")
+    if ambiguous:
+        print(f"Warning: {len(ambiguous)} ambiguous number(s) read as thousands in dot-decimal columns:")
+        for row_number, header, cell in sorted(ambiguous)[:MAX_REPORTED_AMBIGUOUS]:
+            print(f"  row {row_number}, column {header!r}: {cell!r} -> {parse_number(cell):g}")
+    print(f"Wrote {count} month(s) to {target}")
+    report_stats(args, stats)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Show what importing a converted backup would change in the backup exported from the app, and
+optionally write a patch backup with only the changed months.
+
+Usage:
+  python scripts/diff-finance-backups.py finance-dashboard-backup-2025-06-01.json data/finance-import.json
+  python scripts/diff-finance-backups.py app-backup.json data/finance-import.json \\
+      --changeset changes.json --patch data/finance-patch.json
+
+Months are compared by amounts only (see finance_import.diff): each added, removed or changed
+month is printed with its per-category deltas per profile. --changeset writes them as JSON;
+--patch writes a v3 backup with the new backup's added and changed months, to import in the
+app's merge mode (Settings -> Import, merge). Removed months are reported but not patched.
+"""
+
+import argparse
+import json
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from finance_import.backup import DEFAULT_PROFILES, SCHEMA_VERSION, load_backup, people_ids, profiles_for
+from finance_import.diff import ADDED, CHANGED, REMOVED, BackupIndex, diff_backups, patch_records
+from finance_import.writer import COMPACT_SEPARATORS, atomic_open, write_output
+
+
+# Category deltas printed per profile (the changeset has all of them)
+MAX_PRINTED_DELTAS = 6
+
+
+def _format_deltas(deltas: dict[str, dict[str, float]]) -> str:
+    parts = []
+    for profile_id, changed in deltas.items():
+        cells = [f"{key} {value:+.2f}" for key, value in changed.items()]
+        if len(cells) > MAX_PRINTED_DELTAS:
+            cells[MAX_PRINTED_DELTAS:] = [f"... {len(cells) - MAX_PRINTED_DELTAS} more"]
+        parts.append(f"{profile_id}: {', '.join(cells) or '(all zero)'}")
+    return "; ".join(parts)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Diff two backups by month and write a patch backup.")
+    parser.add_argument("old", help="Current backup, e.g. exported from the app (v2 or v3, .gz is decompressed)")
+    parser.add_argument("new", help="Backup to compare it with, e.g. a converter's output")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=0.0,
+        help="Ignore category deltas up to this absolute size (default: 0, exact)",
+    )
+    parser.add_argument("--changeset", metavar="PATH", help="Write the changeset as JSON to PATH")
+    parser.add_argument(
+        "--patch", metavar="PATH", help="Write a v3 backup with only the added and changed months to PATH"
+    )
+    parser.add_argument("--compact", action="store_true", help="Write minified JSON (no indentation or newlines)")
+    parser.add_argument("--gzip", action="store_true", help="Gzip the patch (.gz is appended to its name)")
+    parser.add_argument("--quiet", action="store_true", help="Print only the summary line")
+    parser.add_argument(
+        "--exit-code", action="store_true", help="Exit with status 1 when the backups differ (as git diff)"
+    )
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    try:
+        old_records, _ = load_backup(Path(args.old))
+        new_records, new_profiles = load_backup(Path(args.new))
+        old, new = BackupIndex(old_records), BackupIndex(new_records)
+        changeset = diff_backups(old, new, args.tolerance)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    seconds = time.perf_counter() - start
+
+    if not args.quiet:
+        for change in changeset.changes:
+            print(f"{change.month}  {change.change:<7}  {_format_deltas(change.deltas)}")
+    print(
+        f"{changeset.count(ADDED)} added, {changeset.count(REMOVED)} removed, {changeset.count(CHANGED)} changed, "
+        f"{changeset.unchanged} unchanged month(s) ({seconds:.3f}s)"
+    )
+
+    if args.changeset:
+        with atomic_open(Path(args.changeset)) as f:
+            json.dump(
+                changeset.to_dict(),
+                f,
+                ensure_ascii=False,
+                indent=None if args.compact else 2,
+                separators=COMPACT_SEPARATORS if args.compact else None,
+            )
+            f.write("\n")
+        print(f"Wrote the changeset to {args.changeset}")
+    if args.patch:
+        now_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        records = list(patch_records(changeset, new, now_iso))
+        profiles = profiles_for(people_ids(records), new_profiles or DEFAULT_PROFILES)
+        count, target = write_output(
+            Path(args.patch), SCHEMA_VERSION, records, now_iso, profiles, args.compact, args.gzip
+        )
+        print(f"Wrote {count} month(s) to {target}")
+        if changeset.count(REMOVED):
+            print(f"{changeset.count(REMOVED)} removed month(s) are not in the patch (an import cannot delete months)")
+    if args.exit_code and changeset.changes:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Convert a backup back to a spreadsheet CSV that the converters read: the way back from data
+edited in the app (Settings -> Export) to the budget sheets.
+
+Usage:
+  python scripts/export-finance-backup.py finance-dashboard-backup-2025-06-01.json data/buget.csv
+  python scripts/export-finance-backup.py backup.json.gz data/buget.tsv --persons persons.json
+  python scripts/export-finance-backup.py backup.json data/buget-tabel.csv --layout table --profile wife
+
+Layouts:
+  persons  persoana,luna,<26 categories>: one row per profile and month, persons named by
+           --persons (default Paul -> me, Codru -> wife), as tsv-to-finance-json.py reads it
+  table    Luna,<26 categories>: one row per month with one profile's amounts (--profile,
+           default the first mapped profile), as csv-to-finance-import.py reads it
+
+Converting the exported file again gives the same records: amounts are written exactly (with a
+comma decimal and no thousands separator, see finance_import.numbers.format_number) and months
+as YYYY-MM. The table layout holds one profile: months where the other profiles differ are
+counted and reported, and profiles without a person are skipped and reported.
+
+The backup is streamed one record at a time (see finance_import.reader), so memory does not
+grow with its size; the output is written atomically. A .tsv output is tab-delimited.
+"""
+
+import argparse
+import csv
+import time
+from collections import Counter
+from operator import itemgetter
+from pathlib import Path
+from typing import Iterable, Iterator
+
+from finance_import.numbers import format_number
+from finance_import.persons import DEFAULT_PERSONS, PersonMap, load_persons
+from finance_import.reader import BackupReader
+from finance_import.records import CATEGORY_KEYS
+from finance_import.writer import atomic_open
+
+LAYOUT_PERSONS = "persons"
+LAYOUT_TABLE = "table"
+LAYOUTS = (LAYOUT_PERSONS, LAYOUT_TABLE)
+
+PERSONS_HEADER = ["persoana", "luna", *CATEGORY_KEYS]
+TABLE_HEADER = ["Luna", *CATEGORY_KEYS]
+
+_AMOUNTS = itemgetter(*CATEGORY_KEYS)
+_NUMBER_TYPES = frozenset([int, float])
+
+# Skipped-record reasons
+SKIP_INVALID_RECORD = "invalidRecord"
+SKIP_MISSING_PROFILE = "missingProfile"
+
+
+def _month_people(record: object) -> tuple[str | None, dict]:
+    if isinstance(record, dict):
+        month, people = record.get("month"), record.get("people")
+        if isinstance(month, str) and isinstance(people, dict):
+            return month, people
+    return None, {}
+
+
+def _cells(amounts: object, month: str) -> list[str]:
+    """A profile's 26 amounts as cells (missing keys are 0)."""
+    if not isinstance(amounts, dict):
+        raise ValueError(f"{month}: amounts are not an object")
+    try:
+        values = _AMOUNTS(amounts)
+    except KeyError:
+        values = tuple(amounts.get(key, 0) for key in CATEGORY_KEYS)
+    for key, value in zip(CATEGORY_KEYS, values):
+        # bool is an int, but not an amount
+        if type(value) not in _NUMBER_TYPES:
+            raise ValueError(f"{month}: {key} is not a number ({value!r})")
+    return list(map(format_number, values))
+
+
+def person_rows(
+    records: Iterable[object], persons: PersonMap, skipped: Counter, unmapped: Counter
+) -> Iterator[list[str]]:
+    """Header, then one row per mapped profile of every record; other profiles go to unmapped."""
+    yield PERSONS_HEADER
+    person_of = {profile_id: persons.person(profile_id) for profile_id in persons.profile_ids}
+    for record in records:
+        month, people = _month_people(record)
+        if month is None:
+            skipped[SKIP_INVALID_RECORD] += 1
+            continue
+        for profile_id, amounts in people.items():
+            person = person_of.get(profile_id)
+            if person is None:
+                unmapped[profile_id] += 1
+                continue
+            yield [person, month, *_cells(amounts, month)]
+
+
+def table_rows(
+    records: Iterable[object], profile_id: str, skipped: Counter, differing: Counter
+) -> Iterator[list[str]]:
+    """Header, then one row per record with profile_id's amounts; differing counts other profiles' differing months."""
+    yield TABLE_HEADER
+    for record in records:
+        month, people = _month_people(record)
+        if month is None:
+            skipped[SKIP_INVALID_RECORD] += 1
+            continue
+        amounts = people.get(profile_id)
+        if amounts is None:
+            skipped[SKIP_MISSING_PROFILE] += 1
+            continue
+        for other_id, other in people.items():
+            if other_id != profile_id and other != amounts:
+                differing[other_id] += 1
+        yield [month, *_cells(amounts, month)]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Convert a backup JSON back to a CSV the converters read.")
+    parser.add_argument("backup", help="Backup JSON, v2 or v3 (.gz is decompressed)")
+    parser.add_argument("output", help="CSV to write (.tsv is tab-delimited)")
+    parser.add_argument(
+        "--layout",
+        choices=LAYOUTS,
+        default=LAYOUT_PERSONS,
+        help="persons: persoana,luna rows per profile (default); table: Luna rows with one profile",
+    )
+    parser.add_argument(
+        "--persons",
+        metavar="PATH",
+        default=None,
+        help="Person -> profile config, as tsv-to-finance-json.py --persons (default: Paul -> me, Codru -> wife)",
+    )
+    parser.add_argument(
+        "--profile", default=None, help="Profile written by --layout table (default: the first mapped profile)"
+    )
+    args = parser.parse_args()
+
+    backup_path = Path(args.backup)
+    output = Path(args.output)
+    skipped: Counter = Counter()
+    # profile id -> months left out: unmapped (persons layout) or different from --profile (table layout)
+    left_out: Counter = Counter()
+    start = time.perf_counter()
+    try:
+        persons = load_persons(Path(args.persons)) if args.persons else DEFAULT_PERSONS
+        profile_id = args.profile or persons.profile_ids[0]
+        with BackupReader(backup_path) as reader, atomic_open(output) as f:
+            if args.layout == LAYOUT_TABLE:
+                rows = table_rows(reader.records(), profile_id, skipped, left_out)
+            else:
+                rows = person_rows(reader.records(), persons, skipped, left_out)
+            w = csv.writer(f, delimiter="\t" if output.suffix.lower() == ".tsv" else ",", lineterminator="\n")
+            count = -1  # the header
+            for row in rows:
+                w.writerow(row)
+                count += 1
+            profile_names = {p.get("id"): p.get("name") for p in reader.profiles or [] if isinstance(p, dict)}
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    seconds = time.perf_counter() - start
+
+    if skipped:
+        print(f"Skipped record(s): {', '.join(f'{n} {reason}' for reason, n in skipped.items())}")
+    listed = ", ".join(
+        f"{pid} ({profile_names[pid]}, {n} month(s))" if profile_names.get(pid) else f"{pid} ({n} month(s))"
+        for pid, n in left_out.items()
+    )
+    if args.layout == LAYOUT_TABLE and left_out:
+        print(f"Not written, amounts differ from {profile_id!r}: {listed} (--layout persons keeps every profile)")
+    elif left_out:
+        print(f"Skipped profile(s) without a person: {listed}; map them with --persons")
+    print(f"Wrote {count} row(s) to {output} ({seconds:.3f}s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+#!/usr/bin/env python3
+"""
+Sum or average categories over converted history, from the columns file a converter wrote
+with --columns (see finance_import.columnar), without parsing the backup JSON.
+
+Usage:
+  python scripts/finance-query.py data/finance-import.json --category alimente --by year
+  python scripts/finance-query.py data/finance-import.json.columns -c sala -c tazz \\
+      --profile me --from 2024-01 --to 2024-12 --avg
+
+The path is the columns file or the backup it sits next to. Without --category all 26
+categories are queried; without --profile the profiles are summed. --avg divides each sum by
+the months in the period that have data for the selected profiles.
+"""
+
+import argparse
+import json
+import time
+from pathlib import Path
+
+from finance_import.columnar import GROUP_BY, ColumnarCache, columns_path_for
+from finance_import.months import parse_month
+
+
+def _month(value: str) -> str:
+    month = parse_month(value)
+    if month is None:
+        raise argparse.ArgumentTypeError(f"not a month: {value!r} (use YYYY-MM)")
+    return month
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the columns file of a converted backup.")
+    parser.add_argument("path", help="Columns file, or the backup JSON it was written next to")
+    parser.add_argument("-c", "--category", action="append", help="Category key (repeatable; default: all)")
+    parser.add_argument("-p", "--profile", action="append", help="Profile id (repeatable; default: all, summed)")
+    parser.add_argument("--from", dest="first", type=_month, metavar="YYYY-MM", help="First month (inclusive)")
+    parser.add_argument("--to", dest="last", type=_month, metavar="YYYY-MM", help="Last month (inclusive)")
+    parser.add_argument("--by", choices=GROUP_BY, default="all", help="Group by month, year or not at all (default)")
+    parser.add_argument("--avg", action="store_true", help="Average per month with data instead of the sum")
+    parser.add_argument("--json", action="store_true", help="Print the rows as JSON")
+    args = parser.parse_args()
+
+    path = Path(args.path)
+    if path.suffix != ".columns" and columns_path_for(path).exists():
+        path = columns_path_for(path)
+    start = time.perf_counter()
+    try:
+        cache = ColumnarCache(path)
+        rows = cache.query(args.category, args.profile, args.first, args.last, args.by)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    seconds = time.perf_counter() - start
+
+    keys = args.category or cache.keys
+    values = [{k: s / row.months if args.avg else s for k, s in row.sums.items()} for row in rows]
+    if args.json:
+        out = [{"period": row.period, "months": row.months, **v} for row, v in zip(rows, values)]
+        print(json.dumps(out, ensure_ascii=False, indent=2))
+        return
+    widths = [max(len(k), 12) for k in keys]
+    print("period   months  " + "  ".join(k.rjust(w) for k, w in zip(keys, widths)))
+    for row, v in zip(rows, values):
+        cells = "  ".join(f"{v[k]:{w}.2f}" for k, w in zip(keys, widths))
+        print(f"{row.period:<7}  {row.months:>6}  {cells}")
+    print(f"{len(rows)} row(s) from {len(cache.months)} month(s) in {seconds:.3f}s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""
+Compute the dashboard totals of an existing backup (v2 or v3, e.g. exported from the app).
+
+Usage:
+  python scripts/finance-totals.py data/finance-import.json
+  python scripts/finance-totals.py backup.json --output backup-with-totals.json
+
+Without --output the totals section (see finance_import.totals) is printed as JSON; with it
+the backup is written to that path as a v3 backup with the section added, as the converters'
+--totals option writes it.
+"""
+
+import argparse
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+
+from finance_import.backup import DEFAULT_PROFILES, SCHEMA_VERSION, load_backup
+from finance_import.totals import TotalsBuilder
+from finance_import.writer import write_backup
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compute precomputed dashboard totals for a backup.")
+    parser.add_argument("backup", help="Backup JSON (v2 or v3)")
+    parser.add_argument("--output", metavar="PATH", help="Write the backup with a totals section to PATH")
+    parser.add_argument("--compact", action="store_true", help="Write minified JSON (no indentation or newlines)")
+    args = parser.parse_args()
+
+    path = Path(args.backup)
+    try:
+        records, profiles = load_backup(path)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
+    # The app combines its profiles list; a v2 backup is imported with the default profiles
+    if profiles is None:
+        profiles = [dict(p) for p in DEFAULT_PROFILES]
+
+    if args.output is None:
+        builder = TotalsBuilder(profiles)
+        for record in records:
+            builder.add(record)
+        separators = (",", ":") if args.compact else None
+        print(json.dumps(builder.build(), ensure_ascii=False, indent=None if args.compact else 2, separators=separators))
+        return
+
+    now_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    count = write_backup(Path(args.output), SCHEMA_VERSION, records, now_iso, profiles, args.compact, totals=True)
+    print(f"Wrote {count} month(s) with totals to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+"""
+Shared helpers for the m-finance-dash import scripts.
+
+The scripts in scripts/ are run directly (python scripts/<name>.py), so this package is
+importable from them without installation.
+"""
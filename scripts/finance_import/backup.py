@@ -0,0 +1,156 @@
+"""
+App backup schema (v3) and month-indexed upsert into an existing backup.
+
+The converters emit FullBackupSchema v3 directly ({"version": 3, "data": [...], "profiles":
+[...]}, people keyed by profile id), so importing skips migrateData's v2 -> v3 path.
+upsert_records() merges converted records into a backup exported from the app (Settings ->
+Export) through a month index instead of appending duplicate months.
+"""
+
+import gzip
+import json
+from pathlib import Path
+from typing import Iterable
+
+from .records import MonthRecord
+
+# App schema version (must match lib/storage/storage.ts CURRENT_VERSION)
+SCHEMA_VERSION = 3
+
+# Default profiles (must match lib/constants.ts DEFAULT_PROFILES)
+DEFAULT_PROFILES = [
+    {"id": "me", "name": "Paul"},
+    {"id": "wife", "name": "Codru"},
+]
+
+# What upsert_records does when a converted month already exists in the backup:
+#   replace - the converted record wins
+#   keep    - the existing record wins
+#   newer   - the later meta.updatedAt wins, ties go to the converted record (as the app's merge import)
+#   merge   - converted profiles replace the existing ones; other existing profiles are kept
+CONFLICT_POLICIES = ("replace", "keep", "newer", "merge")
+
+
+def profiles_for(
+    profile_ids: Iterable[str], existing: list[dict] | None = None, named: list[dict] | None = None
+) -> list[dict]:
+    """
+    Profiles list for a backup: existing profiles first (in their order), then any other id
+    used by the data, named from named (default: DEFAULT_PROFILES) or after the id.
+    """
+    out = [dict(p) for p in existing or []]
+    known = {p.get("id") for p in out}
+    names = {p["id"]: p["name"] for p in (DEFAULT_PROFILES if named is None else named)}
+    for profile_id in profile_ids:
+        if profile_id not in known:
+            out.append({"id": profile_id, "name": names.get(profile_id, profile_id)})
+            known.add(profile_id)
+    return out
+
+
+def used_profiles(profile_ids: Iterable[str], named: list[dict] | None = None) -> list[dict]:
+    """
+    Profiles list for the profile ids records use: the ids named lists first (in its order),
+    then the others as first seen. Named from named, then DEFAULT_PROFILES, or after the id.
+    Without ids (no records), the named profiles (default: DEFAULT_PROFILES).
+    """
+    ids = list(dict.fromkeys(profile_ids))
+    named = list(named or [])
+    if not ids:
+        return profiles_for((p["id"] for p in named or DEFAULT_PROFILES), named=named or DEFAULT_PROFILES)
+    listed = {p["id"] for p in named}
+    named.extend(p for p in DEFAULT_PROFILES if p["id"] not in listed)
+    used = set(ids)
+    return profiles_for([*(p["id"] for p in named if p["id"] in used), *ids], named=named)
+
+
+def load_backup(path: Path) -> tuple[list[dict], list[dict] | None]:
+    """
+    Read a v2 or v3 backup (.gz is decompressed). Returns (records, profiles or None). v2
+    records ({me, wife}) are already valid v3 records, so they are returned as they are.
+    """
+    opener = gzip.open if path.suffix == ".gz" else open
+    try:
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except ValueError as e:
+        raise ValueError(f"{path} is not valid JSON: {e}") from e
+    if not isinstance(data, dict) or not isinstance(data.get("data"), list):
+        raise ValueError(f"{path} is not a backup file (expected {{version, data}})")
+    if data.get("version") not in (2, SCHEMA_VERSION):
+        raise ValueError(f"{path}: backup version {data.get('version')} is not supported (need 2 or 3)")
+    profiles = data.get("profiles")
+    return data["data"], profiles if isinstance(profiles, list) else None
+
+
+def upsert_records(
+    existing: list[dict],
+    incoming: Iterable[MonthRecord],
+    now_iso: str,
+    policy: str = "replace",
+) -> tuple[list[MonthRecord | dict], dict[str, int]]:
+    """
+    Upsert incoming records into existing backup records by month. Returns the merged records
+    sorted by month (one per month; for duplicate months in existing the last one counts) and
+    counts of added / updated / kept months.
+    """
+    if policy not in CONFLICT_POLICIES:
+        raise ValueError(f"Unknown conflict policy {policy!r} (use one of {', '.join(CONFLICT_POLICIES)})")
+    by_month: dict[str, MonthRecord | dict] = {}
+    for record in existing:
+        if isinstance(record, dict) and isinstance(record.get("month"), str):
+            by_month[record["month"]] = record
+    stats = {"added": 0, "updated": 0, "kept": 0}
+    for record in incoming:
+        current = by_month.get(record.month)
+        if current is None:
+            by_month[record.month] = record
+            stats["added"] += 1
+        elif policy == "keep" or (policy == "newer" and _updated_at(current) > now_iso):
+            stats["kept"] += 1
+        elif policy == "merge" and isinstance(current, dict):
+            merged = record.to_dict(now_iso)
+            merged["people"] = {**(current.get("people") or {}), **merged["people"]}
+            by_month[record.month] = merged
+            stats["updated"] += 1
+        else:
+            by_month[record.month] = record
+            stats["updated"] += 1
+    return [by_month[month] for month in sorted(by_month)], stats
+
+
+def _updated_at(record: dict) -> str:
+    meta = record.get("meta")
+    value = meta.get("updatedAt") if isinstance(meta, dict) else None
+    return value if isinstance(value, str) else ""
+
+
+def people_ids(records: Iterable[MonthRecord | dict]) -> list[str]:
+    """Profile ids used by records, in first-seen order."""
+    seen: dict[str, None] = {}
+    for record in records:
+        people = record.people if isinstance(record, MonthRecord) else record.get("people") or {}
+        for profile_id in people:
+            seen.setdefault(profile_id, None)
+    return list(seen)
+
+
+def prepare_output(
+    records: Iterable[MonthRecord],
+    now_iso: str,
+    merge_into: Path | None = None,
+    policy: str = "replace",
+    profiles: list[dict] | None = None,
+) -> tuple[Iterable[MonthRecord | dict], list[dict], dict[str, int] | None]:
+    """
+    Records and profiles to write. profiles are the converted records' profiles (default: the
+    app's default me/wife). Without merge_into the records pass through unchanged (still
+    streamed) with those profiles; with it they are upserted into that backup.
+    Returns (records, profiles, upsert counts or None).
+    """
+    named = DEFAULT_PROFILES if profiles is None else profiles
+    if merge_into is None:
+        return records, profiles_for((p["id"] for p in named), named=named), None
+    existing, existing_profiles = load_backup(merge_into)
+    merged, stats = upsert_records(existing, records, now_iso, policy)
+    return merged, profiles_for(people_ids(merged), existing_profiles, named), stats
@@ -0,0 +1,80 @@
+"""
+Batch ingest: expand a directory or glob to input files, parse them in a process pool and
+merge the per-file results by month and profile.
+"""
+
+import glob
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable
+
+from .records import MonthRecord
+
+GLOB_CHARS = ("*", "?", "[")
+
+
+def is_batch_input(spec: str | Path) -> bool:
+    """True when the input names a directory or a glob pattern rather than a single file."""
+    s = str(spec)
+    return Path(s).is_dir() or any(c in s for c in GLOB_CHARS)
+
+
+def expand_inputs(spec: str | Path, suffixes: tuple[str, ...]) -> list[Path]:
+    """Directory -> its files with one of suffixes; glob -> matching files. Sorted by path."""
+    s = str(spec)
+    if Path(s).is_dir():
+        paths = [p for p in Path(s).iterdir() if p.is_file() and p.suffix.lower() in suffixes]
+    else:
+        paths = [Path(p) for p in glob.glob(s, recursive=True) if Path(p).is_file()]
+    return sorted(paths)
+
+
+def _timed(parse_file: Callable[[Path], list[MonthRecord]], path: Path) -> tuple[list[MonthRecord], float]:
+    start = time.perf_counter()
+    result = parse_file(path)
+    return result, time.perf_counter() - start
+
+
+def run_batch(
+    paths: list[Path],
+    parse_file: Callable[[Path], list[MonthRecord]],
+    workers: int | None = None,
+) -> list[tuple[Path, list[MonthRecord], float]]:
+    """
+    Parse every path with parse_file, in parallel across processes. parse_file must be a
+    module-level function so it can be sent to worker processes.
+    Returns (path, months, seconds) in input order.
+    """
+    if workers is None:
+        workers = min(len(paths), os.cpu_count() or 1)
+    if workers <= 1 or len(paths) <= 1:
+        return [(p, *_timed(parse_file, p)) for p in paths]
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_timed, parse_file, p) for p in paths]
+        return [(p, *f.result()) for p, f in zip(paths, futures)]
+
+
+def merge_by_month(results: list[tuple[Path, list[MonthRecord], float]]) -> list[MonthRecord]:
+    """
+    Merge per-file records by (month, profile). When several files provide the same profile for
+    the same month, the later file (in input order) wins, and the record cites its rows
+    (MonthRecord.source) when it has them. Returned sorted by month.
+    """
+    merged: dict[str, MonthRecord] = {}
+    for _, records, _ in results:
+        for record in records:
+            existing = merged.get(record.month)
+            if existing is None:
+                merged[record.month] = MonthRecord(record.month, dict(record.people), record.source)
+            else:
+                existing.people.update(record.people)
+                existing.source = record.source or existing.source
+    return [merged[month] for month in sorted(merged)]
+
+
+def print_timings(results: list[tuple[Path, list[MonthRecord], float]], total_seconds: float) -> None:
+    for path, months, seconds in results:
+        print(f"  {path}: {len(months)} month(s) in {seconds:.3f}s")
+    print(f"Parsed {len(results)} file(s) in {total_seconds:.3f}s")
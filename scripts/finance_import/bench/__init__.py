@@ -0,0 +1,6 @@
+"""
+Converter benchmarks: deterministic input generators (generators.py) and a harness that times
+the scripts' parsing entry points and checks them against a stored baseline (harness.py).
+
+Run with: python scripts/bench-converters.py
+"""
@@ -0,0 +1,171 @@
+"""
+Deterministic synthetic inputs for every converter format.
+
+Each generator writes `rows` data rows (header rows not counted) from a seeded random.Random,
+so the same (format, rows, seed) always produces the same bytes. Months cycle through
+2000-01 .. 2099-12, amounts use the spellings seen in real exports ("2.500", "450,5",
+empty cells) so the number and month parsers do real work.
+"""
+
+import csv
+import random
+from pathlib import Path
+from typing import Callable, Iterator
+
+from ..months import RO_MONTHS
+from ..records import CATEGORY_KEYS
+
+# Row counts the harness runs by default
+SIZES = {"1k": 1_000, "100k": 100_000, "1M": 1_000_000}
+
+FIRST_YEAR = 2000
+YEARS = 100
+
+# Long month names in calendar order ("ianuarie", ..., "decembrie")
+_MONTH_NAMES = sorted(
+    {num: name for name, num in RO_MONTHS.items() if len(name) > 3 or name == "mai"}.items()
+)
+MONTH_NAMES = [name for _, name in _MONTH_NAMES]
+
+# Table headers as they appear in exports (diacritics, mixed case)
+TABLE_HEADERS = [
+    "Venit", "Bonuri", "Extra", "Rate", "Apple", "Întreținere", "Internet", "Gaz", "Curent",
+    "Telefon", "Netflix", "Sală", "Educație", "Sănătate", "Beauty", "Haine", "Diverse",
+    "Transport", "Cadouri", "Vacanțe", "Casă", "Gadgets", "Tazz", "Alimente", "Economii", "Investiții",
+]
+
+# Strategy line items: mapped labels plus labels the parser skips or does not map
+STRATEGY_LABELS = [
+    "credit imobiliar", "credit nevoi", "thermomix", "facturi", "trai",
+    "anticipat - nevoi", "anticipat - imobiliar", "actiuni", "economii",
+    "IN *", "OUT", "diff", "altele",
+]
+STRATEGY_PERIOD_ITEMS = 12
+
+# buget-lunar.tsv second header row (column 13 is not a category)
+TSV_CATEGORY_HEADER = [
+    "venit", "bonuri", "extra", "rate", "apple", "intretinere", "internet", "gaz", "curent",
+    "telefon", "netflix", "x", "sala", "educatie", "sanatate", "beauty", "haine", "diverse",
+    "transport", "alimente", "economii", "investitii",
+]
+PEOPLE = ("Paul", "Codru")
+
+
+def _month(i: int) -> tuple[int, int]:
+    """i-th month of the cycle as (year, month 1..12)."""
+    i %= YEARS * 12
+    return FIRST_YEAR + i // 12, i % 12 + 1
+
+
+def _eu_amount(rng: random.Random) -> str:
+    r = rng.random()
+    if r < 0.1:
+        return ""
+    value = rng.randrange(0, 20000)
+    if r < 0.3:
+        return f"{value // 1000}.{value % 1000:03d}" if value >= 1000 else str(value)
+    if r < 0.45:
+        return f"{value},5"
+    return str(value)
+
+
+def _plain_amount(rng: random.Random) -> str:
+    r = rng.random()
+    if r < 0.05:
+        return ""
+    value = rng.randrange(0, 3000)
+    return f"{value},5" if r < 0.2 else str(value)
+
+
+def _month_cell(i: int) -> str:
+    """Table month cell; spellings rotate per year so format inference sees a mixed column."""
+    year, month = _month(i)
+    style = year % 3
+    if style == 0:
+        return f"{year}-{month:02d}"
+    if style == 1:
+        return f"{month:02d}.{year}"
+    return f"{MONTH_NAMES[month - 1].capitalize()} {year}"
+
+
+def write_table_csv(path: Path, rows: int, seed: int = 0) -> None:
+    """Table format: Luna + category columns; several rows per month, months in order."""
+    rng = random.Random(seed)
+    per_month = max(1, rows // (YEARS * 12))
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["Luna", *TABLE_HEADERS])
+        for i in range(rows):
+            w.writerow([_month_cell(i // per_month), *(_eu_amount(rng) for _ in TABLE_HEADERS)])
+
+
+def write_strategy_csv(path: Path, rows: int, seed: int = 0) -> None:
+    """Strategy format: base line items, then "incepand cu" periods of STRATEGY_PERIOD_ITEMS items."""
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["Cheltuieli lunare", "", "", "", ""])
+        period = 0
+        for i in range(rows):
+            if i % (STRATEGY_PERIOD_ITEMS + 1) == STRATEGY_PERIOD_ITEMS:
+                year, month = _month(period)
+                period += 1
+                w.writerow([f"incepand cu {MONTH_NAMES[month - 1].capitalize()} {year}", "", "", "", ""])
+                continue
+            label = rng.choice(STRATEGY_LABELS)
+            row = ["", label, _eu_amount(rng), "", ""]
+            if rng.random() < 0.3:
+                row[3], row[4] = rng.choice(STRATEGY_LABELS), _eu_amount(rng)
+            w.writerow(row)
+
+
+def _person_rows(rows: int, rng: random.Random, width: int) -> Iterator[list[str]]:
+    """persoana/luna rows: Paul names the month, Codru's row leaves luna empty."""
+    for i in range(rows):
+        person = PEOPLE[i % 2]
+        if person == PEOPLE[0]:
+            year, month = _month(i // 2)
+            luna = f"{MONTH_NAMES[month - 1]} {year}"
+        else:
+            luna = ""
+        yield [person, luna, *(_plain_amount(rng) for _ in range(width))]
+
+
+def write_simple_csv(path: Path, rows: int, seed: int = 0) -> None:
+    """only-1.csv format: persoana,luna,<26 categories>, comma-delimited."""
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f)
+        w.writerow(["persoana", "luna", *CATEGORY_KEYS])
+        w.writerows(_person_rows(rows, rng, len(CATEGORY_KEYS)))
+
+
+def write_two_header_tsv(path: Path, rows: int, seed: int = 0) -> None:
+    """buget-lunar.tsv format: two header rows, tab-delimited, categories from column 2."""
+    rng = random.Random(seed)
+    with path.open("w", encoding="utf-8", newline="") as f:
+        w = csv.writer(f, delimiter="\t", lineterminator="\n")
+        w.writerow(["Persoana", "Luna", "Venituri", *([""] * (len(TSV_CATEGORY_HEADER) - 1))])
+        w.writerow(["", "", *TSV_CATEGORY_HEADER])
+        w.writerows(_person_rows(rows, rng, len(TSV_CATEGORY_HEADER)))
+
+
+# format name -> (file suffix, generator)
+GENERATORS: dict[str, tuple[str, Callable[[Path, int, int], None]]] = {
+    "table": (".csv", write_table_csv),
+    "strategy": (".csv", write_strategy_csv),
+    "simple": (".csv", write_simple_csv),
+    "tsv": (".tsv", write_two_header_tsv),
+}
+
+
+def generate(fmt: str, rows: int, directory: Path, seed: int = 0) -> Path:
+    """Path of the generated input, writing it first unless it already exists."""
+    suffix, write = GENERATORS[fmt]
+    path = directory / f"{fmt}-{rows}-{seed}{suffix}"
+    if not path.exists():
+        directory.mkdir(parents=True, exist_ok=True)
+        tmp = path.with_name(path.name + ".tmp")
+        write(tmp, rows, seed)
+        tmp.replace(path)
+    return path
@@ -0,0 +1,164 @@
+"""
+Benchmark harness: time each converter's parsing entry point on generated inputs and
+compare rows/sec, peak traced memory and the converted output (a digest of every month's
+amounts, so a fast path that gets the numbers wrong fails too) with a stored baseline.
+
+Throughput is the best of at least `repeat` untraced runs (small inputs are rerun until
+MIN_SECONDS have been spent, to keep timer noise out of the check); peak memory comes from
+one extra run under tracemalloc (tracing slows Python down several times, so it is never timed).
+"""
+
+import gc
+import hashlib
+import json
+import time
+import tracemalloc
+from array import array
+from pathlib import Path
+from typing import Callable, Iterable, NamedTuple
+
+from ..formats import load_script
+from .generators import generate
+
+# Default regression tolerances: throughput may drop by SPEED_TOLERANCE and peak memory may
+# grow by MEMORY_TOLERANCE (plus MEMORY_SLACK bytes, which matters for the small inputs)
+SPEED_TOLERANCE = 0.25
+MEMORY_TOLERANCE = 0.10
+MEMORY_SLACK = 256 * 1024
+
+# Small inputs are rerun until this much time is spent (at most MAX_RUNS runs)
+MIN_SECONDS = 0.5
+MAX_RUNS = 100
+
+
+class Result(NamedTuple):
+    fmt: str
+    rows: int
+    seconds: float
+    rows_per_sec: float
+    peak_bytes: int
+    months: int
+    digest: str
+
+
+def output_digest(months: Iterable[tuple[str, dict[str, array]]]) -> tuple[int, str]:
+    """(number of months, digest of the months and their amounts by profile) of a conversion."""
+    h = hashlib.sha256()
+    count = 0
+    for month, people in months:
+        h.update(month.encode("utf-8"))
+        for profile in sorted(people):
+            h.update(b"\x1f" + profile.encode("utf-8") + b"\x1f" + people[profile].tobytes())
+        h.update(b"\x1e")
+        count += 1
+    return count, h.hexdigest()
+
+
+def entry_points(scripts_dir: Path) -> dict[str, Callable[[Path], tuple[int, str]]]:
+    """
+    format -> function parsing one file through its script's entry point and returning the
+    output_digest of the months produced (iterators are drained, nothing is written).
+    """
+    csv_script = load_script(scripts_dir / "csv-to-finance-import.py")
+    tsv_script = load_script(scripts_dir / "tsv-to-finance-json.py")
+
+    def csv_months(path: Path) -> tuple[int, str]:
+        return output_digest((month, {"me": amounts}) for month, amounts in csv_script.iter_months(path))
+
+    def tsv_months(path: Path) -> tuple[int, str]:
+        return output_digest((r.month, r.people) for r in tsv_script.convert_file(path, default_year=2025))
+
+    return {"table": csv_months, "strategy": csv_months, "simple": tsv_months, "tsv": tsv_months}
+
+
+def measure(fmt: str, rows: int, path: Path, parse: Callable[[Path], tuple[int, str]], repeat: int = 3) -> Result:
+    best = float("inf")
+    months, digest = 0, ""
+    runs = 0
+    spent = 0.0
+    while runs < max(1, repeat) or (spent < MIN_SECONDS and runs < MAX_RUNS):
+        gc.collect()
+        start = time.perf_counter()
+        months, digest = parse(path)
+        seconds = time.perf_counter() - start
+        best = min(best, seconds)
+        spent += seconds
+        runs += 1
+    gc.collect()
+    tracemalloc.start()
+    try:
+        parse(path)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return Result(fmt, rows, best, rows / best if best > 0 else float("inf"), peak, months, digest)
+
+
+def run(
+    scripts_dir: Path,
+    formats: list[str],
+    sizes: list[int],
+    data_dir: Path,
+    repeat: int = 3,
+    seed: int = 0,
+    progress: Callable[[Result], None] | None = None,
+) -> list[Result]:
+    parsers = entry_points(scripts_dir)
+    results = []
+    for rows in sizes:
+        for fmt in formats:
+            result = measure(fmt, rows, generate(fmt, rows, data_dir, seed), parsers[fmt], repeat)
+            results.append(result)
+            if progress is not None:
+                progress(result)
+    return results
+
+
+def result_key(fmt: str, rows: int) -> str:
+    return f"{fmt}/{rows}"
+
+
+def load_baseline(path: Path) -> dict[str, dict]:
+    if not path.exists():
+        return {}
+    data = json.loads(path.read_text(encoding="utf-8"))
+    return data.get("results", {}) if isinstance(data, dict) else {}
+
+
+def save_baseline(path: Path, results: list[Result], merge_with: dict[str, dict] | None = None) -> None:
+    """Store results, keeping baseline entries for format/size pairs that were not run."""
+    entries = dict(merge_with or {})
+    for r in results:
+        entries[result_key(r.fmt, r.rows)] = {
+            "rowsPerSec": round(r.rows_per_sec, 1),
+            "peakBytes": r.peak_bytes,
+            "months": r.months,
+            "digest": r.digest,
+        }
+    path.write_text(json.dumps({"results": dict(sorted(entries.items()))}, indent=2) + "\n", encoding="utf-8")
+
+
+def regressions(
+    results: list[Result],
+    baseline: dict[str, dict],
+    speed_tolerance: float = SPEED_TOLERANCE,
+    memory_tolerance: float = MEMORY_TOLERANCE,
+) -> list[str]:
+    """One message per result that is slower, uses more memory or converts differently than its baseline."""
+    problems = []
+    for r in results:
+        key = result_key(r.fmt, r.rows)
+        base = baseline.get(key)
+        if base is None:
+            continue
+        min_speed = base["rowsPerSec"] * (1 - speed_tolerance)
+        if r.rows_per_sec < min_speed:
+            problems.append(f"{key}: {r.rows_per_sec:,.0f} rows/s, baseline {base['rowsPerSec']:,.0f}")
+        max_peak = base["peakBytes"] * (1 + memory_tolerance) + MEMORY_SLACK
+        if r.peak_bytes > max_peak:
+            problems.append(f"{key}: peak {r.peak_bytes:,} bytes, baseline {base['peakBytes']:,}")
+        if "months" in base and r.months != base["months"]:
+            problems.append(f"{key}: {r.months} months, baseline {base['months']}")
+        elif "digest" in base and r.digest != base["digest"]:
+            problems.append(f"{key}: converted amounts differ from the baseline's (digest {r.digest[:12]})")
+    return problems
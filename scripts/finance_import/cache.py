@@ -0,0 +1,154 @@
+"""
+Sidecar cache for incremental re-conversion.
+
+The input's data rows are split into fixed ranges of CHUNK_ROWS rows. For every range the
+cache stores a hash of its cells, the parser state it started from (e.g. the month carried
+over from earlier rows), the state it ended in and the partial month records it produced.
+On a rerun only ranges whose hash or start state changed are parsed again; the others reuse
+their cached records. Appending rows to the input therefore only parses the last range and
+the new ones.
+
+The cache also keeps a digest of the records last written, so an unchanged conversion does
+not rewrite the output file. The cache lives next to the output as <output>.cache and is
+discarded whenever its key (converter, header rows, options) changes.
+"""
+
+import hashlib
+import json
+from array import array
+from pathlib import Path
+from typing import Callable, Iterable, Iterator
+
+from .records import MonthRecord, MonthSum
+from .writer import atomic_open
+
+CACHE_VERSION = 3
+CHUNK_ROWS = 2048
+
+# parse_chunk(rows, start_state, first_row_offset) -> (partial records, end_state)
+ChunkParser = Callable[[list[list[str]], str | None, int], tuple[list[MonthRecord], str | None]]
+
+
+def cache_path_for(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + ".cache")
+
+
+def rows_digest(rows: Iterable[list[str]]) -> str:
+    h = hashlib.sha256()
+    for row in rows:
+        h.update("\x1f".join(row).encode("utf-8"))
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+def records_digest(records: Iterable[MonthRecord]) -> str:
+    """Digest of months and amounts only (not updatedAt), for skipping unchanged output."""
+    h = hashlib.sha256()
+    for record in records:
+        h.update(record.month.encode("utf-8"))
+        for profile, amounts in record.people.items():
+            h.update(b"\x1f" + profile.encode("utf-8") + b"\x1f")
+            h.update(amounts.tobytes())
+        h.update(b"\x1e")
+    return h.hexdigest()
+
+
+def iter_chunks(rows: Iterable[list[str]], size: int = CHUNK_ROWS) -> Iterator[list[list[str]]]:
+    chunk: list[list[str]] = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+# Partial records may hold a MonthSum (duplicate months still being summed); it is stored
+# as its per-category partials so a later merge stays exact.
+def _encode_amounts(amounts: array | MonthSum) -> list:
+    return [list(p) for p in amounts.partials] if isinstance(amounts, MonthSum) else list(amounts)
+
+
+def _decode_amounts(data: list) -> array | MonthSum:
+    return MonthSum([list(p) for p in data]) if data and isinstance(data[0], list) else array("d", data)
+
+
+# A record's source (its month's first input row) is kept, so reused ranges still cite rows
+def _encode_records(records: list[MonthRecord]) -> list:
+    return [[r.month, {p: _encode_amounts(a) for p, a in r.people.items()}, r.source] for r in records]
+
+
+def _decode_records(data: list) -> list[MonthRecord]:
+    return [
+        MonthRecord(month, {p: _decode_amounts(a) for p, a in people.items()}, tuple(source) if source else None)
+        for month, people, source in data
+    ]
+
+
+class ConversionCache:
+    """Chunk records and output digest from the previous run, keyed by cache_key."""
+
+    def __init__(self, path: Path, cache_key: str, enabled: bool = True) -> None:
+        self.path = path
+        self.key = cache_key
+        self.output_digest: str | None = None
+        # Facts about the whole input the converter keeps across runs (JSON values)
+        self.info: dict[str, object] = {}
+        self._old: list[dict] = []
+        self._new: list[dict] = []
+        self.reused = 0
+        self.parsed = 0
+        if enabled and path.exists():
+            try:
+                data = json.loads(path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                data = None
+            if isinstance(data, dict) and data.get("version") == CACHE_VERSION and data.get("key") == cache_key:
+                self._old = data.get("chunks", [])
+                self.output_digest = data.get("outputDigest")
+                if isinstance(data.get("info"), dict):
+                    self.info = data["info"]
+
+    def convert(self, chunks: Iterable[list[list[str]]], parse_chunk: ChunkParser) -> Iterator[list[MonthRecord]]:
+        """Yield each chunk's partial records, parsing only the chunks that are not cached."""
+        state: str | None = None
+        offset = 0
+        for i, rows in enumerate(chunks):
+            digest = rows_digest(rows)
+            old = self._old[i] if i < len(self._old) else None
+            if old is not None and old["hash"] == digest and old["startState"] == state:
+                records = _decode_records(old["records"])
+                end_state = old["endState"]
+                self._new.append(old)
+                self.reused += 1
+            else:
+                records, end_state = parse_chunk(rows, state, offset)
+                self._new.append(
+                    {
+                        "hash": digest,
+                        "startState": state,
+                        "endState": end_state,
+                        "records": _encode_records(records),
+                    }
+                )
+                self.parsed += 1
+            state = end_state
+            offset += len(rows)
+            yield records
+
+    def save(self, output_digest: str) -> None:
+        self.output_digest = output_digest
+        data = {
+            "version": CACHE_VERSION,
+            "key": self.key,
+            "outputDigest": output_digest,
+            "info": self.info,
+            "chunks": self._new,
+        }
+        with atomic_open(self.path) as f:
+            json.dump(data, f, separators=(",", ":"))
+
+
+def cache_key(*parts: object) -> str:
+    return hashlib.sha256(json.dumps([CACHE_VERSION, *parts], default=str).encode("utf-8")).hexdigest()
@@ -0,0 +1,141 @@
+"""
+Command-line options the converter scripts share: how the backup is written (--compact,
+--gzip, --shard-by-year, --validate, --columns, --totals, --merge-into / --on-conflict), how
+the conversion runs (--workers, --memory-budget) and what it reports (--stats, --stats-json,
+--profile).
+
+A script calls add_output_args(parser) next to its own options, then write_output(args, ...)
+to write the converted records and report_stats(args, stats) once it is done.
+"""
+
+import argparse
+from pathlib import Path
+from typing import Iterable
+
+from .backup import CONFLICT_POLICIES, SCHEMA_VERSION, prepare_output
+from .cache import cache_key
+from .columnar import ColumnarBuilder, columns_path_for
+from .records import MonthRecord
+from .spill import parse_size
+from .stats import Stats
+from .validate import BackupValidator
+from .writer import write_output as write_backup_output
+
+
+def add_output_args(parser: argparse.ArgumentParser, workers_help: str, memory_budget_help: str) -> None:
+    """Add the shared options; --workers and --memory-budget apply to different inputs per script."""
+    parser.add_argument("--workers", type=int, default=None, help=workers_help)
+    parser.add_argument("--memory-budget", type=parse_size, metavar="SIZE", help=memory_budget_help)
+    parser.add_argument(
+        "--merge-into",
+        metavar="BACKUP",
+        help="Upsert the converted months into this exported app backup (v2 or v3) by month",
+    )
+    parser.add_argument(
+        "--on-conflict",
+        choices=CONFLICT_POLICIES,
+        default="replace",
+        help="With --merge-into, what to do with months already in the backup (default: replace)",
+    )
+    parser.add_argument("--compact", action="store_true", help="Write minified JSON (no indentation or newlines)")
+    parser.add_argument("--gzip", action="store_true", help="Gzip the output (.gz is appended to the output name)")
+    parser.add_argument(
+        "--shard-by-year",
+        action="store_true",
+        help="Write one backup per year (<name>-YYYY.json) plus <name>.manifest.json",
+    )
+    parser.add_argument(
+        "--validate",
+        action="store_true",
+        help="Check the records against the app's schema while writing; on violations report them and keep "
+        "the old output",
+    )
+    parser.add_argument(
+        "--columns",
+        action="store_true",
+        help="Also write <output>.columns, a columnar binary copy of the amounts for scripts/finance-query.py",
+    )
+    parser.add_argument(
+        "--totals",
+        action="store_true",
+        help="Add precomputed dashboard totals (per month, year and rolling window) to the backup",
+    )
+    parser.add_argument("--stats", action="store_true", help="Print per-stage timings and row/cell counters")
+    parser.add_argument("--stats-json", metavar="PATH", help="Write the timings and counters as JSON (for monitoring)")
+    parser.add_argument(
+        "--profile",
+        metavar="PATH",
+        help="Run the parsing stage under cProfile and dump the profile (pstats format) to PATH",
+    )
+
+
+def new_stats(args: argparse.Namespace, script: str, target: Path) -> Stats:
+    """Stats collecting what --stats, --stats-json and --profile report."""
+    stats = Stats(timing=args.stats or bool(args.stats_json), profile=bool(args.profile))
+    stats.info.update(script=script, input=str(args.input), output=str(target))
+    return stats
+
+
+def report_stats(args: argparse.Namespace, stats: Stats) -> None:
+    if args.stats:
+        stats.print_summary()
+    if args.stats_json:
+        stats.write_json(Path(args.stats_json))
+    if args.profile:
+        stats.dump_profile(Path(args.profile))
+
+
+def output_key(args: argparse.Namespace, records_digest: str) -> str:
+    """Sidecar-cache digest of the output: the records and the options that change its files."""
+    # The output layout is part of the digest, so switching e.g. to --gzip rewrites the output
+    return cache_key(
+        records_digest, args.compact, args.gzip, args.shard_by_year, args.totals, args.validate, args.columns
+    )
+
+
+def output_exists(args: argparse.Namespace, target: Path) -> bool:
+    """Whether every file the output options write is there (target is output_target's)."""
+    return target.exists() and (not args.columns or columns_path_for(Path(args.output)).exists())
+
+
+def write_output(
+    args: argparse.Namespace,
+    records: Iterable[MonthRecord],
+    now_iso: str,
+    stats: Stats,
+    profiles: list[dict] | None = None,
+) -> int:
+    """
+    Write records to args.output as the output options ask (merged into --merge-into first,
+    profiles as prepare_output takes them) and return the month count. Raises ValueError for
+    a bad merge target, a schema violation (BackupValidationError) or a streamed input error.
+    """
+    merge_into = Path(args.merge_into) if args.merge_into else None
+    output_path = Path(args.output)
+    with stats.stage("serialization"):
+        out_records, profiles, merge_stats = prepare_output(records, now_iso, merge_into, args.on_conflict, profiles)
+        columns = ColumnarBuilder() if args.columns else None
+        if columns is not None:
+            out_records = columns.observe(out_records)
+        count, _ = write_backup_output(
+            output_path,
+            SCHEMA_VERSION,
+            out_records,
+            now_iso,
+            profiles,
+            args.compact,
+            args.gzip,
+            args.shard_by_year,
+            stats,
+            args.totals,
+            BackupValidator() if args.validate else None,
+        )
+        if columns is not None:
+            columns.write(columns_path_for(output_path))
+    stats.count("months", count)
+    if merge_stats is not None:
+        print(
+            f"Merged into {merge_into}: {merge_stats['added']} added, {merge_stats['updated']} updated, "
+            f"{merge_stats['kept']} kept ({args.on_conflict})"
+        )
+    return count
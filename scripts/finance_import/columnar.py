@@ -0,0 +1,229 @@
+"""
+Columnar binary cache of converted history (--columns) and queries over it.
+
+The backup JSON is one object per month; answering "alimente per year" from it means parsing
+every record. The columns file stores the same amounts column-wise, so a query reads only
+the categories, profiles and months it asks for:
+
+  magic       8 bytes  b"FINCOL1\\0"
+  header_len  uint32, little-endian
+  header      JSON: months (sorted "YYYY-MM", the month index), profiles, keys
+              (CATEGORY_KEYS), offset (start of the columns, a multiple of 64)
+  columns     one little-endian float64 array of len(months) values per (profile, key),
+              profile-major: column (p, k) starts at offset + (p * len(keys) + k) * n * 8
+  present     then one uint8 array of len(months) per profile: 1 where the month has the
+              profile (its column values are 0.0 where it does not)
+
+The file lives next to the output as <output>.columns. ColumnarCache opens it with
+numpy.memmap when NumPy is installed, otherwise it reads the requested slices into stdlib
+array('d') values. Sums are exact (math.fsum), so both give the same numbers.
+"""
+
+import bisect
+import json
+import math
+import struct
+import sys
+from array import array
+from itertools import chain
+from pathlib import Path
+from typing import Iterable, Iterator, NamedTuple, Sequence
+
+from .records import CATEGORY_KEYS, MonthRecord, amounts_from_dict, new_amounts
+from .writer import atomic_open_binary
+
+try:
+    import numpy as np
+except ImportError:  # optional: slices are read into array('d') instead
+    np = None
+
+MAGIC = b"FINCOL1\0"
+_HEADER_LEN = struct.Struct("<I")
+ALIGN = 64
+
+GROUP_BY = ("month", "year", "all")
+
+
+def columns_path_for(output_path: Path) -> Path:
+    return output_path.with_name(output_path.name + ".columns")
+
+
+class ColumnarBuilder:
+    """
+    Collects records (MonthRecord or backup dicts, any order) and writes them as a columns
+    file. Only references to the amount vectors are kept until write().
+    """
+
+    def __init__(self) -> None:
+        self._months: dict[str, dict[str, array]] = {}
+        self._profiles: dict[str, None] = {}
+
+    def add(self, record: MonthRecord | dict) -> None:
+        if isinstance(record, MonthRecord):
+            people = record.people
+        else:
+            people = {p: amounts_from_dict(a) for p, a in record["people"].items()}
+        self._profiles.update(dict.fromkeys(people))
+        month = record.month if isinstance(record, MonthRecord) else record["month"]
+        self._months[month] = people
+
+    def observe(self, records: Iterable[MonthRecord | dict]) -> Iterator[MonthRecord | dict]:
+        """records, unchanged, each added as it passes."""
+        for record in records:
+            self.add(record)
+            yield record
+
+    def write(self, path: Path) -> int:
+        """Write the columns file at path (atomically). Returns the number of months."""
+        months = sorted(self._months)
+        profiles = list(self._profiles)
+        n = len(months)
+        fields = {"months": months, "profiles": profiles, "keys": CATEGORY_KEYS}
+        # The header records where the columns start, which depends on the header's length
+        offset = ALIGN
+        while True:
+            header = json.dumps({"offset": offset, **fields}).encode("utf-8")
+            end = len(MAGIC) + _HEADER_LEN.size + len(header)
+            if end <= offset:
+                break
+            offset = -(-end // ALIGN) * ALIGN
+        header = header.ljust(offset - len(MAGIC) - _HEADER_LEN.size)
+        zeros = new_amounts()
+        stride = len(CATEGORY_KEYS)
+        with atomic_open_binary(path) as f:
+            f.write(MAGIC + _HEADER_LEN.pack(len(header)) + header)
+            present = []
+            for profile in profiles:
+                rows = [self._months[m].get(profile) for m in months]
+                present.append(bytes(r is not None for r in rows))
+                # Month-major rows of 26; column k is every 26th value from k
+                flat = array("d", b"".join((zeros if r is None else r).tobytes() for r in rows))
+                for k in range(stride):
+                    column = flat[k::stride]
+                    if sys.byteorder == "big":
+                        column.byteswap()
+                    f.write(column.tobytes())
+            for flags in present:
+                f.write(flags)
+        return n
+
+
+class Row(NamedTuple):
+    period: str
+    # Months in the period with data for any of the selected profiles
+    months: int
+    # key -> sum over the period's months and the selected profiles
+    sums: dict[str, float]
+
+
+class ColumnarCache:
+    """A columns file opened for queries (memory-mapped with NumPy, else read slice by slice)."""
+
+    def __init__(self, path: Path, use_numpy: bool | None = None) -> None:
+        self.path = path
+        with path.open("rb") as f:
+            magic = f.read(len(MAGIC))
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a columns file")
+            (size,) = _HEADER_LEN.unpack(f.read(_HEADER_LEN.size))
+            header = json.loads(f.read(size))
+        self.months: list[str] = header["months"]
+        self.profiles: list[str] = header["profiles"]
+        self.keys: list[str] = header["keys"]
+        self._offset: int = header["offset"]
+        self._numpy = np is not None if use_numpy is None else use_numpy and np is not None
+        n, shape = len(self.months), (len(self.profiles), len(self.keys), len(self.months))
+        self._present_offset = self._offset + 8 * n * len(self.profiles) * len(self.keys)
+        if self._numpy and n:
+            self._columns = np.memmap(path, dtype="<f8", mode="r", offset=self._offset, shape=shape)
+            self._present = np.memmap(
+                path, dtype=np.uint8, mode="r", offset=self._present_offset, shape=(len(self.profiles), n)
+            )
+
+    def month_range(self, first: str | None = None, last: str | None = None) -> tuple[int, int]:
+        """Index range [start, stop) of the months from first to last (inclusive, either open)."""
+        start = 0 if first is None else bisect.bisect_left(self.months, first)
+        stop = len(self.months) if last is None else bisect.bisect_right(self.months, last)
+        return start, max(start, stop)
+
+    def column(self, profile: str, key: str, start: int = 0, stop: int | None = None) -> Sequence[float]:
+        """Values of one category for one profile over months[start:stop]."""
+        p, k = self.profiles.index(profile), self.keys.index(key)
+        stop = len(self.months) if stop is None else stop
+        if self._numpy:
+            return self._columns[p, k, start:stop] if self.months else np.zeros(0)
+        index = (p * len(self.keys) + k) * len(self.months) + start
+        values = array("d", self._read(self._offset + 8 * index, 8 * (stop - start)))
+        if sys.byteorder == "big":
+            values.byteswap()
+        return values
+
+    def present(self, profile: str, start: int = 0, stop: int | None = None) -> bytes:
+        """1/0 per month of months[start:stop]: whether the month has the profile."""
+        p = self.profiles.index(profile)
+        stop = len(self.months) if stop is None else stop
+        if self._numpy:
+            return self._present[p, start:stop].tobytes() if self.months else b""
+        return self._read(self._present_offset + p * len(self.months) + start, stop - start)
+
+    def _read(self, offset: int, size: int) -> bytes:
+        with self.path.open("rb") as f:
+            f.seek(offset)
+            return f.read(size)
+
+    def query(
+        self,
+        keys: Sequence[str] | None = None,
+        profiles: Sequence[str] | None = None,
+        first: str | None = None,
+        last: str | None = None,
+        by: str = "all",
+    ) -> list[Row]:
+        """
+        Sums of keys (default: all) over profiles (default: all) per period (by: "month",
+        "year" or "all") for the months from first to last. Periods without data for any of
+        the profiles are left out.
+        """
+        keys = list(self.keys if keys is None else keys)
+        profiles = list(self.profiles if profiles is None else profiles)
+        for key in keys:
+            if key not in self.keys:
+                raise ValueError(f"Unknown category {key!r}")
+        for profile in profiles:
+            if profile not in self.profiles:
+                raise ValueError(f"Unknown profile {profile!r} (have: {', '.join(self.profiles)})")
+        start, stop = self.month_range(first, last)
+        # 1 where the month has any of the profiles
+        present = bytes(stop - start)
+        for profile in profiles:
+            present = bytes(map(max, present, self.present(profile, start, stop)))
+        columns = {key: [self.column(p, key, start, stop) for p in profiles] for key in keys}
+        rows = []
+        for period, a, b in self._periods(start, stop, by):
+            months = present.count(1, a, b)
+            if not months:
+                continue
+            sums = {key: _exact_sum(col[a:b] for col in cols) for key, cols in columns.items()}
+            rows.append(Row(period, months, sums))
+        return rows
+
+    def _periods(self, start: int, stop: int, by: str) -> Iterator[tuple[str, int, int]]:
+        """(period, a, b) with a, b relative to start."""
+        if by not in GROUP_BY:
+            raise ValueError(f"Unknown grouping {by!r} (use one of: {', '.join(GROUP_BY)})")
+        if by == "all":
+            if stop > start:
+                yield "all", 0, stop - start
+            return
+        a = start
+        while a < stop:
+            period = self.months[a] if by == "month" else self.months[a][:4]
+            # Months are unique and sorted: a year ends after its last "YYYY-MM"
+            b = a + 1 if by == "month" else bisect.bisect_right(self.months, period + "-99", a, stop)
+            yield period, a - start, b - start
+            a = b
+
+
+def _exact_sum(slices: Iterable[Sequence[float]]) -> float:
+    # tolist() turns a NumPy slice into floats in one call (fsum over NumPy scalars is slow)
+    return math.fsum(chain.from_iterable(s.tolist() for s in slices))
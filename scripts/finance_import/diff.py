@@ -0,0 +1,167 @@
+"""
+Differences between two backups (e.g. the app's export and a freshly converted file) and the
+patch backup that brings the first up to date.
+
+diff_backups() indexes both backups by month and profile. Every (month, profile) gets a cheap
+hash of its 26 amounts, and every month a hash of its profiles' hashes, so most months are
+settled by comparing two ints:
+
+  month hashes equal     unchanged (nothing else is looked at)
+  profile hashes equal   the profile is unchanged
+  otherwise              the profile's amounts are compared category by category
+
+meta (updatedAt, isSaved) is not compared: a month with the same amounts is unchanged
+whenever it was saved. A hash collision cannot hide a change within a month: equal hashes
+are confirmed by comparing the vectors.
+
+The changeset lists the added, removed and changed months in month order, each with
+per-category deltas (new - old) per profile: an added month has its values, a removed month
+their negatives, a changed month only the categories that moved (by more than tolerance).
+A profile that is only in one of the two backups for a month is listed even when its amounts
+are all zero. patch_records() are the new backup's records of the added and changed months;
+imported in the app's merge mode they update exactly those months (removed months are only
+reported: an import cannot delete a month).
+"""
+
+from operator import itemgetter
+from typing import Iterable, Iterator, NamedTuple
+
+from .records import CATEGORY_KEYS, MonthRecord
+
+ADDED = "added"
+REMOVED = "removed"
+CHANGED = "changed"
+
+# (hash, 26 amounts) per profile
+Vector = tuple
+Profiles = dict[str, tuple[int, Vector]]
+
+_AMOUNTS = itemgetter(*CATEGORY_KEYS)
+
+
+def _vector(amounts: object) -> Vector:
+    """The 26 amounts of a record's profile, in CATEGORY_KEYS order (missing keys are 0)."""
+    if isinstance(amounts, dict):
+        try:
+            return _AMOUNTS(amounts)
+        except KeyError:
+            return tuple(amounts.get(k, 0.0) for k in CATEGORY_KEYS)
+    return tuple(amounts)
+
+
+class BackupIndex:
+    """month -> profile -> (hash, amounts) of one backup, with a hash per month."""
+
+    def __init__(self, records: Iterable[MonthRecord | dict]) -> None:
+        self.months: dict[str, Profiles] = {}
+        # The full record per month (the patch copies it); for a duplicate month the last counts
+        self.records: dict[str, MonthRecord | dict] = {}
+        for record in records:
+            if isinstance(record, MonthRecord):
+                month, people = record.month, record.people
+            else:
+                month, people = record.get("month"), record.get("people")
+                if not isinstance(month, str) or not isinstance(people, dict):
+                    continue
+            profiles: Profiles = {}
+            for profile_id, amounts in people.items():
+                vector = _vector(amounts)
+                profiles[profile_id] = (hash(vector), vector)
+            self.months[month] = profiles
+            self.records[month] = record
+        self.hashes = {
+            month: hash(frozenset((p, h) for p, (h, _) in profiles.items())) for month, profiles in self.months.items()
+        }
+
+
+class MonthChange(NamedTuple):
+    month: str
+    change: str  # ADDED, REMOVED or CHANGED
+    # profile -> category -> new - old (only categories that differ)
+    deltas: dict[str, dict[str, float]]
+
+    def to_dict(self) -> dict:
+        return {"month": self.month, "change": self.change, "people": self.deltas}
+
+
+def _deltas(old: Vector | None, new: Vector | None, tolerance: float) -> dict[str, float]:
+    out = {}
+    for key, a, b in zip(CATEGORY_KEYS, old or (0.0,) * len(CATEGORY_KEYS), new or (0.0,) * len(CATEGORY_KEYS)):
+        if a != b:
+            try:
+                delta = b - a
+            except TypeError:
+                raise ValueError(f"{key}: not a number ({a!r} -> {b!r})") from None
+            if abs(delta) > tolerance:
+                out[key] = delta
+    return out
+
+
+def _month_deltas(old: Profiles, new: Profiles, tolerance: float) -> dict[str, dict[str, float]]:
+    deltas = {}
+    for profile_id in dict.fromkeys([*old, *new]):
+        a, b = old.get(profile_id), new.get(profile_id)
+        if a is not None and b is not None and a[0] == b[0] and a[1] == b[1]:
+            continue
+        changed = _deltas(a and a[1], b and b[1], tolerance)
+        # A profile in only one backup is a change even with all-zero amounts
+        if changed or a is None or b is None:
+            deltas[profile_id] = changed
+    return deltas
+
+
+class Changeset(NamedTuple):
+    changes: list[MonthChange]
+    unchanged: int
+
+    def count(self, change: str) -> int:
+        return sum(1 for c in self.changes if c.change == change)
+
+    def to_dict(self) -> dict:
+        return {
+            "summary": {
+                ADDED: self.count(ADDED),
+                REMOVED: self.count(REMOVED),
+                CHANGED: self.count(CHANGED),
+                "unchanged": self.unchanged,
+            },
+            "months": [c.to_dict() for c in self.changes],
+        }
+
+
+def diff_backups(old: BackupIndex, new: BackupIndex, tolerance: float = 0.0) -> Changeset:
+    """Months added, removed and changed from old to new, in month order (see module docstring)."""
+    changes: list[MonthChange] = []
+    unchanged = 0
+    for month in sorted(old.months.keys() | new.months.keys()):
+        a, b = old.months.get(month), new.months.get(month)
+        if a is not None and b is not None and old.hashes[month] == new.hashes[month] and a == b:
+            unchanged += 1
+            continue
+        try:
+            deltas = _month_deltas(a or {}, b or {}, tolerance)
+        except ValueError as e:
+            raise ValueError(f"{month}: {e}") from None
+        if a is None or b is None:
+            changes.append(MonthChange(month, ADDED if a is None else REMOVED, deltas))
+        elif deltas:
+            changes.append(MonthChange(month, CHANGED, deltas))
+        else:
+            unchanged += 1
+    return Changeset(changes, unchanged)
+
+
+def patch_records(changeset: Changeset, new: BackupIndex, now_iso: str) -> Iterator[dict]:
+    """
+    new's records of the added and changed months, in month order, saved at now_iso (the
+    app's merge import keeps whichever record has the later updatedAt).
+    """
+    for change in changeset.changes:
+        if change.change == REMOVED:
+            continue
+        record = new.records[change.month]
+        if isinstance(record, MonthRecord):
+            yield record.to_dict(now_iso)
+        else:
+            meta = record.get("meta") if isinstance(record.get("meta"), dict) else {"isSaved": True}
+            yield {**record, "meta": {**meta, "updatedAt": now_iso}}
@@ -0,0 +1,271 @@
+"""
+Input format sniffing and the format parser registry.
+
+open_input() opens a file once, reads a bounded prefix (at most SNIFF_LINES lines /
+SNIFF_CHARS characters) to pick the delimiter and the format, then replays that prefix in
+front of the still-open handle, so parsing continues on the same read pass. An .xlsx
+workbook is opened one sheet at a time (SheetInput, see finance_import.xlsx) and sniffed the
+same way from its first rows, so every format can also come from a spreadsheet.
+
+Formats:
+  table    - header row with a month column, one row per month (csv-to-finance-import.py)
+  strategy - "Cheltuieli ..." sheet with "incepand cu <luna> <an>" periods (csv-to-finance-import.py)
+  simple   - only-1.csv: persoana,luna,<26 categories> (tsv-to-finance-json.py)
+  tsv      - buget-lunar.tsv: Persoana/Luna, two header rows (tsv-to-finance-json.py)
+
+The scripts register a parser per format with register_parser(); convert-to-finance-import.py
+loads both scripts and dispatches on the sniffed format.
+"""
+
+import csv
+import importlib.util
+import sys
+from itertools import chain, islice
+from pathlib import Path
+from types import ModuleType
+from typing import IO, Callable, Iterable, Iterator, NamedTuple
+
+from .labels import fold
+from .records import CATEGORY_KEYS, MonthRecord
+from .xlsx import Workbook, is_workbook
+
+FORMAT_TABLE = "table"
+FORMAT_STRATEGY = "strategy"
+FORMAT_SIMPLE = "simple"
+FORMAT_TSV = "tsv"
+# One row per person and month: rows are grouped by PersonMap (see finance_import.persons)
+PERSON_FORMATS = (FORMAT_SIMPLE, FORMAT_TSV)
+
+SNIFF_LINES = 256
+SNIFF_CHARS = 64 * 1024
+
+DELIMITERS = (",", "\t", ";")
+
+# Strategy sheets: first cell names the sheet, or a period marker appears in the first column
+STRATEGY_TITLE = "cheltuieli"
+PERIOD_MARKER = "incepand cu"
+
+
+def is_simple_header(row: list[str]) -> bool:
+    """persoana,luna,venit,...,investitii: person and month, then every category column."""
+    if len(row) < 2 + len(CATEGORY_KEYS):
+        return False
+    return fold((row[0] or "").strip()) == "persoana" and fold((row[1] or "").strip()) == "luna"
+
+
+def is_strategy_prefix(rows: Iterable[list[str]]) -> bool:
+    """Strategy markers in rows (the sniffed prefix): the sheet title or an "incepand cu" period."""
+    for i, row in enumerate(rows):
+        if not row:
+            continue
+        first_cell = (row[0] or "").lower().replace("\n", " ")
+        if (i == 0 and STRATEGY_TITLE in first_cell) or PERIOD_MARKER in first_cell:
+            return True
+    return False
+
+
+def detect_delimiter(lines: list[str]) -> str:
+    """The delimiter used most in the first non-blank line (comma on a tie or when there is none)."""
+    for line in lines:
+        if line.strip():
+            counts = {d: line.count(d) for d in DELIMITERS}
+            best = max(DELIMITERS, key=lambda d: counts[d])
+            return best if counts[best] > counts[","] else ","
+    return ","
+
+
+def detect_format(rows: list[list[str]]) -> str:
+    """Format of a file from its first rows (see the module docstring)."""
+    first = rows[0] if rows else []
+    if is_simple_header(first):
+        return FORMAT_SIMPLE
+    if first and fold((first[0] or "").strip()) == "persoana":
+        return FORMAT_TSV
+    if is_strategy_prefix(rows):
+        return FORMAT_STRATEGY
+    return FORMAT_TABLE
+
+
+class EmptyInputError(ValueError):
+    """The input (or worksheet) has no rows."""
+
+
+class SniffedInput:
+    """An open input whose prefix has been sniffed. rows() streams the whole file from the start."""
+
+    def __init__(self, path: Path, fp: IO[str], prefix: list[str]) -> None:
+        self.path = path
+        # How validation messages cite the input's rows
+        self.name = path.name
+        self._fp = fp
+        self._prefix = prefix
+        self._started = False
+        self.empty = not prefix
+        self.delimiter = detect_delimiter(prefix)
+        # Parsed prefix rows are only kept long enough to pick the format
+        prefix_rows = list(csv.reader(prefix, delimiter=self.delimiter))
+        self.header = prefix_rows[0] if prefix_rows else []
+        self.format = detect_format(prefix_rows)
+
+    def rows(self) -> Iterator[list[str]]:
+        """CSV rows of the whole file: the buffered prefix, then the rest of the same handle. Once only."""
+        if self._started:
+            raise RuntimeError(f"{self.path} is already being read")
+        self._started = True
+        prefix, self._prefix = self._prefix, []
+        return csv.reader(chain(_drain(prefix), self._fp), delimiter=self.delimiter)
+
+    def close(self) -> None:
+        self._fp.close()
+
+    def __enter__(self) -> "SniffedInput":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def _drain(lines: list[str]) -> Iterator[str]:
+    """Yield lines in order, releasing each one as it is consumed."""
+    lines.reverse()
+    while lines:
+        yield lines.pop()
+
+
+class SheetInput:
+    """
+    One worksheet of an .xlsx workbook, sniffed like a CSV file (see finance_import.xlsx):
+    same interface as SniffedInput, with rows read from the sheet's XML as they are consumed.
+    """
+
+    # Rows are already split; a delimiter is only needed to split text files into byte ranges
+    delimiter = ","
+
+    def __init__(self, path: Path, sheet: str | None = None) -> None:
+        self.path = path
+        self._workbook = Workbook(path)
+        try:
+            self.sheet = sheet if sheet is not None else (self._workbook.sheets or [None])[0]
+            self.name = f"{path.name} [{self.sheet}]"
+            self._rows = self._workbook.rows(self.sheet)
+            prefix = list(islice(self._rows, SNIFF_LINES))
+        except BaseException:
+            self._workbook.close()
+            raise
+        self._prefix = prefix
+        self._started = False
+        self.empty = not any(any(row) for row in prefix)
+        self.header = prefix[0] if prefix else []
+        self.format = detect_format(prefix)
+
+    def rows(self) -> Iterator[list[str]]:
+        """Rows of the whole sheet: the buffered prefix, then the rest of the same pass. Once only."""
+        if self._started:
+            raise RuntimeError(f"{self.path} [{self.sheet}] is already being read")
+        self._started = True
+        prefix, self._prefix = self._prefix, []
+        return chain(_drain(prefix), self._rows)
+
+    def close(self) -> None:
+        self._rows.close()
+        self._workbook.close()
+
+    def __enter__(self) -> "SheetInput":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+
+def input_sheets(path: Path, sheets: list[str] | None = None) -> list[str | None]:
+    """
+    The sheets of a workbook to read: sheets if given, else all of them in order; [None] (the
+    file itself) for a CSV/TSV file.
+    """
+    if not is_workbook(path):
+        return [None]
+    if sheets:
+        return list(sheets)
+    with Workbook(path) as workbook:
+        return list(workbook.sheets)
+
+
+def open_input(path: Path, sheet: str | None = None) -> SniffedInput | SheetInput:
+    """
+    Open path and sniff its delimiter and format from a bounded prefix. An .xlsx workbook is
+    read from sheet (default: its first sheet).
+    """
+    if is_workbook(path):
+        return SheetInput(path, sheet)
+    fp = path.open(encoding="utf-8-sig", newline="")
+    try:
+        prefix: list[str] = []
+        size = 0
+        while len(prefix) < SNIFF_LINES and size < SNIFF_CHARS:
+            line = fp.readline()
+            if not line:
+                break
+            prefix.append(line)
+            size += len(line)
+        return SniffedInput(path, fp, prefix)
+    except BaseException:
+        fp.close()
+        raise
+
+
+def closing_iter(items: Iterable, inp: SniffedInput) -> Iterator:
+    """Yield from items, closing inp when they are exhausted (or the iterator is closed)."""
+    try:
+        yield from items
+    finally:
+        inp.close()
+
+
+class ParseOptions(NamedTuple):
+    """Options a registered parser may use; each format ignores the ones it does not need."""
+
+    stats: object = None  # finance_import.stats.Stats
+    ambiguous: list | None = None  # table: (row, header, cell) of ambiguous numbers
+    sorted_input: bool = False  # table / simple / tsv: rows are in month order
+    line_items: object = None  # strategy: LineItemClassifier (None = built-in rules)
+    default_year: int | None = None  # simple / tsv: year for bare month names
+    source: "SniffedInput | None" = None  # the open input the rows come from (for parallel parsing)
+    workers: int | None = 1  # table / simple / tsv: processes for one large file (None = one per CPU)
+    memory_budget: int | None = None  # table / simple / tsv: bytes of month aggregates before spilling
+    persons: object = None  # simple / tsv: PersonMap (None = the default profiles)
+    sources: bool = False  # table / simple / tsv: cite each month's first input row (MonthRecord.source)
+
+
+# parse(rows of the whole file, options) -> month records in month order, every profile filled in
+FormatParser = Callable[[Iterator[list[str]], ParseOptions], Iterable[MonthRecord]]
+
+_PARSERS: dict[str, FormatParser] = {}
+
+
+def register_parser(fmt: str, parse: FormatParser) -> None:
+    _PARSERS[fmt] = parse
+
+
+def parser_for(fmt: str) -> FormatParser:
+    try:
+        return _PARSERS[fmt]
+    except KeyError:
+        raise ValueError(f"No parser registered for the {fmt} format") from None
+
+
+def registered_formats() -> list[str]:
+    return sorted(_PARSERS)
+
+
+def load_script(path: Path) -> ModuleType:
+    """
+    Import a hyphenated script (csv-to-finance-import.py) as a module without running main().
+    Importing a converter script registers its format parsers.
+    """
+    name = path.stem.replace("-", "_")
+    spec = importlib.util.spec_from_file_location(name, path)
+    module = importlib.util.module_from_spec(spec)
+    # Registered so its functions can be pickled by reference (worker processes)
+    sys.modules[name] = module
+    spec.loader.exec_module(module)
+    return module
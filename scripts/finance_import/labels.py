@@ -0,0 +1,47 @@
+"""
+Diacritic-folded label lookup shared by the converters.
+
+fold() lowercases and strips Romanian diacritics with one str.translate call. FoldedIndex
+resolves a header or line-item label to an app key in O(1): exact match first, then the
+folded form. Labels seen are memoized on the index (up to MEMO_LIMIT distinct ones), so
+repeated (or unknown) labels cost one dict lookup for the rest of the run.
+"""
+
+from typing import Mapping
+
+# Lowercase Romanian diacritics (both comma-below and cedilla forms) -> ASCII
+FOLD_TABLE = str.maketrans({"ă": "a", "â": "a", "î": "i", "ș": "s", "ț": "t", "ş": "s", "ţ": "t"})
+
+# Distinct labels remembered per index (and per line-item classifier); labels beyond this are
+# resolved every time
+MEMO_LIMIT = 65536
+
+
+def fold(s: str) -> str:
+    """Lowercase and remove common diacritics for fuzzy label match."""
+    return s.lower().translate(FOLD_TABLE)
+
+
+class FoldedIndex:
+    """Label -> app key lookup built once from a mapping (first entry wins on folded collisions)."""
+
+    __slots__ = ("_exact", "_folded", "_memo")
+
+    def __init__(self, mapping: Mapping[str, str]) -> None:
+        self._exact = dict(mapping)
+        self._folded: dict[str, str] = {}
+        for label, key in mapping.items():
+            self._folded.setdefault(fold(label), key)
+        self._memo: dict[str, str | None] = {}
+
+    def get(self, label: str) -> str | None:
+        try:
+            return self._memo[label]
+        except KeyError:
+            key = self._exact.get(label) or self._folded.get(fold(label))
+            if len(self._memo) < MEMO_LIMIT:
+                self._memo[label] = key
+            return key
+
+    def __contains__(self, label: str) -> bool:
+        return self.get(label) is not None
@@ -0,0 +1,106 @@
+"""
+Strategy-CSV line-item rules compiled into a single-pass classifier.
+
+A label cell is classified once: whitespace is collapsed and the text lowercased, every skip
+pattern (a substring, e.g. "out" or "in *") is tested with one combined regex, and the
+remaining label is resolved to a category through a FoldedIndex. Results are memoized per raw
+cell, so the strategy loop pays one dict lookup for every label it has seen before.
+
+Rules can be extended from a JSON file (--rules) without code edits:
+
+    {
+      "skip": ["total", "rezerva"],
+      "items": {"credit nevoi": "rate", "chirie": "casa"},
+      "replace": false
+    }
+
+"skip" patterns are added to the built-in ones and "items" override or extend the built-in
+label -> category map; with "replace": true the built-in rules are ignored.
+"""
+
+import json
+import re
+from pathlib import Path
+from typing import Iterable, Mapping
+
+from .labels import MEMO_LIMIT, FoldedIndex
+from .records import KEY_INDEX
+
+# classify() results that are not a KEY_INDEX position
+SKIPPED = -1  # empty label or a skip pattern (totals, section headers, period markers)
+UNMAPPED = -2  # a label with no category
+
+# Labels starting with this are period markers, never line items
+_PERIOD_PREFIX = "incepand"
+
+
+class LineItemClassifier:
+    """Compiled skip patterns + label index. Picklable (rebuilt from its rules in workers)."""
+
+    def __init__(self, skip: Iterable[str], items: Mapping[str, str]) -> None:
+        self.skip = tuple(skip)
+        self.items = dict(items)
+        unknown = sorted({key for key in self.items.values() if key not in KEY_INDEX})
+        if unknown:
+            raise ValueError(f"Unknown category key(s) in line-item rules: {', '.join(unknown)}")
+        # The original rule: any skip substring, or a label starting with "incepand" (when there are skip rules)
+        patterns = [re.escape(s) for s in self.skip]
+        if patterns:
+            patterns.append("^" + _PERIOD_PREFIX)
+        self._skip_re = re.compile("|".join(patterns)) if patterns else None
+        self._index = FoldedIndex(self.items)
+        self._memo: dict[str, int] = {}
+
+    def __reduce__(self):
+        return LineItemClassifier, (self.skip, self.items)
+
+    def normalize(self, cell: str) -> str:
+        """Collapsed, lowercased label; "" when a skip pattern matches."""
+        t = " ".join(cell.strip().lower().split())
+        if self._skip_re is not None and self._skip_re.search(t):
+            return ""
+        return t
+
+    def classify(self, cell: str) -> int:
+        """KEY_INDEX position for a label cell, or SKIPPED / UNMAPPED."""
+        try:
+            return self._memo[cell]
+        except KeyError:
+            pass
+        label = self.normalize(cell.replace("\n", " "))
+        if not label:
+            result = SKIPPED
+        else:
+            key = self._index.get(label)
+            result = KEY_INDEX[key] if key else UNMAPPED
+        if len(self._memo) < MEMO_LIMIT:
+            self._memo[cell] = result
+        return result
+
+    def fingerprint(self) -> list:
+        """JSON-able rules, for cache keys."""
+        return [list(self.skip), sorted(self.items.items())]
+
+
+def load_rules(
+    path: Path, default_skip: Iterable[str], default_items: Mapping[str, str]
+) -> LineItemClassifier:
+    """Classifier for the built-in rules extended (or replaced) by the JSON rules file at path."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        raise ValueError(f"{path} is not valid JSON: {e}") from e
+    if not isinstance(data, dict):
+        raise ValueError(f"{path}: expected an object with \"skip\" and/or \"items\"")
+    skip = data.get("skip", [])
+    items = data.get("items", {})
+    if not isinstance(skip, list) or not all(isinstance(s, str) for s in skip):
+        raise ValueError(f"{path}: \"skip\" must be a list of strings")
+    if not isinstance(items, dict) or not all(isinstance(v, str) for v in items.values()):
+        raise ValueError(f"{path}: \"items\" must map labels to category keys")
+    # Rules are matched against the collapsed lowercase label, so normalize them the same way
+    skip = [" ".join(s.lower().split()) for s in skip]
+    items = {" ".join(label.lower().split()): key for label, key in items.items()}
+    if data.get("replace"):
+        return LineItemClassifier(skip, items)
+    return LineItemClassifier([*default_skip, *skip], {**default_items, **items})
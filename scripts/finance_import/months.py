@@ -0,0 +1,199 @@
+"""
+Month column parsing shared by the converters.
+
+parse_month() accepts every supported spelling and returns YYYY-MM. MonthParser is the
+per-file form: it infers the column's format from the first values, then dispatches the
+rest of the file to that format's compiled parser (falling back to parse_month for values
+that do not fit) and memoizes results, since month strings repeat heavily.
+
+Month names are matched per word ("mai", "Martie", "sept."), never as substrings.
+"""
+
+import re
+from pathlib import Path
+from typing import Callable
+
+from .labels import fold
+
+# Romanian month names -> 01..12 (short and long)
+RO_MONTHS = {
+    "ian": "01", "ianuarie": "01",
+    "feb": "02", "februarie": "02",
+    "mar": "03", "martie": "03",
+    "apr": "04", "aprilie": "04",
+    "mai": "05",
+    "iun": "06", "iunie": "06",
+    "iul": "07", "iulie": "07",
+    "aug": "08", "august": "08",
+    "sep": "09", "septembrie": "09",
+    "oct": "10", "octombrie": "10",
+    "nov": "11", "noiembrie": "11",
+    "dec": "12", "decembrie": "12",
+}
+_LONG_NAMES = [(name, num) for name, num in RO_MONTHS.items() if len(name) > 3]
+
+_ISO = re.compile(r"^(\d{4})-(\d{1,2})$")
+_DAY_MONTH_YEAR = re.compile(r"^(\d{1,2})\.(\d{1,2})\.(\d{4})$")
+_MONTH_YEAR = re.compile(r"^(\d{1,2})\.(\d{4})$")
+_WORD = re.compile(r"[^\W\d_]+")
+_YEAR_IN_NAME = re.compile(r"(?<!\d)((?:19|20)\d{2})(?!\d)")
+
+# Format names reported by MonthParser.format
+FORMAT_ISO = "iso"  # 2025-01
+FORMAT_DAY_MONTH_YEAR = "dd.mm.yyyy"
+FORMAT_MONTH_YEAR = "mm.yyyy"
+FORMAT_NAME_YEAR = "name yyyy"  # Ianuarie 2025, 2025 Ian
+FORMAT_NAME = "name"  # ianuarie (year from default_year)
+
+INFER_SAMPLE_SIZE = 32
+
+# Stats counter: month cells that were bare names and took the default year (once per distinct cell)
+DEFAULT_YEAR_COUNTER = "defaultYearMonths"
+
+
+def month_name_to_num(word: str) -> str | None:
+    """'Ianuarie' / 'ian' / 'sept.' -> '01' / '01' / '09'. Whole words only."""
+    w = fold(word).strip(".,")
+    num = RO_MONTHS.get(w)
+    if num or len(w) < 3:
+        return num
+    # Abbreviations longer than three letters: "sept", "febr"
+    for name, n in _LONG_NAMES:
+        if name.startswith(w):
+            return n
+    return None
+
+
+def _valid(year: str, month: str) -> str | None:
+    return f"{year}-{month.zfill(2)}" if 1 <= int(month) <= 12 else None
+
+
+def _parse_iso(s: str) -> str | None:
+    m = _ISO.match(s)
+    return _valid(m.group(1), m.group(2)) if m else None
+
+
+def _parse_day_month_year(s: str) -> str | None:
+    m = _DAY_MONTH_YEAR.match(s.replace(" ", ""))
+    return _valid(m.group(3), m.group(2)) if m else None
+
+
+def _parse_month_year(s: str) -> str | None:
+    m = _MONTH_YEAR.match(s.replace(" ", ""))
+    return _valid(m.group(2), m.group(1)) if m else None
+
+
+def _parse_name_year(s: str) -> str | None:
+    parts = s.split()
+    if len(parts) < 2:
+        return None
+    for i, p in enumerate(parts):
+        if p.isdigit() and len(p) == 4:
+            for other in parts[:i] + parts[i + 1 :]:
+                for word in _WORD.findall(other):
+                    num = month_name_to_num(word)
+                    if num:
+                        return f"{p}-{num}"
+            return None
+    return None
+
+
+def _name_parser(default_year: int) -> Callable[[str], str | None]:
+    def parse(s: str) -> str | None:
+        if " " in s:
+            return None
+        num = month_name_to_num(s)
+        return f"{default_year}-{num}" if num else None
+
+    return parse
+
+
+def _parsers(default_year: int | None) -> list[tuple[str, Callable[[str], str | None]]]:
+    parsers = [
+        (FORMAT_ISO, _parse_iso),
+        (FORMAT_DAY_MONTH_YEAR, _parse_day_month_year),
+        (FORMAT_MONTH_YEAR, _parse_month_year),
+        (FORMAT_NAME_YEAR, _parse_name_year),
+    ]
+    if default_year is not None:
+        parsers.append((FORMAT_NAME, _name_parser(default_year)))
+    return parsers
+
+
+def _detect(s: str, parsers: list[tuple[str, Callable[[str], str | None]]]) -> tuple[str | None, str | None]:
+    for fmt, parse in parsers:
+        month = parse(s)
+        if month:
+            return fmt, month
+    return None, None
+
+
+def parse_month(value: str, default_year: int | None = None) -> str | None:
+    """
+    Parse a month value to YYYY-MM. Returns None if invalid.
+    A bare month name ("ianuarie") is accepted only when default_year is given.
+    """
+    if not value or not isinstance(value, str):
+        return None
+    s = value.strip()
+    if not s:
+        return None
+    return _detect(s, _parsers(default_year))[1]
+
+
+class MonthParser:
+    """
+    Per-file month parser. The first INFER_SAMPLE_SIZE parsed values pick the column format;
+    once every one of them used the same format, later values go straight to that parser.
+    Results are identical to parse_month(value, default_year). With stats, bare month names
+    read with default_year are counted as DEFAULT_YEAR_COUNTER.
+    """
+
+    def __init__(self, default_year: int | None = None, sample_size: int = INFER_SAMPLE_SIZE, stats=None) -> None:
+        self._parsers = _parsers(default_year)
+        self._sample_size = sample_size
+        self._stats = stats
+        self._seen: dict[str, int] = {}
+        self._fast: Callable[[str], str | None] | None = None
+        self._memo: dict[str, str | None] = {}
+        self.format: str | None = None
+
+    def __call__(self, value: str) -> str | None:
+        try:
+            return self._memo[value]
+        except (KeyError, TypeError):
+            pass
+        if not value or not isinstance(value, str):
+            return None
+        fmt, month = self._parse(value.strip()) if value.strip() else (None, None)
+        if fmt == FORMAT_NAME and self._stats is not None:
+            self._stats.count(DEFAULT_YEAR_COUNTER)
+        self._memo[value] = month
+        return month
+
+    def _parse(self, s: str) -> tuple[str | None, str | None]:
+        if self._fast is not None:
+            month = self._fast(s)
+            if month:
+                return self.format, month
+        fmt, month = _detect(s, self._parsers)
+        if fmt and self._fast is None:
+            self._seen[fmt] = self._seen.get(fmt, 0) + 1
+            if sum(self._seen.values()) >= self._sample_size:
+                self._lock()
+        return fmt, month
+
+    def _lock(self) -> None:
+        if len(self._seen) == 1:
+            self.format = next(iter(self._seen))
+            self._fast = dict(self._parsers)[self.format]
+        else:
+            # Mixed column: keep trying every format
+            self.format = "mixed"
+            self._fast = lambda s: None
+
+
+def year_from_path(path: Path) -> int | None:
+    """Year in a file name like buget-2025.tsv, or None."""
+    m = _YEAR_IN_NAME.search(path.stem)
+    return int(m.group(1)) if m else None
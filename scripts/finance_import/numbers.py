@@ -0,0 +1,193 @@
+"""
+Number parsing for the table converter.
+
+parse_number() parses one cell. parse_column() parses a whole column at once: the number
+format is detected once per column from a sample, and the column is converted in a batch
+(with NumPy when it is installed, otherwise with a tight stdlib loop). Both return exactly
+what parse_number() returns for every cell. format_number() writes a float the way both
+(and the person/month converter's parse_val) read it back exactly.
+
+A cell like "2.500" reads as 2500 (dot = thousands). In a column whose sample shows dot
+decimals ("2.5", "10.25") that reading is ambiguous, so such cells are returned in the
+column's `ambiguous` list instead of being coerced silently.
+"""
+
+import re
+from decimal import Decimal
+from typing import NamedTuple, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # optional: stdlib path below gives identical results
+    np = None
+
+# Trailing footnote markers: "2500**", "2500 *nota"
+_TRAILING_MARK = re.compile(r"\*+.*$")
+# 2.500 / 12.500 (one dot thousands group) and 1.234.567 (several groups)
+_THOUSANDS_GROUPS = re.compile(r"^\d{1,3}(\.\d{3}){2,}$")
+# 2.5 / 10.25 / 1234.5678 (dot decimal: fraction is not exactly three digits)
+_DOT_DECIMAL = re.compile(r"^\d*\.(\d{1,2}|\d{4,})$")
+
+# Column formats returned by detect_format
+FORMAT_EU = "eu"  # comma decimal, dot thousands
+FORMAT_DOT = "dot"  # dot decimal
+FORMAT_MIXED = "mixed"  # sample shows both
+FORMAT_PLAIN = "plain"  # no separators in sample
+
+DETECT_SAMPLE_SIZE = 256
+
+
+def _clean(value: str) -> str:
+    s = str(value).strip().replace(" ", "")
+    if "*" in s:
+        s = _TRAILING_MARK.sub("", s).strip() or s
+    return s
+
+
+def _is_thousands(s: str) -> bool:
+    """True when parse_number reads a comma-less "d.ddd" as an integer (2.500 -> 2500)."""
+    if "," in s:
+        return False
+    before, dot, after = s.partition(".")
+    return bool(dot) and after.isdigit() and len(after) == 3 and (not before or before.isdigit())
+
+
+def parse_number(value: str) -> float:
+    """
+    Parse a number. Handles European format: dot = thousands (2.500 -> 2500), comma = decimal (1,5 -> 1.5).
+    Also accepts dot as decimal (2.5 -> 2.5).
+    """
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return 0.0
+    s = _clean(value)
+    if not s:
+        return 0.0
+    # European: 2.500 = 2500 (thousands), 1,5 = 1.5 (decimal). If comma present, treat as decimal separator.
+    if "," in s:
+        s = s.replace(".", "").replace(",", ".")
+    elif _is_thousands(s):
+        # No comma: single dot and 3 digits after is thousands (2.500 -> 2500)
+        s = s.replace(".", "")
+    try:
+        return float(s)
+    except ValueError:
+        return 0.0
+
+
+def format_number(value: float) -> str:
+    """
+    value as parse_number reads it back exactly: the shortest repr with a comma decimal and no
+    thousands separator (1234.5 -> "1234,5", 2500.0 -> "2500", 1.5e-07 -> "0,00000015"). A dot
+    could be read as thousands ("2.500" is 2500).
+    """
+    shortest = repr(float(value))
+    whole, dot, fraction = shortest.partition(".")
+    if dot and "e" not in fraction:
+        if fraction == "0":
+            return "0" if whole == "-0" else whole
+        return f"{whole},{fraction}"
+    # Exponent notation (1e+20, 1.5e-07)
+    exact = Decimal(shortest)
+    if exact == exact.to_integral_value():
+        return str(int(exact))
+    return format(exact, "f").replace(".", ",")
+
+
+def detect_format(cells: Sequence[str], sample_size: int = DETECT_SAMPLE_SIZE) -> str:
+    """Classify a column's number format from its first sample_size non-empty cells."""
+    eu = dot = False
+    seen = 0
+    for cell in cells:
+        s = _clean(cell) if cell else ""
+        if not s:
+            continue
+        if "," in s or _THOUSANDS_GROUPS.match(s):
+            eu = True
+        elif _DOT_DECIMAL.match(s):
+            dot = True
+        seen += 1
+        if seen >= sample_size:
+            break
+    if eu and dot:
+        return FORMAT_MIXED
+    if dot:
+        return FORMAT_DOT
+    if eu:
+        return FORMAT_EU
+    return FORMAT_PLAIN
+
+
+class ParsedColumn(NamedTuple):
+    values: list[float]
+    # Indexes (into the input cells) read as thousands although the column uses dot decimals
+    ambiguous: list[int]
+
+
+def parse_column(cells: Sequence[str], fmt: str | None = None, use_numpy: bool | None = None) -> ParsedColumn:
+    """
+    Parse a column of cells. fmt is the column format from detect_format (detected from cells
+    when None); pass the format of the first block to keep it fixed for a whole file.
+    """
+    if fmt is None:
+        fmt = detect_format(cells)
+    if use_numpy is None:
+        use_numpy = np is not None
+    if use_numpy and len(cells) > 0:
+        values, thousands = _parse_numpy(cells)
+    else:
+        values, thousands = _parse_stdlib(cells)
+    ambiguous = thousands if fmt in (FORMAT_DOT, FORMAT_MIXED) else []
+    return ParsedColumn(values, ambiguous)
+
+
+def _parse_stdlib(cells: Sequence[str]) -> tuple[list[float], list[int]]:
+    values: list[float] = []
+    thousands: list[int] = []
+    append = values.append
+    for i, cell in enumerate(cells):
+        if not cell:
+            append(0.0)
+            continue
+        s = _clean(cell)
+        if "," in s:
+            s = s.replace(".", "").replace(",", ".")
+        elif "." in s and _is_thousands(s):
+            s = s.replace(".", "")
+            thousands.append(i)
+        try:
+            append(float(s) if s else 0.0)
+        except ValueError:
+            append(0.0)
+    return values, thousands
+
+
+def _parse_numpy(cells: Sequence[str]) -> tuple[list[float], list[int]]:
+    arr = np.char.replace(np.char.strip(np.asarray(cells, dtype=str)), " ", "")
+    starred = np.flatnonzero(np.char.find(arr, "*") >= 0)
+    for i in starred:
+        arr[i] = _clean(arr[i])
+
+    comma = np.char.find(arr, ",") >= 0
+    parts = np.char.partition(arr, ".")
+    before, dot, after = parts[:, 0], parts[:, 1], parts[:, 2]
+    thousands = (
+        ~comma
+        & (dot == ".")
+        & (np.char.str_len(after) == 3)
+        & np.char.isdigit(after)
+        & ((np.char.str_len(before) == 0) | np.char.isdigit(before))
+    )
+    arr = np.where(comma, np.char.replace(np.char.replace(arr, ".", ""), ",", "."), arr)
+    arr = np.where(thousands, np.char.add(before, after), arr)
+    arr = np.where(np.char.str_len(arr) == 0, "0", arr)
+    try:
+        values = arr.astype(np.float64).tolist()
+    except ValueError:
+        # Some cell is not a number: fall back per cell so it becomes 0.0 like parse_number
+        values = []
+        for s in arr.tolist():
+            try:
+                values.append(float(s))
+            except ValueError:
+                values.append(0.0)
+    return values, np.flatnonzero(thousands).tolist()
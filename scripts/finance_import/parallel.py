@@ -0,0 +1,134 @@
+"""
+Parallel parsing of one large file: the file is memory-mapped and split into byte ranges that
+start and end on row boundaries, and every range is parsed in a worker process.
+
+Boundaries are found without parsing: a range ends at the first newline after its target size
+that is outside a quoted field. Whether a position is inside quotes is the parity of the '"'
+characters before it, which holds for RFC 4180 quoting (a quote inside a quoted field is
+doubled), the way spreadsheet exports write CSV. Only the header rows are read twice.
+
+Workers return their results in range order (map_ranges), so callers merge per-month partials
+in file order and the output matches a sequential pass.
+"""
+
+import codecs
+import csv
+import io
+import mmap
+import os
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+from typing import Callable, Iterator, TypeVar
+
+from .xlsx import is_workbook
+
+T = TypeVar("T")
+
+# Files smaller than this are parsed sequentially (process start-up costs more than it saves)
+PARALLEL_MIN_BYTES = 16 * 1024 * 1024
+# Target size of one byte range; a few ranges per worker keep the workers evenly loaded
+RANGE_BYTES = 4 * 1024 * 1024
+# Quotes are counted in slices of this size, so a scan never copies a whole range
+_SCAN_BYTES = 1024 * 1024
+
+_QUOTE = b'"'
+_NEWLINE = b"\n"
+
+
+def _odd_quotes(mm: mmap.mmap, start: int, end: int) -> bool:
+    """True when mm[start:end] holds an odd number of quote characters."""
+    n = 0
+    for i in range(start, end, _SCAN_BYTES):
+        n += mm[i : min(i + _SCAN_BYTES, end)].count(_QUOTE)
+    return n % 2 == 1
+
+
+def _row_end(mm: mmap.mmap, pos: int, quoted: bool) -> int:
+    """Offset just past the first newline at or after pos that is outside quotes."""
+    while True:
+        nl = mm.find(_NEWLINE, pos)
+        if nl < 0:
+            return len(mm)
+        quoted ^= _odd_quotes(mm, pos, nl)
+        pos = nl + 1
+        if not quoted:
+            return pos
+
+
+def row_ranges(
+    path: Path, header_rows: int = 1, range_bytes: int | None = None
+) -> tuple[int, list[tuple[int, int]]]:
+    """
+    (data_start, ranges): the byte offset after the BOM and header_rows rows, and consecutive
+    (start, end) byte ranges of about range_bytes (default RANGE_BYTES) covering the rest of
+    the file, each ending on a row boundary.
+    """
+    if range_bytes is None:
+        range_bytes = RANGE_BYTES
+    with path.open("rb") as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return 0, []
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            size = len(mm)
+            pos = len(codecs.BOM_UTF8) if mm[: len(codecs.BOM_UTF8)] == codecs.BOM_UTF8 else 0
+            for _ in range(header_rows):
+                pos = _row_end(mm, pos, False)
+            data_start = pos
+            ranges = []
+            while pos < size:
+                target = min(pos + range_bytes, size)
+                end = size if target >= size else _row_end(mm, target, _odd_quotes(mm, pos, target))
+                ranges.append((pos, end))
+                pos = end
+            return data_start, ranges
+
+
+def read_rows(path: Path, start: int, end: int, delimiter: str = ",") -> Iterator[list[str]]:
+    """CSV rows in the byte range [start, end) of path (a range from row_ranges)."""
+    with path.open("rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        text = mm[start:end].decode("utf-8")
+    # newline="" splits lines the way open(..., newline="") does, so quoted newlines survive
+    return csv.reader(io.StringIO(text, newline=""), delimiter=delimiter)
+
+
+def worker_count(workers: int | None, ranges: int) -> int:
+    """Processes to use for ranges byte ranges: workers, default one per CPU, never more than ranges."""
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, ranges))
+
+
+def use_parallel(path: Path, workers: int | None) -> bool:
+    """
+    Whether a single file is worth splitting: large enough and more than one worker allowed.
+    Only delimited text can be split into byte ranges, not a (compressed) .xlsx workbook.
+    """
+    if (workers is not None and workers <= 1) or is_workbook(path):
+        return False
+    if worker_count(workers, 2) <= 1:
+        return False
+    try:
+        return path.stat().st_size >= PARALLEL_MIN_BYTES
+    except OSError:
+        return False
+
+
+def map_ranges(
+    parse_range: Callable[[Path, int, int], T],
+    path: Path,
+    ranges: list[tuple[int, int]],
+    workers: int | None = None,
+) -> Iterator[T]:
+    """
+    parse_range(path, start, end) for every range, in worker processes; results are yielded in
+    range order. parse_range must be picklable (a module-level function or a partial of one).
+    """
+    workers = worker_count(workers, len(ranges))
+    if workers <= 1:
+        for start, end in ranges:
+            yield parse_range(path, start, end)
+        return
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        starts = [start for start, _ in ranges]
+        ends = [end for _, end in ranges]
+        yield from pool.map(parse_range, [path] * len(ranges), starts, ends)
@@ -0,0 +1,229 @@
+"""
+Person -> profile mapping and the (month, profile) group-by of person/month inputs.
+
+Person/month files (simple CSV, two-header TSV) have one row per person and month, the person
+named in the persoana column. PersonMap maps those names to app profile ids (ProfileId in
+lib/types.ts) and names the backup's profiles. The built-in map is the app's default profiles
+(Paul -> me, Codru -> wife); --persons reads another one from JSON:
+
+    {
+      "persons": {"Paul": "me", "Codru": "wife", "Ana": {"id": "kid", "name": "Ana M."}},
+      "duplicates": "sum"
+    }
+
+A person maps to a profile id, or to {"id", "name"} to also name the profile (by default a
+profile is named after the first person mapped to it). Several persons may share a profile;
+their rows for the same month are then duplicates of each other.
+
+Rows for a (month, profile) that already has one are combined by the "duplicates" policy:
+
+  sum    the amounts are added                      (default)
+  last   the later row wins
+  first  the earlier row wins
+  error  the conversion fails, naming the month and profile
+
+A sequential pass sums in plain float arithmetic, row by row. Paths that combine the rows in
+pieces (parallel byte ranges, cached chunks, runs spilled under a memory budget) sum exactly
+instead (MonthSum, exact=True), so the total does not depend on where the pieces were cut.
+
+group_people() is the streaming group-by: with sorted input each month is handed out as soon
+as a later one starts, so memory holds one month; otherwise months are collected (under a
+memory budget if given, see finance_import.spill) and handed out in month order, without a
+sort when they arrived in order anyway.
+"""
+
+import json
+from array import array
+from pathlib import Path
+from typing import Callable, Iterable, Iterator, Mapping
+
+from .backup import DEFAULT_PROFILES
+from .records import MonthSum, add_amounts, settle, sum_into
+from .spill import SpillingGroupBy
+
+DUPLICATE_POLICIES = ("sum", "last", "first", "error")
+DEFAULT_DUPLICATES = "sum"
+
+People = dict[str, "array | MonthSum"]
+
+
+class DuplicateRowError(ValueError):
+    def __init__(self, profile: str, month: str | None = None) -> None:
+        self.profile = profile
+        self.month = month
+        where = f" in {month}" if month else ""
+        super().__init__(f"Duplicate rows for profile {profile!r}{where} (duplicates policy: error)")
+
+
+def _duplicate_error(old: "array | MonthSum", new: "array | MonthSum") -> "array | MonthSum":
+    raise DuplicateRowError("")
+
+
+_MERGES: dict[str, Callable[["array | MonthSum", "array | MonthSum"], "array | MonthSum"]] = {
+    "sum": add_amounts,
+    "last": lambda old, new: new,
+    "first": lambda old, new: old,
+    "error": _duplicate_error,
+}
+# The same, for exact=True
+_EXACT_MERGES = dict(_MERGES, sum=sum_into)
+
+
+class PersonMap:
+    """Person cell -> profile id, profile names and the duplicates policy. Picklable."""
+
+    def __init__(
+        self,
+        persons: Mapping[str, str],
+        names: Mapping[str, str] | None = None,
+        duplicates: str = DEFAULT_DUPLICATES,
+    ) -> None:
+        if duplicates not in DUPLICATE_POLICIES:
+            raise ValueError(f"Unknown duplicates policy {duplicates!r} (use one of {', '.join(DUPLICATE_POLICIES)})")
+        self.persons = {person.strip(): profile_id for person, profile_id in persons.items()}
+        self.duplicates = duplicates
+        self.names: dict[str, str] = dict(names or {})
+        for person, profile_id in self.persons.items():
+            self.names.setdefault(profile_id, person)
+        self._merge = _MERGES[duplicates]
+        self._exact_merge = _EXACT_MERGES[duplicates]
+
+    def __reduce__(self):
+        return PersonMap, (self.persons, self.names, self.duplicates)
+
+    def get(self, cell: str) -> str | None:
+        """Profile id for a persoana cell (already stripped), or None for an unknown person."""
+        return self.persons.get(cell)
+
+    def person(self, profile_id: str) -> str | None:
+        """The persoana cell for profile_id (the first person mapped to it), or None."""
+        for person, mapped in self.persons.items():
+            if mapped == profile_id:
+                return person
+        return None
+
+    @property
+    def profile_ids(self) -> list[str]:
+        return list(dict.fromkeys(self.persons.values()))
+
+    def profiles(self) -> list[dict]:
+        """The backup's profiles list ({id, name}), in the order the persons are listed."""
+        return [{"id": profile_id, "name": self.names[profile_id]} for profile_id in self.profile_ids]
+
+    def fingerprint(self) -> list:
+        """JSON-able mapping, for cache keys."""
+        return [sorted(self.persons.items()), self.duplicates]
+
+    def add(
+        self, people: People, profile_id: str, amounts: "array | MonthSum", stats=None, month=None, exact=False
+    ) -> None:
+        """
+        Put one row's amounts into a month's people, combining a duplicate by the policy (summed
+        exactly, as MonthSum, with exact).
+        """
+        old = people.get(profile_id)
+        if old is None:
+            people[profile_id] = amounts
+            return
+        if stats is not None:
+            stats.count("duplicateRows")
+        try:
+            people[profile_id] = (self._exact_merge if exact else self._merge)(old, amounts)
+        except DuplicateRowError:
+            raise DuplicateRowError(profile_id, month) from None
+
+    def combine(self, acc: People, people: People, stats=None, month=None, exact=False) -> People:
+        """Add a later group's people to acc (in place)."""
+        for profile_id, amounts in people.items():
+            self.add(acc, profile_id, amounts, stats, month, exact)
+        return acc
+
+
+DEFAULT_PERSONS = PersonMap({p["name"]: p["id"] for p in DEFAULT_PROFILES}, {p["id"]: p["name"] for p in DEFAULT_PROFILES})
+
+
+def load_persons(path: Path) -> PersonMap:
+    """PersonMap from the JSON config at path (see the module docstring)."""
+    try:
+        data = json.loads(path.read_text(encoding="utf-8"))
+    except ValueError as e:
+        raise ValueError(f"{path} is not valid JSON: {e}") from e
+    if not isinstance(data, dict) or not isinstance(data.get("persons"), dict) or not data["persons"]:
+        raise ValueError(f"{path}: expected an object with a non-empty \"persons\" map")
+    persons: dict[str, str] = {}
+    names: dict[str, str] = {}
+    for person, target in data["persons"].items():
+        if isinstance(target, dict):
+            profile_id, name = target.get("id"), target.get("name")
+            if isinstance(name, str) and name.strip():
+                names.setdefault(profile_id, name.strip())
+        else:
+            profile_id = target
+        if not isinstance(profile_id, str) or not profile_id.strip():
+            raise ValueError(f"{path}: person {person!r} must map to a profile id or {{\"id\", \"name\"}}")
+        persons[person] = profile_id.strip()
+    try:
+        return PersonMap(persons, names, data.get("duplicates", DEFAULT_DUPLICATES))
+    except ValueError as e:
+        raise ValueError(f"{path}: {e}") from e
+
+
+def _settled(people: People) -> dict[str, array]:
+    return {profile_id: settle(amounts) for profile_id, amounts in people.items()}
+
+
+def group_people(
+    items: Iterable[tuple[str, People]],
+    persons: PersonMap = DEFAULT_PERSONS,
+    sorted_input: bool = False,
+    memory_budget: int | None = None,
+    stats=None,
+    settled: bool = True,
+    exact: bool = False,
+) -> Iterator[tuple[str, People]]:
+    """
+    Group (month, people) items, e.g. one per row, into one (month, people) per month in month
+    order, combining profiles a month already has by persons' duplicates policy. With
+    sorted_input, a month is yielded as soon as a later month is seen and a month that goes
+    back in time raises ValueError. With memory_budget (bytes), months beyond the budget are
+    spilled to temp files as sorted runs and merged, always with exact sums (a run holds a
+    partial sum, not its rows). With exact, duplicates are summed exactly (items that are
+    partial groups, e.g. parallel ranges); with settled=False, exact sums stay MonthSum for
+    further merging.
+    """
+    finish = _settled if settled else (lambda people: people)
+    if memory_budget is not None and not sorted_input:
+        exact = True
+        groups = SpillingGroupBy(lambda acc, people: persons.combine(acc, people, stats, exact=exact), memory_budget)
+        try:
+            for month, people in items:
+                try:
+                    groups.add(month, dict(people))
+                except DuplicateRowError as e:
+                    raise DuplicateRowError(e.profile, month) from None
+            if stats is not None:
+                stats.count("spilledRuns", groups.spilled)
+            for month, people in groups.items():
+                yield month, finish(people)
+        finally:
+            groups.close()
+        return
+    pending: dict[str, People] = {}
+    current: str | None = None
+    in_order = True
+    for month, people in items:
+        if month != current:
+            if current is not None and month < current:
+                if sorted_input:
+                    raise ValueError(f"Input is not sorted by month: {month} after {current}")
+                in_order = False
+            elif sorted_input and current is not None:
+                yield current, finish(pending.pop(current))
+            current = month
+        acc = pending.get(month)
+        if acc is None:
+            pending[month] = dict(people)
+        else:
+            persons.combine(acc, people, stats, month, exact)
+    for month in pending if in_order else sorted(pending):
+        yield month, finish(pending[month])
@@ -0,0 +1,190 @@
+"""
+Projection of strategy plans (--project): monthly records, balances and income estimates.
+
+A strategy CSV has one record per "incepand cu ..." period. project() expands every period to
+each month until the next period starts, the last one until the horizon, and computes per
+month:
+
+  amounts    the period's vector (shared by the period's months, not copied)
+  income     venit + bonuri + extra (calculateIncomeTotal)
+  balances   the running economii / investitii balances: each month the balance grows by
+             the monthly rate of its annual growth rate, then the month's amount is added
+
+Balances are computed with NumPy over all months at once when it is installed: with g the
+monthly growth factor, balance[t] = g^t * (opening * g + cumsum(amount[s] / g^s)[t]). The
+stdlib path evaluates the same expression with itertools.accumulate (np.cumsum also adds
+left to right, and both take g^t from Python's **), so both give identical numbers.
+
+projection_document() adds the app's income-estimate shapes (lib/types.ts): an
+IncomeEstimatesByProfile with every month's income per profile, and an
+IncomeEstimateSummaryByYear with each year's opening economii balance and average monthly
+economii amount.
+"""
+
+from array import array
+from itertools import accumulate
+from typing import Iterable, Mapping, NamedTuple, Sequence
+
+from .records import KEY_INDEX
+
+try:
+    import numpy as np
+except ImportError:  # optional: stdlib path below gives identical results
+    np = None
+
+# Categories with a running balance
+BALANCE_KEYS = ("economii", "investitii")
+# calculateIncomeTotal, added left to right
+INCOME_KEYS = ("venit", "bonuri", "extra")
+
+
+def month_index(month: str) -> int:
+    return int(month[:4]) * 12 + int(month[5:7]) - 1
+
+
+def month_name(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+def default_horizon(periods: Sequence[tuple[str, array]]) -> str:
+    """December of the last period's year."""
+    return f"{periods[-1][0][:4]}-12"
+
+
+class Projection(NamedTuple):
+    months: list[str]
+    # One vector per month (a period's months share its vector)
+    amounts: list[array]
+    income: list[float]
+    # key -> balance at the end of each month
+    balances: dict[str, list[float]]
+
+
+def expand_periods(periods: Iterable[tuple[str, array]], horizon: str) -> tuple[list[str], list[array]]:
+    """
+    (months, vector per month) from sorted (start month, vector) periods: each period lasts
+    until the month before the next one, the last until horizon (inclusive). A later period
+    with the same start month wins; periods after the horizon are dropped.
+    """
+    starts: dict[int, array] = {}
+    for month, amounts in periods:
+        starts[month_index(month)] = amounts
+    end = month_index(horizon) + 1
+    indexes = sorted(i for i in starts if i < end)
+    months: list[str] = []
+    vectors: list[array] = []
+    for i, start in enumerate(indexes):
+        stop = indexes[i + 1] if i + 1 < len(indexes) else end
+        months.extend(month_name(m) for m in range(start, stop))
+        vectors.extend([starts[start]] * (stop - start))
+    return months, vectors
+
+
+def monthly_factor(annual_rate: float) -> float:
+    """Monthly growth factor of an annual rate (0.05 -> 1.05 ** (1/12)). Rates must be above -1."""
+    if not annual_rate > -1.0:
+        raise ValueError(f"annual growth rate must be greater than -1: {annual_rate}")
+    return (1.0 + annual_rate) ** (1.0 / 12.0)
+
+
+def _powers(factor: float, n: int) -> list[float]:
+    # Python's ** for both paths: NumPy's power may round differently in the last bit
+    return [factor ** float(t) for t in range(n)]
+
+
+def _balance_numpy(amounts: Sequence[float], factor: float, opening: float) -> list[float]:
+    powers = np.array(_powers(factor, len(amounts)), dtype=np.float64)
+    scaled = np.asarray(amounts, dtype=np.float64) / powers
+    sums = np.cumsum(np.concatenate(([opening * factor], scaled)))[1:]
+    return (sums * powers).tolist()
+
+
+def _balance_stdlib(amounts: Sequence[float], factor: float, opening: float) -> list[float]:
+    powers = _powers(factor, len(amounts))
+    sums = list(accumulate((a / p for a, p in zip(amounts, powers)), initial=opening * factor))[1:]
+    return [s * p for s, p in zip(sums, powers)]
+
+
+def project(
+    periods: Iterable[tuple[str, array]],
+    horizon: str,
+    growth: Mapping[str, float] | None = None,
+    opening: Mapping[str, float] | None = None,
+    use_numpy: bool | None = None,
+) -> Projection:
+    """
+    Expand periods (sorted (start month, vector)) to every month until horizon and compute
+    income and balances. growth maps BALANCE_KEYS to annual rates (default 0), opening to the
+    balances before the first month (default 0).
+    """
+    months, vectors = expand_periods(periods, horizon)
+    # Per period, then repeated: a vector's months share the same values
+    income_of: dict[int, float] = {}
+    for v in vectors:
+        if id(v) not in income_of:
+            total = 0.0
+            for key in INCOME_KEYS:
+                total += v[KEY_INDEX[key]]
+            income_of[id(v)] = total
+    income = [income_of[id(v)] for v in vectors]
+    numpy = np is not None if use_numpy is None else use_numpy and np is not None
+    balance = _balance_numpy if numpy else _balance_stdlib
+    balances = {}
+    for key in BALANCE_KEYS:
+        factor = monthly_factor((growth or {}).get(key, 0.0))
+        amounts = [v[KEY_INDEX[key]] for v in vectors]
+        balances[key] = balance(amounts, factor, (opening or {}).get(key, 0.0)) if months else []
+    return Projection(months, vectors, income, balances)
+
+
+def income_estimates(projection: Projection, profiles: Iterable[str]) -> dict:
+    """
+    IncomeEstimatesByProfile: profile -> year -> {"months": {month: income}}, with all 12
+    months of each projected year (0 outside the projection, as createDefaultIncomeEstimateYear).
+    """
+    years: dict[str, dict] = {}
+    for month, income in zip(projection.months, projection.income):
+        year = month[:4]
+        if year not in years:
+            years[year] = {"months": {f"{year}-{m:02d}": 0.0 for m in range(1, 13)}}
+        years[year]["months"][month] = income
+    # The profiles of a strategy plan share its vectors, so they share the estimates too
+    return {profile: {year: {"months": dict(data["months"])} for year, data in years.items()} for profile in profiles}
+
+
+def estimate_summaries(projection: Projection, opening: float = 0.0) -> dict:
+    """
+    IncomeEstimateSummaryByYear: year -> {targetEconomiiLunare: the year's average monthly
+    economii amount, economiiInceput: the economii balance when the year's projection starts}.
+    """
+    economii = KEY_INDEX["economii"]
+    balances = projection.balances["economii"]
+    summaries: dict[str, dict] = {}
+    amounts: dict[str, list[float]] = {}
+    for i, (month, vector) in enumerate(zip(projection.months, projection.amounts)):
+        year = month[:4]
+        if year not in summaries:
+            summaries[year] = {"targetEconomiiLunare": 0.0, "economiiInceput": balances[i - 1] if i else opening}
+            amounts[year] = []
+        amounts[year].append(vector[economii])
+    for year, values in amounts.items():
+        summaries[year]["targetEconomiiLunare"] = sum(values) / len(values)
+    return summaries
+
+
+def projection_document(
+    projection: Projection,
+    profiles: Iterable[str],
+    growth: Mapping[str, float] | None = None,
+    opening: Mapping[str, float] | None = None,
+) -> dict:
+    """The --projection JSON: months, balances and the app's income-estimate shapes."""
+    return {
+        "months": projection.months,
+        "growth": {key: (growth or {}).get(key, 0.0) for key in BALANCE_KEYS},
+        "opening": {key: (opening or {}).get(key, 0.0) for key in BALANCE_KEYS},
+        "income": projection.income,
+        "balances": projection.balances,
+        "incomeEstimates": income_estimates(projection, profiles),
+        "incomeEstimateSummaryByYear": estimate_summaries(projection, (opening or {}).get("economii", 0.0)),
+    }
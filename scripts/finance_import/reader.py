@@ -0,0 +1,160 @@
+"""
+Streaming backup reader: the records of a v2/v3 backup one at a time, without loading the
+document (the counterpart of finance_import.writer).
+
+load_backup() parses a whole backup with json.load, which holds the document and every
+record at once. BackupReader reads the file in READ_CHUNK pieces and walks the top-level
+object itself: "version", "profiles" and other members are decoded whole (they are small),
+while the "data" array is decoded one record at a time with json.JSONDecoder.raw_decode, so
+memory is one chunk plus one record whatever the size of the backup. .gz backups are
+decompressed on the fly.
+
+Members may come in any order. The app (lib/settings/data-io.ts) and the converters write
+version, data, profiles, so profiles is only known once records() is exhausted.
+"""
+
+import gzip
+import json
+import re
+from pathlib import Path
+from typing import IO, Iterator
+
+from .backup import SCHEMA_VERSION
+
+# Characters of the backup decoded at a time
+READ_CHUNK = 1 << 16
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+_DECODER = json.JSONDecoder()
+
+
+class BackupReader:
+    """
+    A backup opened for streaming: records() yields its data array's items in file order.
+    version and profiles are set as they are read (profiles stays None when the backup has none).
+    """
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        opener = gzip.open if path.suffix == ".gz" else open
+        self._file: IO[str] = opener(path, "rt", encoding="utf-8")
+        self._buf = ""
+        self._pos = 0
+        # Characters dropped from the front of _buf (for error positions)
+        self._offset = 0
+        self._eof = False
+        self._started = False
+        self.version: object = None
+        self.profiles: list[dict] | None = None
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self) -> "BackupReader":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _fill(self, size: int | None = None) -> bool:
+        """Read the next size (default READ_CHUNK) characters, dropping what was consumed; False at the end."""
+        if self._eof:
+            return False
+        chunk = self._file.read(READ_CHUNK if size is None else size)
+        if not chunk:
+            self._eof = True
+            return False
+        self._offset += self._pos
+        self._buf = self._buf[self._pos :] + chunk
+        self._pos = 0
+        return True
+
+    def _error(self, message: str, pos: int | None = None) -> ValueError:
+        at = self._offset + (self._pos if pos is None else pos)
+        return ValueError(f"{self.path} is not valid JSON: {message} (char {at})")
+
+    def _next_char(self) -> str:
+        """The next non-whitespace character (not consumed), "" at the end of the file."""
+        while True:
+            self._pos = _WHITESPACE.match(self._buf, self._pos).end()
+            if self._pos < len(self._buf):
+                return self._buf[self._pos]
+            if not self._fill():
+                return ""
+
+    def _expect(self, chars: str) -> str:
+        ch = self._next_char()
+        if not ch or ch not in chars:
+            found = repr(ch) if ch else "end of file"
+            raise self._error(f"expected {' or '.join(repr(c) for c in chars)}, found {found}")
+        self._pos += 1
+        return ch
+
+    def _value(self) -> object:
+        """Decode the next JSON value, reading more of the file until it is complete."""
+        self._next_char()
+        while True:
+            # Read at least as much as is pending, so a value (or a malformed file) is
+            # re-decoded a logarithmic number of times
+            more = max(READ_CHUNK, len(self._buf) - self._pos)
+            try:
+                value, end = _DECODER.raw_decode(self._buf, self._pos)
+            except json.JSONDecodeError as e:
+                if self._fill(more):
+                    continue
+                raise self._error(e.msg, e.pos) from None
+            # A number or literal that ends the buffer may continue in the next chunk
+            if end == len(self._buf) and self._fill(more):
+                continue
+            self._pos = end
+            return value
+
+    def records(self) -> Iterator[object]:
+        """The items of the backup's data array, one at a time. Once only."""
+        if self._started:
+            raise RuntimeError(f"{self.path} is already being read")
+        self._started = True
+        if self._next_char() != "{":
+            raise ValueError(f"{self.path} is not a backup file (expected {{version, data}})")
+        self._pos += 1
+        seen_data = False
+        if self._next_char() == "}":
+            self._pos += 1
+        else:
+            while True:
+                key = self._value()
+                self._expect(":")
+                if key == "data":
+                    seen_data = True
+                    yield from self._items()
+                elif key == "version":
+                    self.version = self._value()
+                    self._check_version()
+                elif key == "profiles":
+                    profiles = self._value()
+                    self.profiles = profiles if isinstance(profiles, list) else None
+                else:
+                    self._value()
+                if self._expect(",}") == "}":
+                    break
+        if self._next_char():
+            raise self._error("extra data after the backup object")
+        if not seen_data:
+            raise ValueError(f"{self.path} is not a backup file (expected {{version, data}})")
+        self._check_version()
+
+    def _items(self) -> Iterator[object]:
+        if self._next_char() != "[":
+            raise ValueError(f"{self.path} is not a backup file (expected {{version, data}})")
+        self._pos += 1
+        if self._next_char() == "]":
+            self._pos += 1
+            return
+        while True:
+            yield self._value()
+            if self._expect(",]") == "]":
+                return
+
+    def _check_version(self) -> None:
+        if self.version not in (2, SCHEMA_VERSION):
+            raise ValueError(f"{self.path}: backup version {self.version} is not supported (need 2 or 3)")
@@ -0,0 +1,176 @@
+"""
+Compact in-memory month records.
+
+Category amounts are a fixed-order array('d') indexed by CATEGORY_KEYS instead of a
+26-key dict. Profiles with identical amounts share one array (e.g. "me" and "wife" in the
+table and strategy formats); an array is treated as immutable once it is stored in a
+MonthRecord, so code that needs to change a shared vector copies it first. Dicts are only
+built by MonthRecord.to_dict() when the record is serialized.
+"""
+
+import math
+from array import array
+from operator import add
+from typing import Iterable, Mapping
+
+# All CategoryAmounts keys (must match lib/types.ts)
+CATEGORY_KEYS = [
+    "venit", "bonuri", "extra",
+    "rate",
+    "apple", "intretinere", "internet", "gaz", "curent", "telefon", "netflix", "sala",
+    "educatie", "sanatate", "beauty", "haine",
+    "diverse", "transport", "cadouri", "vacante", "casa", "gadgets", "tazz", "alimente",
+    "economii", "investitii",
+]
+KEY_INDEX = {k: i for i, k in enumerate(CATEGORY_KEYS)}
+
+_ZEROS = array("d", [0.0]) * len(CATEGORY_KEYS)
+
+
+def new_amounts() -> array:
+    """A fresh all-zero amounts vector."""
+    return array("d", _ZEROS)
+
+
+def amounts_from_dict(amounts: Mapping[str, float]) -> array:
+    out = new_amounts()
+    for key, value in amounts.items():
+        i = KEY_INDEX.get(key)
+        if i is not None:
+            out[i] = value
+    return out
+
+
+def amounts_to_dict(amounts: array) -> dict[str, float]:
+    return dict(zip(CATEGORY_KEYS, amounts))
+
+
+def _grow(partials: list[float], x: float) -> None:
+    """Add x to a list of non-overlapping partial sums (Shewchuk), keeping the sum exact."""
+    if not math.isfinite(x) or (partials and not math.isfinite(partials[-1])):
+        partials[:] = [math.fsum(partials) + x]
+        return
+    i = 0
+    for y in partials:
+        if abs(x) < abs(y):
+            x, y = y, x
+        hi = x + y
+        lo = y - (hi - x)
+        if lo:
+            partials[i] = lo
+            i += 1
+        x = hi
+    partials[i:] = [x]
+
+
+class MonthSum:
+    """
+    Exact running sum of amount vectors. total() is the correctly rounded sum of everything
+    added, whatever the order or grouping, so chunked and cached aggregation match a
+    single sequential pass bit for bit.
+    """
+
+    __slots__ = ("partials",)
+
+    def __init__(self, partials: list[list[float]]) -> None:
+        self.partials = partials
+
+    @classmethod
+    def of(cls, amounts: "array | MonthSum") -> "MonthSum":
+        if isinstance(amounts, MonthSum):
+            return cls([list(p) for p in amounts.partials])
+        return cls([[v] for v in amounts])
+
+    def add(self, amounts: "array | MonthSum") -> None:
+        if isinstance(amounts, MonthSum):
+            for partials, other in zip(self.partials, amounts.partials):
+                for v in other:
+                    _grow(partials, v)
+        else:
+            for partials, v in zip(self.partials, amounts):
+                if v:
+                    _grow(partials, v)
+
+    def total(self) -> array:
+        return array("d", (math.fsum(p) for p in self.partials))
+
+
+def sum_into(acc: "array | MonthSum", amounts: "array | MonthSum") -> MonthSum:
+    """Add amounts to acc; returns the MonthSum now holding the total (acc itself when it is one)."""
+    if not isinstance(acc, MonthSum):
+        acc = MonthSum.of(acc)
+    acc.add(amounts)
+    return acc
+
+
+def add_amounts(acc: "array | MonthSum", amounts: "array | MonthSum") -> "array | MonthSum":
+    """
+    acc + amounts as a new vector, in plain float arithmetic (rows added in file order, as one
+    sequential pass sees them). Neither input is changed; a MonthSum operand keeps the sum exact.
+    """
+    if isinstance(acc, MonthSum) or isinstance(amounts, MonthSum):
+        return sum_into(MonthSum.of(acc), amounts)
+    # Through a list: array() takes one much faster than an iterator
+    return array("d", list(map(add, acc, amounts)))
+
+
+def settle(amounts: "array | MonthSum") -> array:
+    return amounts.total() if isinstance(amounts, MonthSum) else amounts
+
+
+class MonthRecord:
+    """
+    One month: profile id -> amounts vector. Vectors may be shared between profiles. source is
+    (input name, row number) of the month's first input row when the converter tracked it (see
+    cite_rows), for validation messages; it is not written.
+    """
+
+    __slots__ = ("month", "people", "source")
+
+    def __init__(self, month: str, people: dict[str, array], source: tuple[str, int] | None = None) -> None:
+        self.month = month
+        self.people = people
+        self.source = source
+
+    def __repr__(self) -> str:
+        return f"MonthRecord({self.month!r}, {sorted(self.people)})"
+
+    def __getstate__(self) -> tuple[str, dict[str, array], tuple[str, int] | None]:
+        return self.month, self.people, self.source
+
+    def __setstate__(self, state: tuple[str, dict[str, array], tuple[str, int] | None]) -> None:
+        self.month, self.people, self.source = state
+
+    def to_dict(self, now_iso: str) -> dict:
+        """Build the app's MonthRecord JSON shape. Shared vectors are converted once."""
+        converted: dict[int, dict[str, float]] = {}
+        people = {}
+        for profile, amounts in self.people.items():
+            d = converted.get(id(amounts))
+            if d is None:
+                d = converted[id(amounts)] = amounts_to_dict(amounts)
+            people[profile] = d
+        return {
+            "month": self.month,
+            "people": people,
+            "meta": {"updatedAt": now_iso, "isSaved": False},
+        }
+
+
+def cite_rows(records: Iterable[MonthRecord], name: str, first_rows: dict[str, int] | None) -> Iterable[MonthRecord]:
+    """
+    records, each given the source (name, first_rows[month]) as it passes. first_rows (month ->
+    row number of its first input row) is filled by the parser while the records are produced;
+    None (rows not tracked) leaves the records as they are.
+    """
+    if first_rows is None:
+        return records
+    return _cited(records, name, first_rows)
+
+
+def _cited(records: Iterable[MonthRecord], name: str, first_rows: dict[str, int]) -> Iterable[MonthRecord]:
+    for record in records:
+        row = first_rows.get(record.month)
+        if row is not None:
+            record.source = (name, row)
+        yield record
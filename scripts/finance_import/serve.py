@@ -0,0 +1,323 @@
+"""
+Long-running serve mode: watch a data directory, keep every input's parsed records in
+memory and serve the merged backup over HTTP on localhost.
+
+ServeState polls the directory (stdlib only: os.stat of the inputs every interval). Only
+inputs whose size or mtime changed are parsed again; the others keep their records. The
+merged records (by default later files win per month and profile, as a batch run; the
+caller may pass its own merge) are rendered once per
+change, as the full backup and as one backup per year, and kept as bytes with a strong ETag
+(a hash of the body). When a change does not change any amount, the previous documents and
+ETags are kept, so clients keep getting 304s.
+
+Endpoints (GET / HEAD):
+  /backup.json          full v3 backup
+  /backup-YYYY.json     backup of one year
+  /manifest.json        the years with their paths, month counts and ETags
+
+Responses carry ETag and Cache-Control: no-cache; a request whose If-None-Match lists the
+current ETag gets 304 Not Modified without a body. The server binds to 127.0.0.1 by default
+and sends no CORS headers unless an origin is allowed explicitly, so other web pages cannot
+read the data.
+"""
+
+import hashlib
+import io
+import json
+import threading
+import time
+from datetime import datetime, timezone
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Callable, NamedTuple
+
+from .backup import DEFAULT_PROFILES, SCHEMA_VERSION, people_ids, used_profiles
+from .batch import expand_inputs, merge_by_month, run_batch
+from .cache import records_digest
+from .records import MonthRecord
+from .totals import TotalsBuilder
+from .writer import COMPACT_SEPARATORS, BackupWriter
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8765
+# Seconds between directory scans
+DEFAULT_INTERVAL = 1.0
+
+BACKUP_PATH = "/backup.json"
+MANIFEST_PATH = "/manifest.json"
+
+
+def year_path(year: str) -> str:
+    return f"/backup-{year}.json"
+
+
+class Document(NamedTuple):
+    body: bytes
+    etag: str
+
+
+def make_document(body: bytes) -> Document:
+    return Document(body, '"%s"' % hashlib.sha256(body).hexdigest()[:32])
+
+
+def etag_matches(if_none_match: str | None, etag: str) -> bool:
+    """Whether an If-None-Match header lists etag (weak comparison, as RFC 9110 asks for it)."""
+    if not if_none_match:
+        return False
+    tags = [t.strip() for t in if_none_match.split(",")]
+    return "*" in tags or etag in (t[2:] if t.startswith("W/") else t for t in tags)
+
+
+def _render_backup(
+    records: list[MonthRecord],
+    now_iso: str,
+    profiles: list[dict],
+    compact: bool,
+    totals: Callable[[], dict] | None = None,
+) -> Document:
+    out = io.StringIO()
+    writer = BackupWriter(out, SCHEMA_VERSION, profiles, compact, totals)
+    for record in records:
+        writer.write_record(record.to_dict(now_iso))
+    writer.close()
+    return make_document(out.getvalue().encode("utf-8"))
+
+
+class _Source(NamedTuple):
+    signature: tuple[int, int]  # (size, mtime_ns)
+    records: list[MonthRecord]
+
+
+class ServeState:
+    """
+    Parsed inputs and the rendered documents. refresh() is called from one thread (the
+    watcher); request handlers only read documents, which is replaced as a whole.
+    merge turns the inputs' (path, parse_file result, seconds), in path order, into the
+    records to serve.
+    """
+
+    def __init__(
+        self,
+        directory: Path,
+        suffixes: tuple[str, ...],
+        parse_file: Callable[[Path], list[MonthRecord]],
+        workers: int | None = None,
+        compact: bool = False,
+        totals: bool = False,
+        profiles: list[dict] | None = None,
+        merge: Callable[[list[tuple[Path, list, float]]], list[MonthRecord]] = merge_by_month,
+    ) -> None:
+        self.directory = directory
+        self._suffixes = suffixes
+        self._parse_file = parse_file
+        self._workers = workers
+        self._compact = compact
+        self._totals = totals
+        # Profile names (the served profiles are the ones the records use, see used_profiles)
+        self._profiles = DEFAULT_PROFILES if profiles is None else profiles
+        self._merge = merge
+        self._sources: dict[Path, _Source] = {}
+        # Signatures of inputs whose last parse failed: not parsed again until they change
+        self._failed: dict[Path, tuple[int, int]] = {}
+        self._digest: str | None = None
+        # year -> (digest of what the year's document depends on, document)
+        self._years: dict[str, tuple[str, Document]] = {}
+        self.documents: dict[str, Document] = {}
+        self.months = 0
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        signatures = {}
+        for path in expand_inputs(self.directory, self._suffixes):
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            signatures[path] = (st.st_size, st.st_mtime_ns)
+        return signatures
+
+    def refresh(self) -> list[Path]:
+        """
+        Re-parse new and changed inputs, forget removed ones and re-render when the merged
+        amounts changed. Returns the inputs that were converted. An input that fails to parse
+        keeps its previous records; its error is printed once and it is retried when it
+        changes again.
+        """
+        signatures = self._scan()
+        changed = [
+            p
+            for p, sig in signatures.items()
+            if (p not in self._sources or self._sources[p].signature != sig) and self._failed.get(p) != sig
+        ]
+        removed = [p for p in self._sources if p not in signatures]
+        for path in removed:
+            del self._sources[path]
+        for path in [p for p in self._failed if p not in signatures]:
+            del self._failed[path]
+        converted = []
+        if changed:
+            for path, records, _ in self._parse(changed):
+                if records is None:
+                    self._failed[path] = signatures[path]
+                else:
+                    self._failed.pop(path, None)
+                    self._sources[path] = _Source(signatures[path], records)
+                    converted.append(path)
+        if converted or removed or not self.documents:
+            self._render()
+        return converted
+
+    def _parse(self, paths: list[Path]) -> list[tuple[Path, list[MonthRecord] | None, float]]:
+        if len(paths) > 1:
+            try:
+                return run_batch(paths, self._parse_file, self._workers)
+            except Exception:
+                # One bad file fails the whole batch: parse one by one to keep the good ones
+                pass
+        results: list[tuple[Path, list[MonthRecord] | None, float]] = []
+        for path in paths:
+            start = time.perf_counter()
+            try:
+                records: list[MonthRecord] | None = self._parse_file(path)
+            except Exception as e:  # any bad input (e.g. csv.Error) must not stop the server
+                print(f"Error: {path}: {e}")
+                records = None
+            results.append((path, records, time.perf_counter() - start))
+        return results
+
+    def _render(self) -> None:
+        results = [(path, self._sources[path].records, 0.0) for path in sorted(self._sources)]
+        records = self._merge(results)
+        profiles = used_profiles(people_ids(records), self._profiles)
+        # Every document lists the profiles: a profile added or renamed anywhere changes them all
+        profiles_digest = hashlib.sha256(json.dumps(profiles, sort_keys=True).encode("utf-8")).hexdigest()
+        digest = records_digest(records) + profiles_digest
+        if digest == self._digest and self.documents:
+            return
+        now_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+        builder = None
+        if self._totals:
+            builder = TotalsBuilder(profiles)
+            for record in records:
+                builder.add(record)
+        documents = {
+            BACKUP_PATH: _render_backup(records, now_iso, profiles, self._compact, builder.build if builder else None)
+        }
+        by_year: dict[str, list[MonthRecord]] = {}
+        for record in records:
+            by_year.setdefault(record.month[:4], []).append(record)
+        years = []
+        year_docs: dict[str, tuple[str, Document]] = {}
+        previous = ""
+        for year, year_records in by_year.items():
+            # A year whose months did not change keeps its document and ETag. Its rolling
+            # totals reach back into the previous year, so with totals that year counts too.
+            year_digest = records_digest(year_records)
+            key = year_digest + profiles_digest + (previous if builder is not None else "")
+            previous = year_digest
+            cached = self._years.get(year)
+            if cached is not None and cached[0] == key:
+                doc = cached[1]
+            else:
+                first, last = year_records[0].month, year_records[-1].month
+                totals = partial(builder.build, first, last) if builder is not None else None
+                doc = _render_backup(year_records, now_iso, profiles, self._compact, totals)
+            year_docs[year] = (key, doc)
+            documents[year_path(year)] = doc
+            years.append({"year": year, "path": year_path(year), "months": len(year_records), "etag": doc.etag})
+        manifest = {"version": SCHEMA_VERSION, "path": BACKUP_PATH, "etag": documents[BACKUP_PATH].etag, "years": years}
+        documents[MANIFEST_PATH] = make_document(
+            json.dumps(manifest, ensure_ascii=False, separators=COMPACT_SEPARATORS).encode("utf-8")
+        )
+        self.documents = documents
+        self._years = year_docs
+        self.months = len(records)
+        self._digest = digest
+
+
+def make_handler(state: ServeState, allow_origin: str | None = None) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        server_version = "finance-import"
+
+        def _common_headers(self, doc: Document) -> None:
+            self.send_header("ETag", doc.etag)
+            self.send_header("Cache-Control", "no-cache")
+            if allow_origin is not None:
+                self.send_header("Access-Control-Allow-Origin", allow_origin)
+                self.send_header("Access-Control-Expose-Headers", "ETag")
+                self.send_header("Vary", "Origin")
+
+        def _respond(self, body: bool) -> None:
+            doc = state.documents.get(self.path.split("?", 1)[0])
+            if doc is None:
+                self.send_error(HTTPStatus.NOT_FOUND)
+                return
+            if etag_matches(self.headers.get("If-None-Match"), doc.etag):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self._common_headers(doc)
+                self.end_headers()
+                return
+            self.send_response(HTTPStatus.OK)
+            self._common_headers(doc)
+            self.send_header("Content-Type", "application/json; charset=utf-8")
+            self.send_header("Content-Length", str(len(doc.body)))
+            self.end_headers()
+            if body:
+                self.wfile.write(doc.body)
+
+        def do_GET(self) -> None:
+            self._respond(True)
+
+        def do_HEAD(self) -> None:
+            self._respond(False)
+
+        def do_OPTIONS(self) -> None:
+            # CORS preflight for the conditional request (If-None-Match is not a simple header)
+            self.send_response(HTTPStatus.NO_CONTENT)
+            if allow_origin is not None:
+                self.send_header("Access-Control-Allow-Origin", allow_origin)
+                self.send_header("Access-Control-Allow-Methods", "GET, HEAD")
+                self.send_header("Access-Control-Allow-Headers", "If-None-Match")
+            self.end_headers()
+
+    return Handler
+
+
+def watch(state: ServeState, interval: float, stop: threading.Event) -> None:
+    """
+    Refresh state every interval seconds until stop is set. A refresh that fails (e.g. the
+    merge raising DuplicateRowError) is reported and the previous documents stay served.
+    """
+    while not stop.wait(interval):
+        start = time.perf_counter()
+        try:
+            changed = state.refresh()
+        except Exception as e:  # the watcher thread must outlive any bad input
+            print(f"Error: refreshing {state.directory}: {e}")
+            continue
+        if changed:
+            names = ", ".join(p.name for p in changed)
+            print(f"Re-converted {names} in {time.perf_counter() - start:.3f}s; serving {state.months} month(s)")
+
+
+def serve(
+    state: ServeState,
+    host: str = DEFAULT_HOST,
+    port: int = DEFAULT_PORT,
+    interval: float = DEFAULT_INTERVAL,
+    allow_origin: str | None = None,
+) -> None:
+    """Serve state's documents until interrupted, refreshing it in a background thread."""
+    server = ThreadingHTTPServer((host, port), make_handler(state, allow_origin))
+    stop = threading.Event()
+    watcher = threading.Thread(target=watch, args=(state, interval, stop), daemon=True)
+    watcher.start()
+    print(f"Serving {state.months} month(s) from {state.directory} on http://{host}:{server.server_port}{BACKUP_PATH}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        stop.set()
+        server.server_close()
@@ -0,0 +1,160 @@
+"""
+Bounded-memory grouping of month aggregates (--memory-budget).
+
+SpillingGroupBy collects (month, value) pairs, combining values for the same month. When the
+estimated size of the pending aggregates exceeds the budget, they are written to a temp file
+as one run sorted by month and the memory is released. items() k-way merges the runs (and
+what is still pending) and combines each month's values in the order they were added, so the
+result is the same as grouping everything in memory: amount vectors are summed exactly
+(MonthSum) and person maps are combined by their duplicates policy.
+
+Sizes are estimates (sys.getsizeof of the vectors plus a fixed per-entry overhead); the
+budget bounds the aggregates, not the whole process.
+"""
+
+import heapq
+import pickle
+import re
+import sys
+import tempfile
+from array import array
+from pathlib import Path
+from typing import IO, Callable, Generic, Iterable, Iterator, TypeVar
+
+from .records import MonthSum
+
+V = TypeVar("V")
+
+# Dict slot, key string and tuple overhead per pending month (estimate)
+ENTRY_BYTES = 200
+# Open runs at most; when there are this many they are merged into one (keeps file handles bounded)
+MERGE_FANIN = 64
+
+_SIZE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*([kmg]?)i?b?\s*$", re.IGNORECASE)
+_UNITS = {"": 1, "k": 1024, "m": 1024**2, "g": 1024**3}
+
+
+def parse_size(value: str) -> int:
+    """'512K', '64M', '1.5G' or a plain byte count -> bytes (argparse type for --memory-budget)."""
+    m = _SIZE.match(value)
+    if not m:
+        raise ValueError(f"Invalid size {value!r} (use e.g. 64M, 512K or a byte count)")
+    size = int(float(m.group(1)) * _UNITS[m.group(2).lower()])
+    if size <= 0:
+        raise ValueError(f"Size must be positive: {value!r}")
+    return size
+
+
+def size_of(value: object) -> int:
+    """Estimated bytes held by an amounts vector, a MonthSum or a {profile: vector} map."""
+    if isinstance(value, array):
+        return sys.getsizeof(value)
+    if isinstance(value, MonthSum):
+        # One list per category; a partial float is 24 bytes plus its list slot
+        return sum(56 + 32 * len(p) for p in value.partials)
+    if isinstance(value, dict):
+        return sys.getsizeof(value) + sum(size_of(v) for v in value.values())
+    return sys.getsizeof(value)
+
+
+def _write_run(items: Iterable[tuple[str, object]], spill_dir: Path | None) -> IO[bytes]:
+    # One pickle per item: a shared (un)pickler memo would keep the whole run alive
+    fp = tempfile.TemporaryFile(prefix="finance-import-run-", dir=spill_dir)
+    for item in items:
+        pickle.dump(item, fp, pickle.HIGHEST_PROTOCOL)
+    fp.flush()
+    return fp
+
+
+def _read_run(fp: IO[bytes]) -> Iterator[tuple[str, object]]:
+    fp.seek(0)
+    try:
+        while True:
+            try:
+                yield pickle.load(fp)
+            except EOFError:
+                return
+    finally:
+        fp.close()
+
+
+class SpillingGroupBy(Generic[V]):
+    """
+    Group values by key under a memory budget. combine(acc, value) returns the combined value
+    and may modify acc in place. items() yields (key, combined value) sorted by key, once.
+    """
+
+    def __init__(
+        self,
+        combine: Callable[[V, V], V],
+        budget: int,
+        spill_dir: Path | None = None,
+        measure: Callable[[V], int] = size_of,
+    ) -> None:
+        self._combine = combine
+        self._budget = budget
+        self._spill_dir = spill_dir
+        self._measure = measure
+        self._pending: dict[str, V] = {}
+        self._bytes = 0
+        self._runs: list[IO[bytes]] = []
+        # Runs written to disk because the budget was exceeded (merged runs are not counted)
+        self.spilled = 0
+
+    def add(self, key: str, value: V) -> None:
+        acc = self._pending.get(key)
+        if acc is None:
+            self._pending[key] = value
+            self._bytes += ENTRY_BYTES + self._measure(value)
+        else:
+            self._pending[key] = self._combine(acc, value)
+            # Upper bound: the combined value grows by at most the added value
+            self._bytes += self._measure(value)
+        if self._bytes > self._budget:
+            self._spill()
+
+    def _spill(self) -> None:
+        self._runs.append(_write_run(self._sorted_pending(), self._spill_dir))
+        self._bytes = 0
+        self.spilled += 1
+        if len(self._runs) >= MERGE_FANIN:
+            # Earlier runs stay ahead of later ones, so merging them keeps the combine order
+            runs, self._runs = self._runs, []
+            self._runs.append(_write_run(self._merge([_read_run(fp) for fp in runs]), self._spill_dir))
+
+    def _sorted_pending(self) -> Iterator[tuple[str, V]]:
+        pending, self._pending = self._pending, {}
+        for key in sorted(pending):
+            yield key, pending.pop(key)
+
+    def _merge(self, sources: list[Iterator[tuple[str, V]]]) -> Iterator[tuple[str, V]]:
+        """
+        Sorted sources merged by key. heapq.merge yields equal keys in source order, so with the
+        sources in the order they were written, values are combined in the order they were added.
+        """
+        key: str | None = None
+        acc: V | None = None
+        for k, value in heapq.merge(*sources, key=lambda item: item[0]):
+            if k == key:
+                acc = self._combine(acc, value)
+                continue
+            if key is not None:
+                yield key, acc
+            key, acc = k, value
+        if key is not None:
+            yield key, acc
+
+    def items(self) -> Iterator[tuple[str, V]]:
+        if not self._runs:
+            yield from self._sorted_pending()
+            return
+        # Runs in the order they were written, then what is still in memory
+        sources = [_read_run(fp) for fp in self._runs] + [self._sorted_pending()]
+        self._runs = []
+        yield from self._merge(sources)
+
+    def close(self) -> None:
+        """Delete spilled runs that were not merged (items() not consumed)."""
+        for fp in self._runs:
+            fp.close()
+        self._runs = []
@@ -0,0 +1,209 @@
+"""
+Conversion statistics for --stats: per-stage timings, row/cell counters and an optional
+cProfile of the parsing stage.
+
+Conversions are streamed, so stages interleave: writing one record pulls it through
+aggregation, parsing and reading. Stage time is therefore exclusive: entering a stage pauses
+the clock of the stage that pulled it, so the stage totals add up to the wall time spent in
+timed code. Iterators are timed with Stats.timed(), blocks of code with Stats.stage().
+
+Counters are always kept (they are plain dict increments and feed the existing "Skipped N
+row(s)" messages); timing and profiling only cost anything when enabled.
+"""
+
+import cProfile
+import json
+import re
+import time
+from contextlib import AbstractContextManager, contextmanager, nullcontext
+from pathlib import Path
+from typing import IO, Iterable, Iterator, TypeVar
+
+T = TypeVar("T")
+
+# Stage names, in pipeline order (the report lists them in this order)
+STAGES = (
+    "read",
+    "format detection",
+    "header mapping",
+    "parsing",
+    "aggregation",
+    "projection",
+    "serialization",
+    "totals",
+    "write",
+)
+# Only this stage runs under the profiler (--profile)
+PROFILED_STAGE = "parsing"
+
+# Row skip reasons
+SKIP_BAD_MONTH = "badMonth"  # month cell present but unparseable
+SKIP_NO_MONTH = "noMonth"  # no month cell and no earlier month to carry over
+SKIP_UNKNOWN_PERSON = "unknownPersoana"
+SKIP_SHORT_ROW = "shortRow"
+SKIP_EMPTY_ROW = "emptyRow"
+SKIP_ZERO_AMOUNT = "zeroAmount"
+SKIP_UNMAPPED_LABEL = "unmappedLabel"
+
+# "0", "0,00", "-0.000", "0**": a real zero, not a fallback
+_ZERO_LITERAL = re.compile(r"^[+-]?[0.,]*0[0.,]*(\*.*)?$")
+
+
+def is_zero_fallback(cell: str, value: float) -> bool:
+    """True when a non-blank cell parsed to 0.0 without being written as zero."""
+    if value != 0.0 or not cell:
+        return False
+    s = cell.strip().replace(" ", "")
+    return bool(s) and not _ZERO_LITERAL.match(s)
+
+
+def count_zero_fallbacks(cells: Iterable[str], values: Iterable[float]) -> int:
+    return sum(1 for cell, value in zip(cells, values) if value == 0.0 and is_zero_fallback(cell, value))
+
+
+class _TimedWriter:
+    """File proxy that charges write() calls to the "write" stage."""
+
+    def __init__(self, fp: IO[str], stats: "Stats") -> None:
+        self._fp = fp
+        self._stats = stats
+
+    def write(self, s: str) -> int:
+        self._stats._push("write")
+        try:
+            return self._fp.write(s)
+        finally:
+            self._stats._pop()
+
+    def __getattr__(self, name: str):
+        return getattr(self._fp, name)
+
+
+class Stats:
+    """
+    Counters and (when timing) exclusive per-stage seconds for one conversion.
+    With profile, the parsing stage runs under cProfile; dump_profile() writes it in pstats format.
+    """
+
+    def __init__(self, timing: bool = False, profile: bool = False) -> None:
+        self.timing = timing or profile
+        self.counters: dict[str, int] = {}
+        self.skipped: dict[str, int] = {}
+        self.seconds: dict[str, float] = {}
+        self.info: dict[str, object] = {}
+        self._stack: list[str] = []
+        self._mark = 0.0
+        self._started = time.perf_counter()
+        self._profiler = cProfile.Profile() if profile else None
+
+    def count(self, name: str, n: int = 1) -> None:
+        if n:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def skip(self, reason: str, n: int = 1) -> None:
+        if n:
+            self.skipped[reason] = self.skipped.get(reason, 0) + n
+
+    def add_counts(self, counters: dict[str, int], skipped: dict[str, int]) -> None:
+        """Add counters and skips collected elsewhere (e.g. by a worker process)."""
+        for name, n in counters.items():
+            self.count(name, n)
+        for reason, n in skipped.items():
+            self.skip(reason, n)
+
+    def _charge(self, now: float) -> None:
+        if self._stack:
+            top = self._stack[-1]
+            self.seconds[top] = self.seconds.get(top, 0.0) + now - self._mark
+        self._mark = now
+
+    def _toggle_profiler(self, before: str | None) -> None:
+        after = self._stack[-1] if self._stack else None
+        if self._profiler is None or (before == PROFILED_STAGE) == (after == PROFILED_STAGE):
+            return
+        if after == PROFILED_STAGE:
+            self._profiler.enable()
+        else:
+            self._profiler.disable()
+
+    def _push(self, name: str) -> None:
+        before = self._stack[-1] if self._stack else None
+        self._charge(time.perf_counter())
+        self._stack.append(name)
+        self._toggle_profiler(before)
+
+    def _pop(self) -> None:
+        self._charge(time.perf_counter())
+        before = self._stack.pop()
+        self._toggle_profiler(before)
+
+    @contextmanager
+    def stage(self, name: str) -> Iterator[None]:
+        if not self.timing:
+            yield
+            return
+        self._push(name)
+        try:
+            yield
+        finally:
+            self._pop()
+
+    def timed(self, items: Iterable[T], name: str) -> Iterable[T]:
+        """items, with the time spent producing each one charged to stage name."""
+        if not self.timing:
+            return items
+        return self._timed(iter(items), name)
+
+    def _timed(self, it: Iterator[T], name: str) -> Iterator[T]:
+        while True:
+            self._push(name)
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            finally:
+                self._pop()
+            yield item
+
+    def timed_writer(self, fp: IO[str]) -> IO[str]:
+        return _TimedWriter(fp, self) if self.timing else fp
+
+    def report(self) -> dict:
+        """Machine-readable report (the --stats-json document)."""
+        stages = {name: round(self.seconds[name], 6) for name in STAGES if name in self.seconds}
+        stages.update({name: round(s, 6) for name, s in self.seconds.items() if name not in stages})
+        return {
+            **self.info,
+            "totalSeconds": round(time.perf_counter() - self._started, 6),
+            "stages": stages if self.timing else None,
+            "counters": dict(sorted(self.counters.items())),
+            "skipped": dict(sorted(self.skipped.items())),
+        }
+
+    def write_json(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(self.report(), indent=2) + "\n", encoding="utf-8")
+
+    def dump_profile(self, path: Path) -> None:
+        if self._profiler is not None:
+            self._profiler.dump_stats(str(path))
+
+    def print_summary(self) -> None:
+        report = self.report()
+        print(f"Stats ({report['totalSeconds']:.3f}s total):")
+        for name, seconds in (report["stages"] or {}).items():
+            print(f"  {name:<17} {seconds:9.3f}s")
+        for name, n in report["counters"].items():
+            print(f"  {name:<17} {n:>10,}")
+        for reason, n in report["skipped"].items():
+            print(f"  skipped {reason:<9} {n:>10,}")
+
+
+def stage(stats: Stats | None, name: str) -> AbstractContextManager:
+    """stats.stage(name), or a no-op context when there are no stats."""
+    return stats.stage(name) if stats is not None else nullcontext()
+
+
+def timed(stats: Stats | None, items: Iterable[T], name: str) -> Iterable[T]:
+    """stats.timed(items, name), or items unchanged when there are no stats."""
+    return stats.timed(items, name) if stats is not None else items
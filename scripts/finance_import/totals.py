@@ -0,0 +1,351 @@
+"""
+Precomputed dashboard totals (--totals): the backup's optional "totals" section.
+
+The dashboard derives its numbers from the month records on every view change
+(lib/calculations/calculations.ts, buildChartData / buildCurrentData in
+lib/dashboard/dashboard-data.ts). TotalsBuilder computes the same numbers once, while the
+records are written:
+
+  months   month -> view -> the chart point fields (income, bills, expenses, ...)
+  years    year -> view -> totals of the year's summed amounts (as buildCurrentData)
+  rolling  window -> month -> view -> totals of the trailing window of calendar months
+
+A view is a profile id or "combined" (the profiles' amounts summed in the backup's profile
+order, as getCombinedData). Views without data for a month are left out; the app shows
+zeros for them.
+
+Every number is computed with the same float operations in the same order as the TypeScript
+code (left-to-right sums, sumCategoryAmounts' sequential reduce, Math.round), so the values
+are bit-identical to what the app computes, not just close. The app strips unknown top-level
+keys when it imports a backup, so the section does not affect importing.
+"""
+
+import math
+import re
+from array import array
+from typing import Callable, Iterable, Iterator, Mapping, Sequence
+
+from .records import CATEGORY_KEYS, KEY_INDEX, MonthRecord, amounts_from_dict
+
+try:
+    import numpy as np
+except ImportError:  # optional: stdlib path below gives identical results
+    np = None
+
+# PersonView for the sum over all profiles (lib/types.ts)
+COMBINED = "combined"
+
+# Trailing windows, in calendar months, of the "rolling" section
+ROLLING_WINDOWS = (3, 12)
+
+# Fields per month (ChartDataPoint, with cashflow after investments as the app's default
+# setting and profitLoss as the cashflow before investments)
+MONTH_FIELDS = (
+    "income", "bills", "expenses", "restExpenses", "economii", "investitii",
+    "investments", "profitLoss", "cashflow", "total", "savingsRate",
+)
+# Fields per year / rolling window, plus "months" (months with data in the period)
+ROLLUP_FIELDS = ("income", "bills", "expenses", "investments", "profitLoss", "cashflow")
+
+_MONTH = re.compile(r"^(\d{4})-(0[1-9]|1[0-2])$")
+
+
+def _formulas(col: Callable[[str], object]) -> dict[str, object]:
+    """
+    The calculations.ts totals for one amounts vector (col returns a float) or many at once
+    (col returns a NumPy column). Operand order matches the TypeScript expressions exactly.
+    """
+    income = col("venit") + col("bonuri") + col("extra")
+    bills = (
+        col("apple") + col("intretinere") + col("internet") + col("gaz")
+        + col("curent") + col("telefon") + col("netflix") + col("sala")
+    )
+    other = (
+        col("educatie") + col("sanatate") + col("beauty") + col("haine") + col("diverse") + col("transport")
+        + col("cadouri") + col("vacante") + col("casa") + col("gadgets") + col("tazz") + col("alimente")
+    )
+    expenses = col("rate") + bills + other
+    economii = col("economii")
+    investitii = col("investitii")
+    investments = economii + investitii
+    return {
+        "income": income,
+        "bills": bills,
+        "expenses": expenses,
+        "restExpenses": expenses - bills,
+        "economii": economii,
+        "investitii": investitii,
+        "investments": investments,
+        "profitLoss": income - expenses,
+        "cashflow": income - expenses - investments,
+        "total": income + expenses + economii + investitii,
+    }
+
+
+def _js_round(x: float) -> float:
+    """Math.round: nearest integer, halves towards +infinity."""
+    if not math.isfinite(x):
+        return x
+    r = math.floor(x)
+    return float(r + 1 if x - r >= 0.5 else r)
+
+
+def _savings_rate(investments: float, income: float) -> float:
+    return _js_round(investments / income * 100) if income > 0 else 0.0
+
+
+def _month_index(month: str) -> int | None:
+    m = _MONTH.match(month)
+    return int(m.group(1)) * 12 + int(m.group(2)) - 1 if m else None
+
+
+def _month_name(index: int) -> str:
+    return f"{index // 12:04d}-{index % 12 + 1:02d}"
+
+
+# A table of aggregated amounts: keys, one amounts row per key and months summed per key
+Table = tuple[list[str], object, list[int]]
+
+
+class TotalsBuilder:
+    """
+    Collect month amounts while records are written; build() returns the totals section.
+    profiles is the backup's profiles list (its order is the "combined" sum order); without
+    it profiles are combined in first-seen order. Only the amounts vectors are kept.
+    """
+
+    def __init__(
+        self,
+        profiles: list[dict] | None = None,
+        rolling: Sequence[int] = ROLLING_WINDOWS,
+        use_numpy: bool | None = None,
+    ) -> None:
+        self._profile_order = [p["id"] for p in profiles] if profiles is not None else None
+        self._rolling = tuple(rolling)
+        self._use_numpy = np is not None if use_numpy is None else use_numpy
+        # month index -> profile id -> amounts (a later record for the same month replaces it)
+        self._months: dict[int, dict[str, array]] = {}
+        self._seen: dict[str, None] = {}
+
+    def add(self, record: MonthRecord | dict) -> None:
+        if isinstance(record, MonthRecord):
+            month, people = record.month, record.people
+        else:
+            month, people = record.get("month"), record.get("people")
+        index = _month_index(month) if isinstance(month, str) else None
+        if index is None or not isinstance(people, Mapping):
+            return
+        amounts = {}
+        for profile_id, values in people.items():
+            if isinstance(values, array):
+                amounts[profile_id] = values
+            elif isinstance(values, Mapping):
+                amounts[profile_id] = amounts_from_dict(values)
+            else:
+                continue
+            self._seen.setdefault(profile_id, None)
+        self._months[index] = amounts
+
+    def observe(self, records: Iterable[MonthRecord | dict]) -> Iterator[MonthRecord | dict]:
+        """records, unchanged, each added as it passes."""
+        for record in records:
+            self.add(record)
+            yield record
+
+    def _views(self) -> list[str]:
+        return list(self._seen) + [COMBINED]
+
+    def _combined_order(self) -> list[str]:
+        return self._profile_order if self._profile_order is not None else list(self._seen)
+
+    def build(self, first: str | None = None, last: str | None = None) -> dict:
+        """
+        The totals section. first/last (months, inclusive) limit the months and years that are
+        listed, e.g. to one year shard; rolling windows still reach back before first.
+        """
+        lo = _month_index(first) if first else None
+        hi = _month_index(last) if last else None
+        indexes = [i for i in sorted(self._months) if (lo is None or i >= lo) and (hi is None or i <= hi)]
+        section: dict = {
+            "profiles": self._combined_order(),
+            "months": {},
+            "years": {},
+            "rolling": {str(window): {} for window in self._rolling},
+        }
+        if not indexes:
+            return section
+        aggregate = _aggregate_numpy if self._use_numpy else _aggregate_stdlib
+        fields = _fields_numpy if self._use_numpy else _fields_stdlib
+        months, years, rolling = aggregate(
+            self._months, self._views(), self._combined_order(), indexes, self._rolling
+        )
+        section["months"] = _by_period(months, fields, MONTH_FIELDS, False)
+        section["years"] = _by_period(years, fields, ROLLUP_FIELDS, True)
+        for window in self._rolling:
+            section["rolling"][str(window)] = _by_period(rolling[window], fields, ROLLUP_FIELDS, True)
+        return section
+
+
+def _by_period(tables: dict[str, Table], fields: Callable, names: Sequence[str], rollup: bool) -> dict:
+    """view -> table of periods, turned into period -> view -> fields (periods sorted)."""
+    out: dict[str, dict] = {}
+    for view, table in tables.items():
+        for key, values in fields(table, names, rollup):
+            out.setdefault(key, {})[view] = values
+    return dict(sorted(out.items()))
+
+
+def _fields_stdlib(table: Table, names: Sequence[str], rollup: bool) -> Iterator[tuple[str, dict]]:
+    keys, rows, counts = table
+    for key, row, count in zip(keys, rows, counts):
+        values = _formulas(lambda k: row[KEY_INDEX[k]])
+        values["savingsRate"] = _savings_rate(values["investments"], values["income"])
+        out = {"months": count} if rollup else {}
+        out.update((name, values[name]) for name in names)
+        yield key, out
+
+
+def _fields_numpy(table: Table, names: Sequence[str], rollup: bool) -> Iterator[tuple[str, dict]]:
+    keys, rows, counts = table
+    values = _formulas(lambda k: rows[:, KEY_INDEX[k]])
+    income, investments = values["income"], values["investments"]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rate = investments / np.where(income > 0, income, 1.0) * 100
+        rounded = np.floor(rate)
+        rounded = rounded + (rate - rounded >= 0.5)
+        values["savingsRate"] = np.where(income > 0, np.where(np.isfinite(rate), rounded, rate), 0.0)
+    columns = [values[name].tolist() for name in names]
+    for i, key in enumerate(keys):
+        out = {"months": counts[i]} if rollup else {}
+        out.update((name, column[i]) for name, column in zip(names, columns))
+        yield key, out
+
+
+def _fold(vectors: Iterable[array]) -> array | None:
+    """sumCategoryAmounts: the first vector, then each next one added in order (None when empty)."""
+    acc = None
+    for vector in vectors:
+        if acc is None:
+            acc = array("d", vector)
+        else:
+            for i, v in enumerate(vector):
+                acc[i] += v
+    return acc
+
+
+def _aggregate_stdlib(
+    months: dict[int, dict[str, array]],
+    views: list[str],
+    combined_order: list[str],
+    indexes: list[int],
+    windows: tuple[int, ...],
+) -> tuple[dict[str, Table], dict[str, Table], dict[int, dict[str, Table]]]:
+    by_view: dict[str, dict[int, array]] = {view: {} for view in views}
+    for index in sorted(months):
+        people = months[index]
+        for profile_id, amounts in people.items():
+            by_view[profile_id][index] = amounts
+        combined = _fold(people[p] for p in combined_order if p in people)
+        if combined is not None:
+            by_view[COMBINED][index] = combined
+
+    month_tables: dict[str, Table] = {}
+    year_tables: dict[str, Table] = {}
+    rolling_tables: dict[int, dict[str, Table]] = {window: {} for window in windows}
+    years = sorted({index // 12 for index in indexes})
+    for view in views:
+        data = by_view[view]
+        present = [i for i in indexes if i in data]
+        if not present:
+            continue
+        month_tables[view] = ([_month_name(i) for i in present], [data[i] for i in present], [1] * len(present))
+        keys, rows, counts = [], [], []
+        for year in years:
+            in_year = [data[i] for i in range(year * 12, year * 12 + 12) if i in data]
+            if in_year:
+                keys.append(str(year))
+                rows.append(_fold(in_year))
+                counts.append(len(in_year))
+        year_tables[view] = (keys, rows, counts)
+        for window in windows:
+            rows, counts = [], []
+            for index in present:
+                in_window = [data[i] for i in range(index - window + 1, index + 1) if i in data]
+                rows.append(_fold(in_window))
+                counts.append(len(in_window))
+            rolling_tables[window][view] = (month_tables[view][0], rows, counts)
+    return month_tables, year_tables, rolling_tables
+
+
+def _fold_numpy(parts: Iterable[tuple["np.ndarray", "np.ndarray"]]) -> tuple["np.ndarray", "np.ndarray"]:
+    """
+    _fold over (rows, present) pairs, row by row: each row's sum starts at its first present
+    row and adds the later present ones in order. Returns (sums, number of rows summed).
+    """
+    acc = count = None
+    for values, present in parts:
+        if acc is None:
+            acc = np.where(present[:, None], values, 0.0)
+            count = present.astype(np.int64)
+            continue
+        started = (count > 0)[:, None]
+        acc = np.where(present[:, None], np.where(started, acc + values, values), acc)
+        count = count + present
+    return acc, count
+
+
+def _aggregate_numpy(
+    months: dict[int, dict[str, array]],
+    views: list[str],
+    combined_order: list[str],
+    indexes: list[int],
+    windows: tuple[int, ...],
+) -> tuple[dict[str, Table], dict[str, Table], dict[int, dict[str, Table]]]:
+    # Dense grid of whole calendar years, so years and windows are fixed row offsets
+    all_indexes = sorted(months)
+    start = all_indexes[0] // 12 * 12
+    size = (all_indexes[-1] // 12 + 1) * 12 - start
+    width = len(CATEGORY_KEYS)
+    grids: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+    for view in views[:-1]:
+        grids[view] = (np.zeros((size, width)), np.zeros(size, dtype=bool))
+    for index, people in months.items():
+        for profile_id, amounts in people.items():
+            values, present = grids[profile_id]
+            values[index - start] = np.frombuffer(amounts, dtype=np.float64)
+            present[index - start] = True
+    parts = [grids[p] for p in combined_order if p in grids]
+    if parts:
+        combined, count = _fold_numpy(parts)
+        grids[COMBINED] = (combined, count > 0)
+    else:
+        grids[COMBINED] = (np.zeros((size, width)), np.zeros(size, dtype=bool))
+
+    wanted = np.zeros(size, dtype=bool)
+    wanted[np.asarray(indexes) - start] = True
+    years_wanted = wanted.reshape(-1, 12).any(axis=1)
+    month_tables: dict[str, Table] = {}
+    year_tables: dict[str, Table] = {}
+    rolling_tables: dict[int, dict[str, Table]] = {window: {} for window in windows}
+    for view in views:
+        values, present = grids[view]
+        rows = np.flatnonzero(present & wanted)
+        if rows.size == 0:
+            continue
+        names = [_month_name(start + int(i)) for i in rows]
+        month_tables[view] = (names, values[rows], [1] * rows.size)
+
+        by_year = values.reshape(-1, 12, width)
+        present_by_year = present.reshape(-1, 12)
+        sums, counts = _fold_numpy((by_year[:, k], present_by_year[:, k]) for k in range(12))
+        keep = np.flatnonzero((counts > 0) & years_wanted)
+        year_tables[view] = ([str(start // 12 + int(y)) for y in keep], sums[keep], counts[keep].tolist())
+
+        for window in windows:
+            padded = np.concatenate((np.zeros((window - 1, width)), values))
+            padded_present = np.concatenate((np.zeros(window - 1, dtype=bool), present))
+            sums, counts = _fold_numpy(
+                (padded[k : k + size], padded_present[k : k + size]) for k in range(window)
+            )
+            rolling_tables[window][view] = (names, sums[rows], counts[rows].tolist())
+    return month_tables, year_tables, rolling_tables
@@ -0,0 +1,288 @@
+"""
+Backup validation against the app's schema (lib/validation/schemas.ts), before import.
+
+The app checks imported records with zod (MonthRecordSchema) and migrateData drops the ones
+that fail, so a bad record only shows up after the import. BackupValidator applies the same
+rules in one pass, while the records are written (--validate) or over an existing backup:
+
+  month          "YYYY-MM" (month 01-12), unique across the backup
+  people         an object of profile id -> amounts
+  amounts        all 26 CATEGORY_KEYS, each a finite number >= 0 (not a bool)
+  meta           {updatedAt: ISO datetime with Z, isSaved: bool}
+
+Converted records (MonthRecord) hold array('d') vectors, which always have the 26 keys and
+only floats, so only their values are checked; dict records (from a merged or loaded backup)
+also get their keys and value types checked. Records are checked in batches, column-wise
+(see BackupValidator); only a batch with a violation is looked at record by record. Only
+the first max_violations violations are kept (in data order); all are counted. A violation
+cites the input row of its record when the converter tracked it (MonthRecord.source, e.g.
+"input.csv row 12"), else its position in the backup ("data[3]").
+"""
+
+import math
+import re
+from array import array
+from itertools import chain
+from operator import itemgetter
+from typing import Iterable, Iterator, NamedTuple, Sequence
+
+from .records import CATEGORY_KEYS, MonthRecord
+
+try:
+    import numpy as np
+except ImportError:  # optional: stdlib sum()/min() check the amounts instead
+    np = None
+
+DEFAULT_MAX_VIOLATIONS = 20
+# Records checked together
+BATCH_RECORDS = 4096
+
+# [0-9], not \d: JavaScript's \d only matches ASCII digits
+_MONTH = re.compile(r"[0-9]{4}-(?:0[1-9]|1[0-2])")
+# z.string().datetime(): UTC ("Z"), optional fractional seconds, no offset
+_DATETIME = re.compile(
+    r"[0-9]{4}-(?:0[1-9]|1[0-2])-(?:0[1-9]|[12][0-9]|3[01])T(?:[01][0-9]|2[0-3]):[0-5][0-9]:[0-5][0-9](?:\.[0-9]+)?Z"
+)
+# Batches of the above, one per line
+_MONTH_LINES = re.compile(f"(?:{_MONTH.pattern}\n)*")
+_DATETIME_LINES = re.compile(f"(?:{_DATETIME.pattern}\n)*")
+_NUMBER_TYPES = frozenset((int, float))
+_STR = frozenset((str,))
+_DICT = frozenset((dict,))
+_BOOL = frozenset((bool,))
+_ARRAY = frozenset((array,))
+_KEY_ORDER = frozenset((tuple(CATEGORY_KEYS),))
+
+
+class Violation(NamedTuple):
+    # Position of the record in the backup's data array
+    index: int
+    month: str
+    field: str
+    message: str
+    # (input name, row number) of a converted record's first input row, when known
+    source: tuple[str, int] | None = None
+
+    def __str__(self) -> str:
+        where = f"{self.source[0]} row {self.source[1]}" if self.source else f"data[{self.index}]"
+        where += f" ({self.month})" if self.month else ""
+        return f"{where} {self.field}: {self.message}"
+
+
+class BackupValidationError(ValueError):
+    def __init__(self, violations: list[Violation], count: int) -> None:
+        self.violations = violations
+        self.count = count
+        shown = "\n".join(f"  {v}" for v in violations)
+        more = f"\n  ... and {count - len(violations)} more" if count > len(violations) else ""
+        super().__init__(f"{count} schema violation(s) (the app would drop these records):\n{shown}{more}")
+
+
+def _all_finite_non_negative(values: Sequence[float]) -> bool:
+    """values (floats/ints) are all finite and >= 0."""
+    if not len(values):
+        return True
+    if np is not None:
+        x = np.asarray(values, dtype=np.float64)
+        # NaN fails both comparisons
+        return bool(((x >= 0) & (x < math.inf)).all())
+    # NaN or infinity make the sum non-finite (an overflowing sum only sends the batch to
+    # the record-by-record check)
+    return math.isfinite(sum(values)) and min(values) >= 0
+
+
+def _all_match(lines: re.Pattern, strings: list) -> bool:
+    """Every item is a str matched in full by a line of lines (one regex run over the batch)."""
+    if not _STR.issuperset(map(type, strings)):
+        return False
+    joined = "\n".join(strings) + "\n"
+    return joined.count("\n") == len(strings) and lines.fullmatch(joined) is not None
+
+
+class BackupValidator:
+    """
+    Check records in data order: check() or observe() each one, then finish() (or
+    raise_if_invalid()) after the last. violations holds the first max_violations found, in
+    data order; count counts all of them.
+
+    Records are checked in batches of BATCH_RECORDS. A batch is first checked column-wise:
+    its months, amounts and meta fields are gathered into flat lists and tested with a few
+    C-level operations (set of types, one regex run, one finite/non-negative test over all
+    amounts, with NumPy when it is installed). Only a batch that fails is checked record by
+    record to find the violations.
+    """
+
+    def __init__(self, max_violations: int = DEFAULT_MAX_VIOLATIONS) -> None:
+        self.max_violations = max_violations
+        self.violations: list[Violation] = []
+        self.count = 0
+        self.records = 0
+        # month -> index of its first record
+        self._months: dict[str, int] = {}
+        self._pending: list[MonthRecord | dict] = []
+        # Source of the record being checked record by record
+        self._source: tuple[str, int] | None = None
+
+    @property
+    def ok(self) -> bool:
+        self.finish()
+        return self.count == 0
+
+    def check(self, record: MonthRecord | dict) -> None:
+        self._pending.append(record)
+        if len(self._pending) >= BATCH_RECORDS:
+            self.finish()
+
+    def observe(self, records: Iterable[MonthRecord | dict]) -> Iterator[MonthRecord | dict]:
+        """records, unchanged, each checked as it passes."""
+        for record in records:
+            self.check(record)
+            yield record
+        self.finish()
+
+    def finish(self) -> None:
+        """Check the records still pending."""
+        batch, self._pending = self._pending, []
+        if not batch:
+            return
+        months = self._batch_months(batch)
+        if months is not None:
+            self._months.update(zip(months, range(self.records, self.records + len(batch))))
+            self.records += len(batch)
+            return
+        for record in batch:
+            self._check_record(record)
+            self.records += 1
+
+    def raise_if_invalid(self) -> None:
+        self.finish()
+        if self.count:
+            raise BackupValidationError(self.violations, self.count)
+
+    def _batch_months(self, batch: list[MonthRecord | dict]) -> list[str] | None:
+        """The batch's months when every record in it is valid, else None."""
+        converted = [r for r in batch if type(r) is MonthRecord]
+        loaded = [r for r in batch if type(r) is not MonthRecord] if len(converted) < len(batch) else []
+        try:
+            months = [r.month for r in converted] + [r["month"] for r in loaded]
+            if not _all_match(_MONTH_LINES, months):
+                return None
+            unique = set(months)
+            if len(unique) != len(months) or not self._months.keys().isdisjoint(unique):
+                return None
+            # array('d') vectors always hold 26 floats
+            vectors = [v for r in converted for v in r.people.values()]
+            if not _ARRAY.issuperset(map(type, vectors)) or any(len(v) != len(CATEGORY_KEYS) for v in vectors):
+                return None
+            if vectors and not _all_finite_non_negative(array("d", b"".join(vectors))):
+                return None
+            if loaded and not self._loaded_ok(loaded):
+                return None
+        except (AttributeError, KeyError, TypeError):
+            return None
+        return months
+
+    @staticmethod
+    def _loaded_ok(records: list) -> bool:
+        if not _DICT.issuperset(map(type, records)):
+            return False
+        people = list(map(itemgetter("people"), records))
+        if not _DICT.issuperset(map(type, people)):
+            return False
+        amounts = list(chain.from_iterable(map(dict.values, people)))
+        if not _DICT.issuperset(map(type, amounts)):
+            return False
+        # Keys in the app's order (as it and the converters write them); anything else is
+        # left to the record-by-record check
+        if not _KEY_ORDER.issuperset(map(tuple, amounts)):
+            return False
+        values = list(chain.from_iterable(map(dict.values, amounts)))
+        if not _NUMBER_TYPES.issuperset(map(type, values)) or not _all_finite_non_negative(array("d", values)):
+            return False
+        metas = list(map(itemgetter("meta"), records))
+        if not _DICT.issuperset(map(type, metas)):
+            return False
+        if not _BOOL.issuperset(map(type, [m.get("isSaved") for m in metas])):
+            return False
+        return _all_match(_DATETIME_LINES, [m.get("updatedAt") for m in metas])
+
+    # Record-by-record checks (batches with a violation)
+
+    def _add(self, month: str, field: str, message: str) -> None:
+        self.count += 1
+        if len(self.violations) < self.max_violations:
+            self.violations.append(Violation(self.records, month, field, message, self._source))
+
+    def _check_record(self, record: object) -> None:
+        self._source = record.source if isinstance(record, MonthRecord) else None
+        if isinstance(record, MonthRecord):
+            month = self._check_month(record.month)
+            for profile_id, amounts in record.people.items():
+                self._check_amounts(month, profile_id, list(zip(CATEGORY_KEYS, amounts)))
+        elif isinstance(record, dict):
+            self._check_dict(record)
+        else:
+            self._add("", "record", f"expected an object, got {type(record).__name__}")
+
+    def _check_month(self, month: object) -> str:
+        if not isinstance(month, str) or not _MONTH.fullmatch(month):
+            self._add("", "month", f"expected YYYY-MM, got {month!r}")
+            return ""
+        first = self._months.setdefault(month, self.records)
+        if first != self.records:
+            self._add(month, "month", f"duplicate of data[{first}]")
+        return month
+
+    def _check_amounts(self, month: str, profile_id: str, items: list[tuple[str, object]]) -> None:
+        for key, value in items:
+            field = f"people.{profile_id}.{key}"
+            if type(value) not in _NUMBER_TYPES:
+                self._add(month, field, f"expected a number, got {value!r}")
+            elif not math.isfinite(value):
+                self._add(month, field, f"not finite: {value!r}")
+            elif value < 0:
+                self._add(month, field, f"negative: {value!r}")
+
+    def _check_dict(self, record: dict) -> None:
+        month = self._check_month(record.get("month"))
+        people = record.get("people")
+        if not isinstance(people, dict):
+            self._add(month, "people", f"expected an object, got {type(people).__name__}")
+        else:
+            for profile_id, amounts in people.items():
+                if not isinstance(amounts, dict):
+                    self._add(month, f"people.{profile_id}", f"expected an object, got {type(amounts).__name__}")
+                    continue
+                # Keys the schema does not know are stripped by zod, not an error
+                missing = [k for k in CATEGORY_KEYS if k not in amounts]
+                if missing:
+                    self._add(month, f"people.{profile_id}", f"missing {', '.join(missing)}")
+                self._check_amounts(month, profile_id, [(k, amounts[k]) for k in CATEGORY_KEYS if k in amounts])
+        meta = record.get("meta")
+        if not isinstance(meta, dict):
+            self._add(month, "meta", f"expected an object, got {type(meta).__name__}")
+            return
+        updated_at = meta.get("updatedAt")
+        if not isinstance(updated_at, str) or not _DATETIME.fullmatch(updated_at):
+            self._add(month, "meta.updatedAt", f"expected an ISO datetime (UTC), got {updated_at!r}")
+        if type(meta.get("isSaved")) is not bool:
+            self._add(month, "meta.isSaved", f"expected a boolean, got {meta.get('isSaved')!r}")
+
+
+def validate_backup(data: object, max_violations: int = DEFAULT_MAX_VIOLATIONS) -> BackupValidator:
+    """Check a loaded backup document ({version, data, profiles?}) and all its records."""
+    validator = BackupValidator(max_violations)
+    if not isinstance(data, dict):
+        validator._add("", "backup", f"expected an object, got {type(data).__name__}")
+        return validator
+    version = data.get("version")
+    if type(version) not in _NUMBER_TYPES:
+        validator._add("", "version", f"expected a number, got {version!r}")
+    records = data.get("data")
+    if not isinstance(records, list):
+        validator._add("", "data", f"expected an array, got {type(records).__name__}")
+        return validator
+    for record in records:
+        validator.check(record)
+    validator.finish()
+    return validator
@@ -0,0 +1,407 @@
+"""
+Incremental backup JSON writer.
+
+Records are written one at a time, so callers never need to hold the full record list.
+Output is byte-identical to json.dump({"version": ..., "data": [...], "profiles": [...]}, indent=2),
+or to json.dumps(..., separators=(",", ":")) in compact mode.
+
+Files are written atomically: to a temp file in the target directory, then renamed over the
+target, so a half-written backup is never visible under the real name. Output can be
+gzip-compressed and/or sharded into one backup per year plus a small manifest, and can end
+with a precomputed "totals" section (see finance_import.totals). A BackupValidator (see
+finance_import.validate) can check the records on the same pass; when it finds violations the
+file is not replaced.
+"""
+
+import gzip
+import hashlib
+import io
+import json
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import IO, Callable, Iterable, Iterator
+
+from .records import MonthRecord
+from .stats import Stats, stage
+from .totals import TotalsBuilder
+from .validate import BackupValidator
+
+COMPACT_SEPARATORS = (",", ":")
+
+
+class BackupWriter:
+    """
+    Write {"version": N, "data": [...]} to an open text file, one record at a time.
+    When profiles is given it is written after data, as in the app's full backup export.
+    When totals is given it is called on close and its result written last, as "totals".
+    """
+
+    def __init__(
+        self,
+        fp: IO[str],
+        version: int,
+        profiles: list[dict] | None = None,
+        compact: bool = False,
+        totals: Callable[[], dict] | None = None,
+    ) -> None:
+        self._fp = fp
+        self._version = version
+        self._profiles = profiles
+        self._compact = compact
+        self._totals = totals
+        self._count = 0
+        self._closed = False
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    def _dumps(self, value: object) -> str:
+        if self._compact:
+            return json.dumps(value, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+        return json.dumps(value, ensure_ascii=False, indent=2)
+
+    def write_record(self, record: dict) -> None:
+        version = json.dumps(self._version)
+        if self._compact:
+            self._fp.write('{"version":%s,"data":[' % version if self._count == 0 else ",")
+            self._fp.write(self._dumps(record))
+        else:
+            self._fp.write('{\n  "version": %s,\n  "data": [\n' % version if self._count == 0 else ",\n")
+            self._fp.write("    " + self._dumps(record).replace("\n", "\n    "))
+        self._count += 1
+
+    def write_records(self, records: Iterable[dict]) -> None:
+        for record in records:
+            self.write_record(record)
+
+    def close(self) -> int:
+        """Finish the document. Returns the number of records written."""
+        if self._closed:
+            return self._count
+        version = json.dumps(self._version)
+        if self._compact:
+            self._fp.write('{"version":%s,"data":[]' % version if self._count == 0 else "]")
+            if self._profiles is not None:
+                self._fp.write(',"profiles":' + self._dumps(self._profiles))
+            if self._totals is not None:
+                self._fp.write(',"totals":' + self._dumps(self._totals()))
+            self._fp.write("}")
+        else:
+            self._fp.write('{\n  "version": %s,\n  "data": []' % version if self._count == 0 else "\n  ]")
+            if self._profiles is not None:
+                self._fp.write(',\n  "profiles": ' + self._dumps(self._profiles).replace("\n", "\n  "))
+            if self._totals is not None:
+                self._fp.write(',\n  "totals": ' + self._dumps(self._totals()).replace("\n", "\n  "))
+            self._fp.write("\n}")
+        self._closed = True
+        return self._count
+
+    def __enter__(self) -> "BackupWriter":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+
+
+def _open_text(binary: IO[bytes]) -> io.TextIOWrapper:
+    return io.TextIOWrapper(binary, encoding="utf-8")
+
+
+@contextmanager
+def _staged_binary(path: Path) -> Iterator[tuple[IO[bytes], Path]]:
+    """
+    Open a temp file in path's directory for writing: yields (file, temp path). The temp file
+    is fsynced and kept when the block completes (the caller renames it over path, or removes
+    it); on error it is removed.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        # mkstemp creates the file 0600; give it the mode a plain open() would
+        os.chmod(tmp_name, _file_mode(path))
+        with os.fdopen(fd, "wb") as raw:
+            yield raw, Path(tmp_name)
+            raw.flush()
+            os.fsync(raw.fileno())
+    except BaseException:
+        Path(tmp_name).unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def _text_writer(raw: IO[bytes], compress: bool = False) -> Iterator[IO[str]]:
+    """UTF-8 text over raw (gzip-compressed when compress); raw stays open."""
+    if compress:
+        # mtime=0 so identical content gives identical bytes
+        with gzip.GzipFile(filename="", mode="wb", fileobj=raw, mtime=0) as gz:
+            f = _open_text(gz)
+            yield f
+            f.flush()
+            f.detach()
+    else:
+        f = _open_text(raw)
+        yield f
+        f.flush()
+        f.detach()
+
+
+def _commit(tmp_path: Path, path: Path) -> None:
+    """Rename a staged temp file over path (removing it when that fails)."""
+    try:
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+
+
+@contextmanager
+def atomic_open_binary(path: Path) -> Iterator[IO[bytes]]:
+    """
+    Open a binary file that appears at path only once it is completely written (temp file in
+    the same directory, fsync, os.replace). On error the temp file is removed and path is
+    untouched.
+    """
+    with _staged_binary(path) as (raw, tmp_path):
+        yield raw
+    _commit(tmp_path, path)
+
+
+@contextmanager
+def atomic_open(path: Path, compress: bool = False) -> Iterator[IO[str]]:
+    """Open a text file atomically, as atomic_open_binary (gzip-compressed when compress)."""
+    with atomic_open_binary(path) as raw, _text_writer(raw, compress) as f:
+        yield f
+
+
+def _file_mode(path: Path) -> int:
+    try:
+        return path.stat().st_mode & 0o777
+    except FileNotFoundError:
+        umask = os.umask(0)
+        os.umask(umask)
+        return 0o666 & ~umask
+
+
+def _dicts(records: Iterable[MonthRecord | dict], now_iso: str) -> Iterator[dict]:
+    for record in records:
+        yield record if isinstance(record, dict) else record.to_dict(now_iso)
+
+
+def _month_of(record: MonthRecord | dict) -> str:
+    return record["month"] if isinstance(record, dict) else record.month
+
+
+def _build_totals(
+    builder: TotalsBuilder, stats: Stats | None, first: str | None = None, last: str | None = None
+) -> dict:
+    with stage(stats, "totals"):
+        return builder.build(first, last)
+
+
+def write_backup(
+    path: Path,
+    version: int,
+    records: Iterable[MonthRecord | dict],
+    now_iso: str,
+    profiles: list[dict] | None = None,
+    compact: bool = False,
+    compress: bool = False,
+    stats: Stats | None = None,
+    totals: bool = False,
+    validator: BackupValidator | None = None,
+) -> int:
+    """
+    Stream records into a backup file at path (atomically). Returns the number of records.
+    With stats, file writes are timed as the "write" stage. With totals, the records' totals
+    section is computed as they pass and written at the end. With validator, the records are
+    checked as they pass and BackupValidationError is raised (path untouched) on violations.
+    """
+    builder = TotalsBuilder(profiles) if totals else None
+    if builder is not None:
+        records = builder.observe(records)
+    if validator is not None:
+        records = validator.observe(records)
+    with atomic_open(path, compress) as f:
+        writer = BackupWriter(
+            stats.timed_writer(f) if stats is not None else f,
+            version,
+            profiles,
+            compact,
+            (lambda: _build_totals(builder, stats)) if builder is not None else None,
+        )
+        writer.write_records(_dicts(records, now_iso))
+        count = writer.close()
+        if validator is not None:
+            validator.raise_if_invalid()
+        return count
+
+
+def output_path_for(path: Path, compress: bool = False) -> Path:
+    """path, with .gz appended when compressing (unless it already ends in .gz)."""
+    return path.with_name(path.name + ".gz") if compress and path.suffix != ".gz" else path
+
+
+def _split_name(path: Path) -> tuple[str, str]:
+    """finance-import.json.gz -> ("finance-import", ".json.gz")"""
+    name = path.name
+    suffix = ""
+    for ext in (".gz", ".json"):
+        if name.endswith(ext) and len(name) > len(ext):
+            name, suffix = name[: -len(ext)], ext + suffix
+    return name, suffix or ".json"
+
+
+def manifest_path_for(path: Path) -> Path:
+    """Manifest written by write_sharded for output path (finance-import.manifest.json)."""
+    return path.with_name(_split_name(path)[0] + ".manifest.json")
+
+
+def shard_path_for(path: Path, year: str) -> Path:
+    stem, suffix = _split_name(path)
+    return path.with_name(f"{stem}-{year}{suffix}")
+
+
+def _file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with path.open("rb") as f:
+        for block in iter(lambda: f.read(1 << 16), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def write_sharded(
+    path: Path,
+    version: int,
+    records: Iterable[MonthRecord | dict],
+    now_iso: str,
+    profiles: list[dict] | None = None,
+    compact: bool = False,
+    compress: bool = False,
+    stats: Stats | None = None,
+    totals: bool = False,
+    validator: BackupValidator | None = None,
+) -> tuple[int, Path]:
+    """
+    Write one full backup per year (<stem>-<YYYY>.json[.gz], each importable on its own) plus a
+    manifest listing the shards. Records must be sorted by month; they are still streamed, one
+    shard open at a time. Shards of years no longer present are removed. Returns (record count,
+    manifest path). With totals, each shard gets the totals of its year (rolling windows
+    reach back into earlier shards). Every shard and the manifest go to temp files first and
+    are renamed into place only once all of them are written; on an unsorted record or, with
+    validator, on violations (BackupValidationError) the temp files are removed and the
+    previous output is left as it was.
+    """
+    builder = TotalsBuilder(profiles) if totals else None
+    path = output_path_for(path, compress)
+    manifest_path = manifest_path_for(path)
+    shards: list[dict] = []
+    # (temp file, target) of every file written, renamed at the end
+    staged: list[tuple[Path, Path]] = []
+    try:
+        it = iter(records)
+        record = next(it, None)
+        while record is not None:
+            year = _month_of(record)[:4]
+            if shards and year <= shards[-1]["year"]:
+                raise ValueError(f"Records are not sorted by month ({_month_of(record)} after {shards[-1]['last']})")
+            shard_path = shard_path_for(path, year)
+            first = last = _month_of(record)
+            with _staged_binary(shard_path) as (raw, tmp_path), _text_writer(raw, compress) as f:
+                staged.append((tmp_path, shard_path))
+                writer = BackupWriter(
+                    stats.timed_writer(f) if stats is not None else f,
+                    version,
+                    profiles,
+                    compact,
+                    (lambda: _build_totals(builder, stats, first, last)) if builder is not None else None,
+                )
+                while record is not None and _month_of(record)[:4] == year:
+                    last = _month_of(record)
+                    if builder is not None:
+                        builder.add(record)
+                    if validator is not None:
+                        validator.check(record)
+                    writer.write_record(record if isinstance(record, dict) else record.to_dict(now_iso))
+                    record = next(it, None)
+                count = writer.close()
+            shards.append(
+                {
+                    "year": year,
+                    "file": shard_path.name,
+                    "months": count,
+                    "first": first,
+                    "last": last,
+                    "sha256": _file_sha256(tmp_path),
+                }
+            )
+        if validator is not None:
+            validator.raise_if_invalid()
+
+        manifest = {"version": version, "shards": shards}
+        if profiles is not None:
+            manifest["profiles"] = profiles
+        with _staged_binary(manifest_path) as (raw, tmp_path), _text_writer(raw) as f:
+            staged.append((tmp_path, manifest_path))
+            if compact:
+                json.dump(manifest, f, ensure_ascii=False, separators=COMPACT_SEPARATORS)
+            else:
+                json.dump(manifest, f, ensure_ascii=False, indent=2)
+        old_files = _manifest_files(manifest_path)
+        # The manifest last, so it never lists a shard that is not in place yet
+        while staged:
+            _commit(*staged.pop(0))
+    except BaseException:
+        for tmp_path, _ in staged:
+            tmp_path.unlink(missing_ok=True)
+        raise
+    current = {s["file"] for s in shards}
+    for name in old_files - current:
+        (path.parent / name).unlink(missing_ok=True)
+    return sum(s["months"] for s in shards), manifest_path
+
+
+def _manifest_files(manifest_path: Path) -> set[str]:
+    try:
+        data = json.loads(manifest_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return set()
+    shards = data.get("shards") if isinstance(data, dict) else None
+    return {
+        s["file"]
+        for s in shards or []
+        if isinstance(s, dict) and isinstance(s.get("file"), str) and Path(s["file"]).name == s["file"]
+    }
+
+
+def write_output(
+    path: Path,
+    version: int,
+    records: Iterable[MonthRecord | dict],
+    now_iso: str,
+    profiles: list[dict] | None = None,
+    compact: bool = False,
+    compress: bool = False,
+    shard: bool = False,
+    stats: Stats | None = None,
+    totals: bool = False,
+    validator: BackupValidator | None = None,
+) -> tuple[int, Path]:
+    """
+    Write the converted backup as the CLI options ask: one file (gzip-compressed when compress)
+    or per-year shards plus a manifest, with a totals section when totals, checked by validator
+    when given. Returns (record count, file to report).
+    """
+    if shard:
+        return write_sharded(path, version, records, now_iso, profiles, compact, compress, stats, totals, validator)
+    target = output_path_for(path, compress)
+    count = write_backup(target, version, records, now_iso, profiles, compact, compress, stats, totals, validator)
+    return count, target
+
+
+def output_target(path: Path, compress: bool = False, shard: bool = False) -> Path:
+    """The file write_output reports for these options (the manifest when sharding)."""
+    return manifest_path_for(path) if shard else output_path_for(path, compress)
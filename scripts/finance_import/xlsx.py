@@ -0,0 +1,301 @@
+"""
+Streaming .xlsx reader (stdlib only): worksheets as rows of cell strings, like csv.reader.
+
+An .xlsx file is a zip of XML parts. Workbook reads the sheet list (xl/workbook.xml and its
+relationships), the shared strings table and the date styles once, with
+xml.etree.ElementTree.iterparse, then rows(sheet) streams the sheet's XML from the zip member
+in READ_CHUNK pieces through expat handlers that build each row's list directly (iterparse
+would build and clear an Element per cell: twice the time on large sheets). Memory is the
+shared strings (each distinct string once) plus one chunk's rows, whatever the number of rows.
+
+Cells become the strings a CSV export of the sheet would give the converters' parsers:
+
+  text, shared or inline     the text
+  numbers                    the exact value with a comma decimal and no thousands separator
+                             ("1234,5", "2500", see numbers.format_number)
+  dates (date number format) "dd.mm.yyyy" (1900 or 1904 date system, as the workbook says)
+  booleans                   "TRUE" / "FALSE"
+  formulas                   their cached value; errors ("#N/A") as text
+
+Rows keep their position: a row or cell missing from the XML is empty (""). As in a CSV
+export, every row is as wide as the sheet's used range (its <dimension>, or without one the
+widest row so far), so a row whose last cells are empty is not read as a short row.
+"""
+
+import re
+import zipfile
+from datetime import date, timedelta
+from functools import lru_cache
+from pathlib import Path, PurePosixPath
+from typing import Iterator
+from xml.etree.ElementTree import iterparse
+from xml.parsers import expat
+
+from .numbers import format_number
+
+WORKBOOK_SUFFIXES = (".xlsx", ".xlsm")
+
+# Bytes of sheet XML parsed at a time (rows are handed out after each chunk)
+READ_CHUNK = 1 << 16
+
+_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+_PACKAGE_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+_TEXT = _MAIN + "t"
+_SHARED = _MAIN + "si"
+_PHONETIC = _MAIN + "rPh"
+
+# Sheet element names as expat reports them ("namespace local")
+_SHEET_NS = _MAIN[1:-1] + " "
+_ROW = _SHEET_NS + "row"
+_CELL = _SHEET_NS + "c"
+_VALUE = _SHEET_NS + "v"
+_SHEET_TEXT = _SHEET_NS + "t"
+_SHEET_PHONETIC = _SHEET_NS + "rPh"
+_DIMENSION = _SHEET_NS + "dimension"
+
+# Built-in number formats that show dates (ECMA-376 18.8.30, plus the common East Asian ids)
+_DATE_FORMAT_IDS = frozenset([*range(14, 18), 22, *range(27, 37), *range(50, 59)])
+# Quoted text, [Red] / [$-418] sections and escaped characters are not date codes
+_FORMAT_LITERALS = re.compile(r'"[^"]*"|\[[^\]]*\]|\\.')
+_DIGITS = "0123456789"
+
+
+def is_workbook(path: Path) -> bool:
+    return path.suffix.lower() in WORKBOOK_SUFFIXES
+
+
+def _is_date_format(code: str) -> bool:
+    code = _FORMAT_LITERALS.sub("", code).lower()
+    # m alone is a month only next to d / y; h:m:s formats are times
+    return ("d" in code or "y" in code) and "h" not in code and "s" not in code
+
+
+@lru_cache(maxsize=None)
+def _column_number(letters: str) -> int:
+    """0-based column of a reference's letters ("B" -> 1); a sheet has at most 16384."""
+    n = 0
+    for ch in letters:
+        n = n * 26 + ord(ch) - 64
+    return n - 1
+
+
+def _column_index(ref: str) -> int:
+    """0-based column of a cell reference ("B7" -> 1)."""
+    return _column_number(ref.rstrip(_DIGITS))
+
+
+def _text(elem) -> str:
+    """Text of a shared string or inline string: its <t> runs, without phonetic runs."""
+    parts = []
+    for child in elem:
+        if child.tag == _TEXT:
+            parts.append(child.text or "")
+        elif child.tag != _PHONETIC:
+            parts.extend(t.text or "" for t in child.iter(_TEXT))
+    return "".join(parts)
+
+
+class Workbook:
+    """An .xlsx file opened for reading; sheets are read one row at a time by rows()."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+        try:
+            self._zip = zipfile.ZipFile(path)
+        except zipfile.BadZipFile as e:
+            raise ValueError(f"{path} is not an .xlsx workbook: {e}") from e
+        try:
+            self._parts = self._sheet_parts()
+            self._strings = self._shared_strings()
+            self._date_styles = self._date_style_indexes()
+        except BaseException:
+            self._zip.close()
+            raise
+        # Sheet names in workbook order
+        self.sheets = list(self._parts)
+
+    def close(self) -> None:
+        self._zip.close()
+
+    def __enter__(self) -> "Workbook":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+    def _member(self, name: str):
+        try:
+            return self._zip.open(name)
+        except KeyError:
+            raise ValueError(f"{self.path}: workbook part {name} is missing") from None
+
+    def _sheet_parts(self) -> dict[str, str]:
+        targets = {}
+        for _, elem in iterparse(self._member("xl/_rels/workbook.xml.rels")):
+            if elem.tag == _PACKAGE_REL + "Relationship":
+                target = elem.get("Target", "")
+                # Relative to xl/, or absolute within the package
+                targets[elem.get("Id")] = target.lstrip("/") if target.startswith("/") else f"xl/{target}"
+        parts = {}
+        self.date1904 = False
+        for _, elem in iterparse(self._member("xl/workbook.xml")):
+            if elem.tag == _MAIN + "sheet":
+                target = targets.get(elem.get(_REL + "id"))
+                if target is not None:
+                    parts[elem.get("name", "")] = str(PurePosixPath(target))
+            elif elem.tag == _MAIN + "workbookPr":
+                self.date1904 = elem.get("date1904", "0").lower() in ("1", "true")
+        return parts
+
+    def _shared_strings(self) -> list[str]:
+        if "xl/sharedStrings.xml" not in self._zip.namelist():
+            return []
+        strings = []
+        root = None
+        for event, elem in iterparse(self._member("xl/sharedStrings.xml"), events=("start", "end")):
+            if root is None:
+                root = elem
+            elif event == "end" and elem.tag == _SHARED:
+                strings.append(_text(elem))
+                root.clear()
+        return strings
+
+    def _date_style_indexes(self) -> frozenset[int]:
+        """Indexes of the cell styles (cellXfs) whose number format is a date."""
+        if "xl/styles.xml" not in self._zip.namelist():
+            return frozenset()
+        custom: dict[int, str] = {}
+        dates = set()
+        in_cell_xfs = False
+        index = 0
+        for event, elem in iterparse(self._member("xl/styles.xml"), events=("start", "end")):
+            if event == "start":
+                if elem.tag == _MAIN + "cellXfs":
+                    in_cell_xfs = True
+                continue
+            if elem.tag == _MAIN + "numFmt":
+                custom[int(elem.get("numFmtId", "0"))] = elem.get("formatCode", "")
+            elif elem.tag == _MAIN + "cellXfs":
+                in_cell_xfs = False
+            elif elem.tag == _MAIN + "xf" and in_cell_xfs:
+                fmt = int(elem.get("numFmtId", "0"))
+                if fmt in _DATE_FORMAT_IDS or (fmt in custom and _is_date_format(custom[fmt])):
+                    dates.add(index)
+                index += 1
+        return frozenset(dates)
+
+    def _date(self, text: str) -> str:
+        days = int(float(text))
+        # Serial 60 is 1900-02-29, which did not exist (kept by Excel for Lotus compatibility)
+        epoch = date(1904, 1, 1) if self.date1904 else date(1899, 12, 31 if days < 60 else 30)
+        d = epoch + timedelta(days=days)
+        return f"{d.day:02d}.{d.month:02d}.{d.year:04d}"
+
+    def _value(self, kind: str, style: str, text: str) -> str:
+        """A cell's string from its type (t), style index (s) and <v> (or inline string) text."""
+        if not text or kind == "inlineStr":
+            return text
+        if kind == "s":
+            return self._strings[int(text)]
+        if kind == "n":
+            if self._date_styles and int(style) in self._date_styles:
+                return self._date(text)
+            return format_number(float(text))
+        if kind == "b":
+            return "TRUE" if text == "1" else "FALSE"
+        # str (formula text), e (error), d (ISO date text)
+        return text
+
+    def rows(self, sheet: str | None = None) -> Iterator[list[str]]:
+        """Rows of sheet (default: the first one), streamed from the zip member."""
+        if sheet is None:
+            if not self.sheets:
+                raise ValueError(f"{self.path} has no worksheets")
+            sheet = self.sheets[0]
+        if sheet not in self._parts:
+            raise ValueError(f"{self.path} has no sheet {sheet!r} (sheets: {', '.join(self.sheets)})")
+        reader = _SheetReader(self._value)
+        with self._member(self._parts[sheet]) as f:
+            while True:
+                chunk = f.read(READ_CHUNK)
+                try:
+                    reader.parser.Parse(chunk, not chunk)
+                except expat.ExpatError as e:
+                    raise ValueError(f"{self.path} [{sheet}]: malformed sheet XML: {e}") from None
+                yield from reader.rows
+                reader.rows.clear()
+                if not chunk:
+                    return
+
+
+class _SheetReader:
+    """
+    expat handlers for a worksheet's XML: completed rows collect in .rows, which the caller
+    empties after every chunk it feeds. The row, cell and text state is all that is kept.
+    """
+
+    def __init__(self, value) -> None:
+        self.value = value
+        self.rows: list[list[str]] = []
+        self.row: list[str] = []
+        self.next_row = 1
+        self.width = 0
+        self.column = 0
+        self.kind = "n"
+        self.style = "0"
+        self.text: list[str] = []
+        self.collecting = False
+        self.phonetic = 0
+        self.parser = expat.ParserCreate(namespace_separator=" ")
+        self.parser.buffer_text = True
+        self.parser.StartElementHandler = self.start
+        self.parser.EndElementHandler = self.end
+        self.parser.CharacterDataHandler = self.data
+
+    def start(self, name: str, attrs: dict[str, str]) -> None:
+        if name == _CELL:
+            ref = attrs.get("r")
+            self.column = _column_number(ref.rstrip(_DIGITS)) if ref else len(self.row)
+            self.kind = attrs.get("t", "n")
+            self.style = attrs.get("s", "0")
+            self.text.clear()
+        elif name == _VALUE or (name == _SHEET_TEXT and not self.phonetic):
+            self.collecting = True
+        elif name == _SHEET_PHONETIC:
+            self.phonetic += 1
+        elif name == _ROW:
+            number = int(attrs.get("r") or self.next_row)
+            for _ in range(number - self.next_row):
+                self.rows.append([""] * self.width)
+            self.next_row = number + 1
+        elif name == _DIMENSION:
+            # "A1:AB3000" (or "A1" for a single cell)
+            self.width = _column_index(attrs.get("ref", "").rpartition(":")[2]) + 1
+
+    def end(self, name: str) -> None:
+        if name == _CELL:
+            value = self.value(self.kind, self.style, "".join(self.text))
+            if value:
+                row, column = self.row, self.column
+                if column > len(row):
+                    row.extend([""] * (column - len(row)))
+                if column == len(row):
+                    row.append(value)
+                else:
+                    row[column] = value
+        elif name == _VALUE or name == _SHEET_TEXT:
+            self.collecting = False
+        elif name == _SHEET_PHONETIC:
+            self.phonetic -= 1
+        elif name == _ROW:
+            row = self.row
+            self.width = max(self.width, len(row))
+            row.extend([""] * (self.width - len(row)))
+            self.rows.append(row)
+            self.row = []
+
+    def data(self, text: str) -> None:
+        if self.collecting:
+            self.text.append(text)
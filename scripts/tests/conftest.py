@@ -0,0 +1,27 @@
+"""
+pytest setup for the converter scripts: puts scripts/ on sys.path (for finance_import) and
+loads the hyphenated converter scripts as modules, the way convert-to-finance-import.py does.
+
+Run from scripts/:  python -m pytest -q tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+if str(SCRIPTS_DIR) not in sys.path:
+    sys.path.insert(0, str(SCRIPTS_DIR))
+
+from finance_import.formats import load_script  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def csv_script():
+    return load_script(SCRIPTS_DIR / "csv-to-finance-import.py")
+
+
+@pytest.fixture(scope="session")
+def tsv_script():
+    return load_script(SCRIPTS_DIR / "tsv-to-finance-json.py")
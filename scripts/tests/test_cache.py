@@ -0,0 +1,89 @@
+"""
+Sidecar cache reuse: after rows are appended to an input, a cached rerun parses only the
+last row range and the new ones, and gives the same records as a full conversion.
+"""
+
+from pathlib import Path
+
+from finance_import.bench.generators import generate
+from finance_import.cache import CHUNK_ROWS, cache_path_for, records_digest
+
+ROWS = 3 * CHUNK_ROWS + 100
+
+
+def _append_rows(path: Path, count: int, skip_header_rows: int) -> None:
+    """Append copies of count data rows (from the start of the file) to path."""
+    with path.open(encoding="utf-8", newline="") as f:
+        lines = f.readlines()
+    with path.open("a", encoding="utf-8", newline="") as f:
+        f.writelines(lines[skip_header_rows : skip_header_rows + count])
+
+
+def _amounts(records) -> list[tuple[str, dict[str, bytes]]]:
+    return [(r.month, {p: a.tobytes() for p, a in r.people.items()}) for r in records]
+
+
+def test_table_cache_reuses_unchanged_ranges(tmp_path, csv_script):
+    path = generate("table", ROWS, tmp_path)
+    cache_file = cache_path_for(tmp_path / "out.json")
+
+    records, cache = csv_script.convert_cached(path, cache_file)
+    assert (cache.parsed, cache.reused) == (4, 0)
+    cache.save(records_digest(records))
+
+    records, cache = csv_script.convert_cached(path, cache_file)
+    assert (cache.parsed, cache.reused) == (0, 4)
+    cache.save(records_digest(records))
+
+    _append_rows(path, CHUNK_ROWS, 1)
+    records, cache = csv_script.convert_cached(path, cache_file)
+    # The last (partial) range changed and one new range follows it
+    assert (cache.parsed, cache.reused) == (2, 3)
+    full, _ = csv_script.convert_cached(path, cache_file, full=True)
+    assert _amounts(records) == _amounts(full)
+    assert _amounts(records) == _amounts(csv_script.convert_file(path))
+    assert [r.source for r in records] == [r.source for r in csv_script.convert_file(path, sources=True)]
+
+
+def test_person_cache_reuses_unchanged_ranges(tmp_path, tsv_script):
+    path = generate("simple", ROWS, tmp_path)
+    cache_file = cache_path_for(tmp_path / "out.json")
+
+    records, cache = tsv_script.convert_cached(path, cache_file, 2025)
+    cache.save(records_digest(records))
+
+    _append_rows(path, 10, 1)
+    records, cache = tsv_script.convert_cached(path, cache_file, 2025)
+    assert (cache.parsed, cache.reused) == (1, 3)
+    assert _amounts(records) == _amounts(tsv_script.convert_file(path, 2025))
+    # Reused ranges still cite the rows they were parsed from
+    assert [r.source for r in records] == [r.source for r in tsv_script.convert_file(path, 2025, sources=True)]
+
+
+def test_changed_key_discards_the_cache(tmp_path, tsv_script):
+    path = generate("simple", ROWS, tmp_path)
+    cache_file = cache_path_for(tmp_path / "out.json")
+    records, cache = tsv_script.convert_cached(path, cache_file, 2025)
+    cache.save(records_digest(records))
+
+    # Another default year is another cache key
+    _, cache = tsv_script.convert_cached(path, cache_file, 2024)
+    assert (cache.parsed, cache.reused) == (4, 0)
+
+
+def test_table_ranges_share_the_first_block_formats(tmp_path, csv_script):
+    """A later range alone would read its column as plain; the whole file's is dot-decimal."""
+    first_block = csv_script.TABLE_BLOCK_ROWS
+    path = tmp_path / "table.csv"
+    lines = ["luna,venit"]
+    lines += [f"2025-{i % 12 + 1:02d},12.5" for i in range(first_block)]
+    lines += [f"2026-{i % 12 + 1:02d},1.234" for i in range(CHUNK_ROWS // 2)]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+
+    cached_ambiguous: list = []
+    records, _ = csv_script.convert_cached(path, cache_path_for(tmp_path / "out.json"), ambiguous=cached_ambiguous)
+    streamed_ambiguous: list = []
+    streamed = list(csv_script.iter_months(path, ambiguous=streamed_ambiguous))
+    assert cached_ambiguous == streamed_ambiguous
+    assert len(cached_ambiguous) == CHUNK_ROWS // 2
+    assert [(r.month, r.people["me"].tobytes()) for r in records] == [(m, a.tobytes()) for m, a in streamed]
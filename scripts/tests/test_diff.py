@@ -0,0 +1,131 @@
+"""
+Backup diffs and patches: diff_backups on added, removed and changed months, identical
+backups diffing empty, and diff-finance-backups.py --patch bringing the old backup up to date.
+"""
+
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from finance_import.backup import load_backup
+from finance_import.diff import ADDED, CHANGED, REMOVED, BackupIndex, diff_backups, patch_records
+from finance_import.records import CATEGORY_KEYS
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+SAVED_AT = "2025-01-31T10:00:00.000Z"
+
+
+def _record(month: str, **people: dict[str, float]) -> dict:
+    return {
+        "month": month,
+        "people": {p: {key: values.get(key, 0) for key in CATEGORY_KEYS} for p, values in people.items()},
+        "meta": {"updatedAt": SAVED_AT, "isSaved": True},
+    }
+
+
+OLD = [
+    _record("2025-01", me={"venit": 5000, "chirie": 1500}, wife={"venit": 4000}),
+    _record("2025-02", me={"venit": 5000}, wife={"venit": 4000}),
+    _record("2025-03", me={"venit": 5100}, wife={"venit": 4000}),
+]
+NEW = [
+    _record("2025-01", me={"venit": 5000, "chirie": 1500}, wife={"venit": 4000}),
+    _record("2025-02", me={"venit": 5000, "alimente": 812.4}, wife={"venit": 4000}),
+    _record("2025-03", me={"venit": 5100}, wife={"venit": 4000}, child={}),
+    _record("2025-04", me={"venit": 5200}),
+]
+
+
+def _write(path: Path, records: list[dict]) -> Path:
+    path.write_text(json.dumps({"version": 3, "data": records}), encoding="utf-8")
+    return path
+
+
+def _diff(script_args: list[str]) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "diff-finance-backups.py"), *script_args],
+        capture_output=True,
+        text=True,
+    )
+
+
+def _apply(records: list[dict], patch: list[dict]) -> dict[str, dict]:
+    """Months of records after a merge import of patch (patched months are replaced)."""
+    by_month = {r["month"]: r for r in records}
+    by_month.update((r["month"], r) for r in patch)
+    return {month: by_month[month]["people"] for month in sorted(by_month)}
+
+
+def test_changes():
+    changeset = diff_backups(BackupIndex(OLD), BackupIndex(NEW[:2] + NEW[3:]))
+    assert [(c.month, c.change) for c in changeset.changes] == [
+        ("2025-02", CHANGED),
+        ("2025-03", REMOVED),
+        ("2025-04", ADDED),
+    ]
+    assert changeset.unchanged == 1
+    changed, removed, added = (c.deltas for c in changeset.changes)
+    assert changed == {"me": {"alimente": 812.4}}
+    assert removed == {"me": {"venit": -5100}, "wife": {"venit": -4000}}
+    assert added == {"me": {"venit": 5200}}
+
+
+def test_profile_in_one_backup_is_a_change_even_when_zero():
+    [change] = diff_backups(BackupIndex(OLD[2:]), BackupIndex(NEW[2:3])).changes
+    assert (change.month, change.change, change.deltas) == ("2025-03", CHANGED, {"child": {}})
+
+
+def test_tolerance():
+    new = [_record("2025-02", me={"venit": 5000.004}, wife={"venit": 4000})]
+    assert diff_backups(BackupIndex(OLD[1:2]), BackupIndex(new), tolerance=0.01).changes == []
+    assert diff_backups(BackupIndex(OLD[1:2]), BackupIndex(new)).count(CHANGED) == 1
+
+
+def test_identical_backups_diff_empty():
+    # Saved at another time, with the keys in another order: meta is not compared
+    new = [{**r, "meta": {"isSaved": True, "updatedAt": "2025-06-01T00:00:00.000Z"}} for r in reversed(OLD)]
+    changeset = diff_backups(BackupIndex(OLD), BackupIndex(new))
+    assert changeset.changes == []
+    assert changeset.unchanged == len(OLD)
+    assert list(patch_records(changeset, BackupIndex(new), SAVED_AT)) == []
+
+
+@pytest.mark.parametrize("compact", [False, True])
+def test_patch_round_trip(tmp_path, compact):
+    old_path, new_path = _write(tmp_path / "old.json", OLD), _write(tmp_path / "new.json", NEW)
+    patch_path = tmp_path / "patch.json"
+    result = _diff([str(old_path), str(new_path), "--patch", str(patch_path), *(["--compact"] if compact else [])])
+    assert result.returncode == 0, result.stdout
+    assert "1 added, 0 removed, 2 changed, 1 unchanged month(s)" in result.stdout
+
+    patch, profiles = load_backup(patch_path)
+    assert [r["month"] for r in patch] == ["2025-02", "2025-03", "2025-04"]
+    assert [p["id"] for p in profiles] == ["me", "wife", "child"]
+    assert all(r["meta"]["updatedAt"] > SAVED_AT for r in patch)
+    assert _apply(OLD, patch) == _apply(NEW, [])
+    # The index keeps the last record of a month, as the import does
+    assert diff_backups(BackupIndex([*OLD, *patch]), BackupIndex(NEW)).changes == []
+
+
+def test_identical_files_write_an_empty_patch(tmp_path):
+    old_path, new_path = _write(tmp_path / "old.json", OLD), _write(tmp_path / "new.json", OLD)
+    patch_path, changeset_path = tmp_path / "patch.json", tmp_path / "changes.json"
+    result = _diff(
+        [str(old_path), str(new_path), "--patch", str(patch_path), "--changeset", str(changeset_path), "--exit-code"]
+    )
+    assert result.returncode == 0, result.stdout
+    assert "0 added, 0 removed, 0 changed, 3 unchanged month(s)" in result.stdout
+    assert load_backup(patch_path)[0] == []
+    assert json.loads(changeset_path.read_text(encoding="utf-8")) == {
+        "summary": {ADDED: 0, REMOVED: 0, CHANGED: 0, "unchanged": 3},
+        "months": [],
+    }
+
+
+def test_exit_code_when_the_backups_differ(tmp_path):
+    old_path, new_path = _write(tmp_path / "old.json", OLD), _write(tmp_path / "new.json", NEW)
+    assert _diff([str(old_path), str(new_path), "--exit-code", "--quiet"]).returncode == 1
+    assert _diff([str(old_path), str(new_path)]).returncode == 0
@@ -0,0 +1,133 @@
+"""
+Strategy line-item rules: --rules files (load_rules), folded and diacritic label matching,
+skip patterns, and classification once the label memos are full.
+"""
+
+import json
+import pickle
+from pathlib import Path
+
+import pytest
+
+from finance_import import labels, line_items
+from finance_import.labels import FoldedIndex, fold
+from finance_import.line_items import SKIPPED, UNMAPPED, LineItemClassifier, load_rules
+from finance_import.records import KEY_INDEX
+
+STRATEGY = """Cheltuieli lunare,,,,
+incepand cu Ianuarie 2026,,,,
+,Chirie,1500,Trai,800
+,OUT,2300,,
+,Rezervă,100,,
+incepand cu Iunie 2026,,,,
+,CHIRIE,1600,Facturi,300
+"""
+
+
+def _write_rules(tmp_path: Path, rules) -> Path:
+    path = tmp_path / "rules.json"
+    path.write_text(json.dumps(rules, ensure_ascii=False), encoding="utf-8")
+    return path
+
+
+def _amounts(csv_script, path: Path, rules: LineItemClassifier) -> dict[str, dict[str, float]]:
+    return {
+        r.month: {key: r.people["me"][i] for key, i in KEY_INDEX.items() if r.people["me"][i]}
+        for r in csv_script.convert_file(path, line_items=rules)
+    }
+
+
+def test_rules_file_extends_the_built_in_rules(tmp_path, csv_script):
+    source = tmp_path / "strategie.csv"
+    source.write_text(STRATEGY, encoding="utf-8")
+    assert _amounts(csv_script, source, csv_script.LINE_ITEMS) == {
+        "2026-01": {"alimente": 800.0},
+        "2026-06": {"intretinere": 300.0},
+    }
+    rules = load_rules(
+        _write_rules(tmp_path, {"skip": ["  REZERVĂ "], "items": {"Chirie": "casa"}}),
+        csv_script.LINE_ITEM_SKIP,
+        csv_script.LINE_ITEM_TO_KEY,
+    )
+    assert _amounts(csv_script, source, rules) == {
+        "2026-01": {"casa": 1500.0, "alimente": 800.0},
+        "2026-06": {"casa": 1600.0, "intretinere": 300.0},
+    }
+
+
+def test_replace_drops_the_built_in_rules(tmp_path):
+    rules = load_rules(
+        _write_rules(tmp_path, {"items": {"chirie": "casa"}, "replace": True}), ["out"], {"trai": "alimente"}
+    )
+    assert rules.skip == ()
+    assert [rules.classify(c) for c in ("Chirie", "Trai", "OUT", "incepand cu 2030")] == [
+        KEY_INDEX["casa"],
+        UNMAPPED,
+        UNMAPPED,
+        UNMAPPED,
+    ]
+
+
+@pytest.mark.parametrize(
+    "rules, message",
+    [
+        ([], "expected an object"),
+        ({"skip": "total"}, '"skip" must be a list'),
+        ({"items": {"chirie": 3}}, '"items" must map'),
+        ({"items": {"chirie": "chirie"}}, "Unknown category key"),
+    ],
+)
+def test_invalid_rules(tmp_path, rules, message):
+    with pytest.raises(ValueError, match=message):
+        load_rules(_write_rules(tmp_path, rules), [], {})
+
+
+def test_rules_file_not_json(tmp_path):
+    path = tmp_path / "rules.json"
+    path.write_text("{skip: []}", encoding="utf-8")
+    with pytest.raises(ValueError, match="not valid JSON"):
+        load_rules(path, [], {})
+
+
+def test_folded_and_diacritic_labels():
+    items = {"întreținere": "intretinere", "rata casă": "rate", "trai": "alimente"}
+    rules = LineItemClassifier(["out", "in *"], items)
+    assert [
+        rules.classify(c)
+        for c in ("Întreținere", "intretinere", "INTRETINERE", "  Rata   casa\n", "rata casă", "Rată casă", "Trai")
+    ] == [KEY_INDEX[k] for k in ("intretinere", "intretinere", "intretinere", "rate", "rate", "rate", "alimente")]
+    # Skip patterns are substrings of the collapsed lowercase label
+    assert [rules.classify(c) for c in ("OUT", "Total out", "IN *", "incepand cu 2030", "", "  ")] == [SKIPPED] * 6
+    assert rules.classify("Traiul") == UNMAPPED
+
+
+def test_fold():
+    assert fold("ĂÂÎȘȚ șţşţ") == "aaist stst"
+    index = FoldedIndex({"Cheltuieli": "a", "cheltuieli": "b", "Economii": "c"})
+    assert index.get("Cheltuieli") == "a"
+    # A folded collision keeps the first label's key; exact matches still win
+    assert index.get("CHELTUIELI") == "a"
+    assert index.get("cheltuieli") == "b"
+    assert "ECONOMII" in index
+    assert "venit" not in index
+
+
+def test_full_memos_still_classify(monkeypatch):
+    monkeypatch.setattr(labels, "MEMO_LIMIT", 3)
+    monkeypatch.setattr(line_items, "MEMO_LIMIT", 3)
+    rules = LineItemClassifier(["out"], {"chirie": "casa", "trai": "alimente"})
+    cells = ["Chirie", "a", "b", "c", "d", "TRAI", "out", "chirie", "Trai", "e"]
+    expected = [KEY_INDEX["casa"], UNMAPPED, UNMAPPED, UNMAPPED, UNMAPPED, KEY_INDEX["alimente"], SKIPPED]
+    expected += [KEY_INDEX["casa"], KEY_INDEX["alimente"], UNMAPPED]
+    # Twice: the second pass mixes memoized cells with ones resolved again
+    assert [rules.classify(c) for c in cells * 2] == expected * 2
+    assert len(rules._memo) == 3
+    assert len(rules._index._memo) == 3
+
+
+def test_classifier_pickles_with_its_rules():
+    rules = LineItemClassifier(["out"], {"chirie": "casa"})
+    rules.classify("Chirie")
+    copy = pickle.loads(pickle.dumps(rules))
+    assert (copy.skip, copy.items, copy.fingerprint()) == (rules.skip, rules.items, rules.fingerprint())
+    assert copy.classify("CHIRIE") == KEY_INDEX["casa"]
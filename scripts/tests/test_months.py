@@ -0,0 +1,139 @@
+"""
+Month parsing: Romanian names among other spellings, names that must not match as
+substrings, day-first numeric dates, and MonthParser's format inference.
+"""
+
+from pathlib import Path
+
+import pytest
+
+from finance_import.months import (
+    DEFAULT_YEAR_COUNTER,
+    FORMAT_DAY_MONTH_YEAR,
+    MonthParser,
+    month_name_to_num,
+    parse_month,
+    year_from_path,
+)
+from finance_import.stats import Stats
+
+
+@pytest.mark.parametrize(
+    "value, month",
+    [
+        ("Ianuarie 2025", "2025-01"),
+        ("IANUARIE 2025", "2025-01"),
+        ("2025 Ian", "2025-01"),
+        ("Sept. 2025", "2025-09"),
+        ("Mart 2025", "2025-03"),
+        # Labels in two languages: the Romanian word is the month
+        ("Mai/May 2025", "2025-05"),
+        ("Jan/Ian 2025", "2025-01"),
+        ("Iul (Jul) 2025", "2025-07"),
+        # English names that are not also Romanian ones are not months
+        ("March 2025", None),
+        ("May 2025", None),
+        ("Jul 2025", None),
+    ],
+)
+def test_month_names(value, month):
+    assert parse_month(value) == month
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["maintenance 2025", "Mărțișor 2025", "Decontare 2025", "remai 2025", "Ma 2025", "Maine 2025", "iunii 2025"],
+)
+def test_names_match_whole_words_only(value):
+    # "mai" / "mar" / "dec" inside a longer word, or too short a prefix, is not a month
+    assert parse_month(value) is None
+
+
+def test_month_name_to_num():
+    assert [month_name_to_num(w) for w in ("ian", "Febr", "sept.", "MAI", "Mărt", "martie,", "ma", "iunii")] == [
+        "01",
+        "02",
+        "09",
+        "05",
+        "03",
+        "03",
+        None,
+        None,
+    ]
+
+
+@pytest.mark.parametrize(
+    "value, month",
+    [
+        # Numeric dates are day first (dd.mm.yyyy), as Romanian exports write them
+        ("01.02.2025", "2025-02"),
+        ("3.4.2025", "2025-04"),
+        ("31.12.2025", "2025-12"),
+        # Month first would be month 31: not a date
+        ("12.31.2025", None),
+        ("3.2025", "2025-03"),
+        ("13.2025", None),
+        ("2025-1", "2025-01"),
+        ("2025-13", None),
+        # Slash dates are not a supported format, whichever order they use
+        ("04/03/2025", None),
+    ],
+)
+def test_numeric_months(value, month):
+    assert parse_month(value) == month
+
+
+def test_bare_names_need_a_default_year():
+    assert parse_month("mai") is None
+    assert parse_month("mai", 2024) == "2024-05"
+    assert parse_month("mai 2025", 2024) == "2025-05"
+
+
+def test_parser_locks_to_the_column_format():
+    parser = MonthParser(sample_size=4)
+    assert [parser(f"01.{m:02d}.2025") for m in range(1, 5)] == [f"2025-{m:02d}" for m in range(1, 5)]
+    assert parser.format == FORMAT_DAY_MONTH_YEAR
+    # Values in another format still parse, through the fallback
+    assert parser("2025-07") == "2025-07"
+    assert parser("Mai 2025") == "2025-05"
+    assert parser("12.31.2025") is None
+
+
+def test_parser_on_a_mixed_column():
+    parser = MonthParser(sample_size=2)
+    assert parser("2025-01") == "2025-01"
+    assert parser("01.02.2025") == "2025-02"
+    assert parser.format == "mixed"
+    assert parser("2025-03") == "2025-03"
+    assert parser("Aprilie 2025") == "2025-04"
+
+
+@pytest.mark.parametrize(
+    "values",
+    [
+        [f"2025-{m:02d}" for m in range(1, 13)],
+        ["Ianuarie 2025", "maintenance 2025", "01.02.2025", "12.31.2025", "mai", "", "  Mart 2025 "],
+    ],
+)
+def test_parser_matches_parse_month(values):
+    parser = MonthParser(default_year=2024, sample_size=3)
+    assert [parser(v) for v in values * 2] == [parse_month(v, 2024) for v in values * 2]
+
+
+def test_default_year_counted_once_per_cell():
+    stats = Stats()
+    parser = MonthParser(default_year=2025, stats=stats)
+    assert [parser(v) for v in ("ianuarie", "ianuarie", "feb", "2025-03")] == [
+        "2025-01",
+        "2025-01",
+        "2025-02",
+        "2025-03",
+    ]
+    assert stats.counters[DEFAULT_YEAR_COUNTER] == 2
+
+
+def test_year_from_path():
+    assert year_from_path(Path("buget-2025.tsv")) == 2025
+    assert year_from_path(Path("2024_cheltuieli.csv")) == 2024
+    assert year_from_path(Path("buget-12025.tsv")) is None
+    assert year_from_path(Path("buget.csv")) is None
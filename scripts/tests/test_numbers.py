@@ -0,0 +1,62 @@
+"""parse_column (NumPy and stdlib paths) against parse_number, cell by cell."""
+
+import pytest
+
+from finance_import.numbers import FORMAT_DOT, FORMAT_EU, np, parse_column, parse_number
+
+# Spellings seen in real exports, plus cells that are not numbers at all
+EDGE_CELLS = [
+    "2.500",
+    "1,5",
+    "**",
+    "",
+    "nan",
+    "1_000",
+    "2500**",
+    " 1 234,5 ",
+    "1.234,56",
+    "1.234.567",
+    ".500",
+    "2.5",
+    "-3",
+    "abc",
+    "inf",
+    "1e3",
+]
+
+PATHS = [
+    pytest.param(False, id="stdlib"),
+    pytest.param(True, id="numpy", marks=pytest.mark.skipif(np is None, reason="NumPy is not installed")),
+]
+
+
+def _reprs(values: list[float]) -> list[str]:
+    # repr compares nan with nan and tells -0.0 from 0.0
+    return [repr(v) for v in values]
+
+
+@pytest.mark.parametrize("use_numpy", PATHS)
+def test_column_matches_parse_number(use_numpy):
+    parsed = parse_column(EDGE_CELLS, use_numpy=use_numpy)
+    assert _reprs(parsed.values) == _reprs([parse_number(cell) for cell in EDGE_CELLS])
+
+
+@pytest.mark.parametrize("use_numpy", PATHS)
+@pytest.mark.parametrize("cell", EDGE_CELLS)
+def test_single_cell_column(use_numpy, cell):
+    assert _reprs(parse_column([cell], use_numpy=use_numpy).values) == _reprs([parse_number(cell)])
+
+
+@pytest.mark.parametrize("use_numpy", PATHS)
+def test_thousands_in_dot_decimal_column_is_ambiguous(use_numpy):
+    cells = ["2.5", "10.25", "2.500", "", "3"]
+    parsed = parse_column(cells, use_numpy=use_numpy)
+    assert parsed.values == [2.5, 10.25, 2500.0, 0.0, 3.0]
+    assert parsed.ambiguous == [2]
+
+
+@pytest.mark.parametrize("use_numpy", PATHS)
+def test_fixed_format_is_kept(use_numpy):
+    # The block's cells alone look like dot decimals; the file's format (EU) says otherwise
+    assert parse_column(["2.500", "1.5"], FORMAT_EU, use_numpy=use_numpy).ambiguous == []
+    assert parse_column(["2.500"], FORMAT_DOT, use_numpy=use_numpy).ambiguous == [0]
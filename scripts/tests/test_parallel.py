@@ -0,0 +1,78 @@
+"""
+Parallel parsing of one file (map_ranges over row_ranges) against a sequential pass, on
+generated inputs split into many small byte ranges.
+"""
+
+import pytest
+
+from finance_import import parallel
+from finance_import.bench.generators import generate
+from finance_import.parallel import read_rows, row_ranges
+
+# Small ranges so a generated file of a few hundred KiB is split in dozens of places
+RANGE_BYTES = 8 * 1024
+
+
+@pytest.fixture
+def small_ranges(monkeypatch):
+    monkeypatch.setattr(parallel, "PARALLEL_MIN_BYTES", 0)
+    monkeypatch.setattr(parallel, "RANGE_BYTES", RANGE_BYTES)
+
+
+def _months(records) -> list[tuple[str, dict[str, bytes]]]:
+    return [(r.month, {p: a.tobytes() for p, a in r.people.items()}) for r in records]
+
+
+def _sources(records) -> list[tuple[str, tuple[str, int] | None]]:
+    return [(r.month, r.source) for r in records]
+
+
+def test_ranges_cover_the_rows(tmp_path):
+    path = generate("simple", 2000, tmp_path)
+    data_start, ranges = row_ranges(path, 1, RANGE_BYTES)
+    assert len(ranges) > 1
+    assert ranges[0][0] == data_start and ranges[-1][1] == path.stat().st_size
+    assert all(end == start for (_, end), (start, _) in zip(ranges, ranges[1:]))
+    rows = [row for start, end in ranges for row in read_rows(path, start, end)]
+    assert rows == list(read_rows(path, data_start, path.stat().st_size))
+
+
+def test_table_parallel_matches_sequential(tmp_path, small_ranges, csv_script):
+    path = generate("table", 3000, tmp_path)
+    assert len(row_ranges(path)[1]) > 1
+    sequential_ambiguous: list = []
+    parallel_ambiguous: list = []
+    sequential = [(m, a.tobytes()) for m, a in csv_script.iter_months(path, ambiguous=sequential_ambiguous)]
+    in_parallel = [
+        (m, a.tobytes()) for m, a in csv_script.iter_months(path, ambiguous=parallel_ambiguous, workers=2)
+    ]
+    assert in_parallel == sequential
+    assert parallel_ambiguous == sequential_ambiguous
+
+
+def test_table_parallel_cites_the_same_rows(tmp_path, small_ranges, csv_script):
+    path = generate("table", 3000, tmp_path)
+    sequential: dict[str, int] = {}
+    in_parallel: dict[str, int] = {}
+    list(csv_script.iter_months(path, first_rows=sequential))
+    list(csv_script.iter_months(path, workers=2, first_rows=in_parallel))
+    assert in_parallel == sequential
+    assert min(sequential.values()) == 2
+
+
+def test_simple_parallel_matches_sequential(tmp_path, small_ranges, tsv_script):
+    path = generate("simple", 3000, tmp_path)
+    assert len(row_ranges(path)[1]) > 1
+    sequential = tsv_script.convert_file(path, 2025, workers=1, sources=True)
+    in_parallel = tsv_script.convert_file(path, 2025, workers=2, sources=True)
+    assert _months(in_parallel) == _months(sequential)
+    assert _sources(in_parallel) == _sources(sequential)
+
+
+def test_tsv_parallel_matches_sequential(tmp_path, small_ranges, tsv_script):
+    path = generate("tsv", 3000, tmp_path)
+    assert len(row_ranges(path, 2)[1]) > 1
+    sequential = tsv_script.convert_file(path, 2025, workers=1, sources=True)
+    in_parallel = tsv_script.convert_file(path, 2025, workers=2, sources=True)
+    assert _months(in_parallel) == _months(sequential)
+    assert _sources(in_parallel) == _sources(sequential)
@@ -0,0 +1,151 @@
+"""
+PersonMap duplicates policies and group_people, and --persons configs from the loader to the
+converter's output.
+"""
+
+import json
+import subprocess
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+
+from finance_import.persons import DuplicateRowError, PersonMap, group_people, load_persons
+from finance_import.records import CATEGORY_KEYS, MonthSum, settle
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+PERSONS = {"Paul": "me", "Codru": "wife"}
+
+
+def _amounts(value: float) -> array:
+    return array("d", [value]) * len(CATEGORY_KEYS)
+
+
+def _group(duplicates: str, items, exact: bool = False) -> dict[str, dict[str, list[float]]]:
+    persons = PersonMap(PERSONS, duplicates=duplicates)
+    return {
+        month: {p: list(settle(a)) for p, a in people.items()}
+        for month, people in group_people(items, persons, exact=exact)
+    }
+
+
+def _rows() -> list:
+    # Two rows for (2025-01, me), out of month order
+    return [
+        ("2025-02", {"me": _amounts(5.0)}),
+        ("2025-01", {"me": _amounts(1.0), "wife": _amounts(2.0)}),
+        ("2025-01", {"me": _amounts(3.0)}),
+    ]
+
+
+@pytest.mark.parametrize("duplicates, expected", [("sum", 4.0), ("last", 3.0), ("first", 1.0)])
+def test_duplicates_policy(duplicates, expected):
+    grouped = _group(duplicates, _rows())
+    assert list(grouped) == ["2025-01", "2025-02"]
+    assert grouped["2025-01"]["me"] == [expected] * len(CATEGORY_KEYS)
+    assert grouped["2025-01"]["wife"] == [2.0] * len(CATEGORY_KEYS)
+    assert grouped["2025-02"] == {"me": [5.0] * len(CATEGORY_KEYS)}
+
+
+def test_error_policy_names_month_and_profile():
+    with pytest.raises(DuplicateRowError) as e:
+        _group("error", _rows())
+    assert (e.value.profile, e.value.month) == ("me", "2025-01")
+
+
+def test_sum_does_not_change_the_rows():
+    rows = _rows()
+    _group("sum", rows)
+    assert [list(a) for _, people in rows for a in people.values()] == [
+        [v] * len(CATEGORY_KEYS) for v in (5.0, 1.0, 2.0, 3.0)
+    ]
+
+
+def test_plain_and_exact_sums():
+    # 0.1 + 0.2 + 0.3 rounds up in plain float arithmetic; the exact sum is 0.6
+    items = [("2025-01", {"me": _amounts(v)}) for v in (0.1, 0.2, 0.3)]
+    assert _group("sum", items)["2025-01"]["me"][0] == 0.1 + 0.2 + 0.3
+    assert _group("sum", items, exact=True)["2025-01"]["me"][0] == 0.6
+    unsettled = group_people(items, PersonMap(PERSONS), settled=False, exact=True)
+    assert isinstance(next(unsettled)[1]["me"], MonthSum)
+
+
+def test_spilled_sums_are_exact():
+    # Each row spills as its own run: the runs' sums are combined exactly
+    items = [("2025-01", {"me": _amounts(v)}) for v in (0.1, 0.2, 0.3)]
+    [(_, people)] = group_people(items, PersonMap(PERSONS), memory_budget=1)
+    assert people["me"][0] == 0.6
+
+
+def test_unknown_policy():
+    with pytest.raises(ValueError):
+        PersonMap(PERSONS, duplicates="mean")
+
+
+def _write_config(tmp_path: Path, config) -> Path:
+    path = tmp_path / "persons.json"
+    path.write_text(json.dumps(config), encoding="utf-8")
+    return path
+
+
+def test_load_persons(tmp_path):
+    path = _write_config(
+        tmp_path,
+        {"persons": {"Paul": "me", " Ana ": {"id": "kid", "name": "Ana M."}, "Ani": "kid"}, "duplicates": "last"},
+    )
+    persons = load_persons(path)
+    assert [persons.get(p) for p in ("Paul", "Ana", "Ani", "Codru")] == ["me", "kid", "kid", None]
+    assert persons.duplicates == "last"
+    assert persons.profiles() == [{"id": "me", "name": "Paul"}, {"id": "kid", "name": "Ana M."}]
+
+
+@pytest.mark.parametrize(
+    "config",
+    [
+        {"persons": {}},
+        {"persons": {"Paul": ""}},
+        {"persons": {"Paul": {"name": "Paul"}}},
+        {"persons": {"Paul": "me"}, "duplicates": "mean"},
+        [],
+    ],
+)
+def test_invalid_persons_config(tmp_path, config):
+    with pytest.raises(ValueError):
+        load_persons(_write_config(tmp_path, config))
+
+
+def _simple_csv(tmp_path: Path, rows: list[list[str]]) -> Path:
+    path = tmp_path / "buget.csv"
+    lines = [",".join(["persoana", "luna", *CATEGORY_KEYS])]
+    lines += [",".join([person, luna, value, *["0"] * (len(CATEGORY_KEYS) - 1)]) for person, luna, value in rows]
+    path.write_text("\n".join(lines) + "\n", encoding="utf-8")
+    return path
+
+
+def test_persons_option(tmp_path):
+    """Two persons share a profile (their rows are duplicates); an unmapped person is skipped."""
+    config = _write_config(tmp_path, {"persons": {"Ana": {"id": "kid", "name": "Ana M."}, "Ani": "kid", "Paul": "me"}})
+    source = _simple_csv(
+        tmp_path,
+        [["Ana", "2025-01", "10"], ["Ani", "", "5"], ["Paul", "2025-01", "7"], ["Codru", "2025-01", "99"]],
+    )
+    output = tmp_path / "out.json"
+    subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "tsv-to-finance-json.py"), str(source), "-o", str(output)]
+        + ["--persons", str(config), "--no-cache"],
+        check=True,
+        capture_output=True,
+    )
+    backup = json.loads(output.read_text(encoding="utf-8"))
+    assert backup["profiles"] == [{"id": "kid", "name": "Ana M."}, {"id": "me", "name": "Paul"}]
+    [record] = backup["data"]
+    assert record["month"] == "2025-01"
+    assert {p: amounts["venit"] for p, amounts in record["people"].items()} == {"kid": 15.0, "me": 7.0}
+
+
+def test_persons_error_policy(tmp_path, tsv_script):
+    persons = PersonMap({"Ana": "kid", "Ani": "kid"}, duplicates="error")
+    source = _simple_csv(tmp_path, [["Ana", "2025-01", "10"], ["Ani", "", "5"]])
+    with pytest.raises(DuplicateRowError):
+        tsv_script.convert_file(source, 2025, persons=persons)
@@ -0,0 +1,101 @@
+"""
+Strategy projection: period expansion and running balances, checked against a plain
+month-by-month recurrence, and --growth validation.
+"""
+
+import argparse
+from array import array
+
+import pytest
+
+from finance_import.projection import expand_periods, monthly_factor, np, project
+from finance_import.records import CATEGORY_KEYS, KEY_INDEX
+
+
+def _vector(**values: float) -> array:
+    amounts = array("d", [0.0]) * len(CATEGORY_KEYS)
+    for key, value in values.items():
+        amounts[KEY_INDEX[key]] = value
+    return amounts
+
+
+PERIODS = [
+    ("2025-11", _vector(economii=500.0, investitii=200.0, venit=4000.0)),
+    ("2026-02", _vector(economii=-300.0, investitii=250.0, venit=4200.0, bonuri=100.0)),
+    ("2026-05", _vector(economii=800.0, venit=5000.0)),
+]
+
+
+def _expected_months(periods, horizon: str) -> list[tuple[str, array]]:
+    """One (month, vector) per month, stepping the calendar one month at a time."""
+    starts = dict(periods)
+    out = []
+    year, month = map(int, min(starts).split("-"))
+    current = None
+    while f"{year:04d}-{month:02d}" <= horizon:
+        name = f"{year:04d}-{month:02d}"
+        current = starts.get(name, current)
+        out.append((name, current))
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return out
+
+
+def test_expand_periods():
+    months, vectors = expand_periods(PERIODS, "2026-12")
+    expected = _expected_months(PERIODS, "2026-12")
+    assert months == [m for m, _ in expected]
+    assert all(v is e for v, (_, e) in zip(vectors, expected))
+    assert len(months) == 14
+
+
+def test_expand_periods_horizon_and_repeated_start():
+    later = _vector(economii=1.0)
+    months, vectors = expand_periods([*PERIODS[:2], ("2026-02", later), ("2027-03", _vector())], "2026-03")
+    assert months == ["2025-11", "2025-12", "2026-01", "2026-02", "2026-03"]
+    assert vectors[-2:] == [later, later]
+    assert expand_periods(PERIODS, "2025-10") == ([], [])
+
+
+def _recurrence(amounts: list[float], annual_rate: float, opening: float) -> list[float]:
+    factor = (1.0 + annual_rate) ** (1.0 / 12.0)
+    balance, out = opening, []
+    for amount in amounts:
+        balance = balance * factor + amount
+        out.append(balance)
+    return out
+
+
+@pytest.mark.parametrize("use_numpy", [False, pytest.param(True, marks=pytest.mark.skipif(np is None, reason="NumPy"))])
+@pytest.mark.parametrize("growth", [{}, {"economii": 0.05, "investitii": 0.07}, {"economii": -0.5}])
+def test_balances_match_the_recurrence(use_numpy, growth):
+    opening = {"economii": 10_000.0, "investitii": 2_500.0}
+    projection = project(PERIODS, "2027-06", growth, opening, use_numpy=use_numpy)
+    for key in ("economii", "investitii"):
+        amounts = [v[KEY_INDEX[key]] for v in projection.amounts]
+        expected = _recurrence(amounts, growth.get(key, 0.0), opening[key])
+        assert projection.balances[key] == pytest.approx(expected, rel=1e-12, abs=1e-9)
+    assert projection.income[0] == 4000.0
+    assert projection.income[3] == 4300.0
+
+
+@pytest.mark.skipif(np is None, reason="NumPy")
+def test_numpy_and_stdlib_balances_are_identical():
+    growth = {"economii": 0.03, "investitii": 0.09}
+    assert (
+        project(PERIODS, "2030-12", growth, use_numpy=True).balances
+        == project(PERIODS, "2030-12", growth, use_numpy=False).balances
+    )
+
+
+@pytest.mark.parametrize("rate", [-1.0, -1.5, float("nan")])
+def test_growth_must_be_above_minus_one(csv_script, rate):
+    with pytest.raises(ValueError):
+        monthly_factor(rate)
+    with pytest.raises(argparse.ArgumentTypeError, match="greater than -1"):
+        csv_script._growth_arg(f"economii={rate}")
+
+
+def test_growth_arg(csv_script):
+    assert csv_script._growth_arg("investitii=-0.2") == ("investitii", -0.2)
+    with pytest.raises(argparse.ArgumentTypeError):
+        csv_script._growth_arg("venit=0.1")
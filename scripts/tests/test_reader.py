@@ -0,0 +1,89 @@
+"""
+BackupReader against json.load: the same records, version and profiles for backups written
+by BackupWriter and for hand-written ones, also when every value straddles a chunk boundary.
+"""
+
+import gzip
+import json
+
+import pytest
+
+from finance_import import reader
+from finance_import.reader import BackupReader
+from finance_import.records import CATEGORY_KEYS, MonthRecord, amounts_from_dict
+from finance_import.writer import write_backup
+
+NOW = "2025-06-01T00:00:00.000Z"
+PROFILES = [{"id": "me", "name": "Paul"}, {"id": "wife", "name": "Codru și \"eu\""}]
+
+# Members in another order than the writer's, escapes, exponents and nested values
+HAND_WRITTEN = """
+{ "profiles" : [ {"id": "me", "name": "P\\u0103ul"} ] ,
+  "extra": {"nested": [1, 2.5e-7, -0.0, null, true, "a\\"b"]},
+  "data" : [
+    {"month": "2025-01", "people": {"me": {"venit": 12345678901234567890, "bonuri": 1E3}}},
+    {"month": "2025-02", "people": {}}, 7, "x", [] ],
+  "version" : 3 }
+"""
+
+
+@pytest.fixture(params=[None, 7], ids=["default-chunks", "7-char-chunks"])
+def chunk(request, monkeypatch):
+    if request.param is not None:
+        monkeypatch.setattr(reader, "READ_CHUNK", request.param)
+    return request.param
+
+
+def _records(count: int) -> list[MonthRecord]:
+    out = []
+    for i in range(count):
+        amounts = amounts_from_dict({key: (i * 31 + j) / 7 for j, key in enumerate(CATEGORY_KEYS)})
+        out.append(MonthRecord(f"{2000 + i // 12}-{i % 12 + 1:02d}", {"me": amounts, "wife": amounts}))
+    return out
+
+
+def _read(path):
+    with BackupReader(path) as r:
+        records = list(r.records())
+        return records, r.version, r.profiles
+
+
+@pytest.mark.parametrize("compact", [False, True], ids=["indented", "compact"])
+@pytest.mark.parametrize("compress", [False, True], ids=["json", "gzip"])
+def test_written_backup(tmp_path, chunk, compact, compress):
+    path = tmp_path / ("backup.json.gz" if compress else "backup.json")
+    write_backup(path, 3, _records(30), NOW, PROFILES, compact, compress, totals=True)
+    with (gzip.open if compress else open)(path, "rt", encoding="utf-8") as f:
+        expected = json.load(f)
+    assert _read(path) == (expected["data"], 3, expected["profiles"])
+
+
+def test_hand_written_backup(tmp_path, chunk):
+    path = tmp_path / "backup.json"
+    path.write_text(HAND_WRITTEN, encoding="utf-8")
+    expected = json.loads(HAND_WRITTEN)
+    assert _read(path) == (expected["data"], 3, expected["profiles"])
+
+
+def test_empty_data(tmp_path, chunk):
+    path = tmp_path / "backup.json"
+    path.write_text('{"version": 2, "data": []}', encoding="utf-8")
+    assert _read(path) == ([], 2, None)
+
+
+@pytest.mark.parametrize(
+    "text",
+    [
+        '{"version": 3, "data": [{"month": "2025-01"}',  # truncated
+        '{"version": 3, "data": []} []',  # trailing data
+        '{"version": 3, "data": [1 2]}',  # missing comma
+        '{"version": 4, "data": []}',  # unsupported version
+        '{"version": 3}',  # no data
+        "[]",  # not an object
+    ],
+)
+def test_invalid_backup(tmp_path, chunk, text):
+    path = tmp_path / "backup.json"
+    path.write_text(text, encoding="utf-8")
+    with pytest.raises(ValueError):
+        _read(path)
@@ -0,0 +1,79 @@
+"""
+ServeState re-rendering: per-year documents follow the served profiles, and the watcher
+keeps running after a refresh fails.
+"""
+
+import json
+import threading
+import time
+from array import array
+from pathlib import Path
+
+from finance_import.records import CATEGORY_KEYS, MonthRecord
+from finance_import.serve import ServeState, watch, year_path
+
+
+def _parse(path: Path) -> list[MonthRecord]:
+    """Inputs are {month: {profile: amount}} JSON files."""
+    months = json.loads(path.read_text(encoding="utf-8"))
+    return [
+        MonthRecord(month, {p: array("d", [v]) * len(CATEGORY_KEYS) for p, v in people.items()})
+        for month, people in sorted(months.items())
+    ]
+
+
+def _write(path: Path, months: dict) -> None:
+    path.write_text(json.dumps(months), encoding="utf-8")
+
+
+def _profile_ids(state: ServeState, year: str) -> list[str]:
+    return [p["id"] for p in json.loads(state.documents[year_path(year)].body)["profiles"]]
+
+
+def _wait_for(condition, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "the watcher stopped refreshing"
+        time.sleep(0.01)
+
+
+def test_year_documents_follow_new_profiles(tmp_path):
+    _write(tmp_path / "a.json", {"2025-01": {"me": 1.0}})
+    state = ServeState(tmp_path, (".json",), _parse)
+    state.refresh()
+    etag = state.documents[year_path("2025")].etag
+    assert _profile_ids(state, "2025") == ["me"]
+
+    # A profile first used in 2026 is listed in the unchanged 2025 document too
+    _write(tmp_path / "b.json", {"2026-01": {"kid": 2.0}})
+    assert state.refresh() == [tmp_path / "b.json"]
+    assert _profile_ids(state, "2025") == ["me", "kid"]
+    assert state.documents[year_path("2025")].etag != etag
+
+
+def test_watch_survives_a_failed_refresh(tmp_path, capsys):
+    _write(tmp_path / "a.json", {"2025-01": {"me": 1.0}})
+    calls = []
+
+    def merge(results):
+        calls.append(len(results))
+        if len(results) > 1:
+            raise ValueError("duplicate month")
+        return [r for _, records, _ in results for r in records]
+
+    state = ServeState(tmp_path, (".json",), _parse, merge=merge)
+    state.refresh()
+    served = state.documents
+
+    stop = threading.Event()
+    watcher = threading.Thread(target=watch, args=(state, 0.01, stop), daemon=True)
+    watcher.start()
+    _write(tmp_path / "b.json", {"2025-01": {"me": 2.0}})
+    _wait_for(lambda: len(calls) >= 2)
+    (tmp_path / "b.json").unlink()
+    _wait_for(lambda: len(calls) >= 3)
+    stop.set()
+    watcher.join()
+
+    assert "Error: refreshing" in capsys.readouterr().out
+    assert state.documents[year_path("2025")].etag == served[year_path("2025")].etag
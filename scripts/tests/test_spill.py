@@ -0,0 +1,114 @@
+"""
+SpillingGroupBy under a budget small enough to spill many runs: the grouped output, with the
+same months in several runs, matches grouping in memory bit for bit.
+"""
+
+import random
+from array import array
+
+import pytest
+
+from finance_import import spill
+from finance_import.persons import PersonMap, group_people
+from finance_import.records import CATEGORY_KEYS, settle, sum_into
+from finance_import.spill import SpillingGroupBy, parse_size
+from finance_import.stats import Stats
+
+MONTHS = [f"{y}-{m:02d}" for y in (2024, 2025) for m in range(1, 13)]
+# About two dozen pending months
+BUDGET = 24 * (spill.ENTRY_BYTES + 300)
+
+
+def _items(count: int = 2000, seed: int = 7) -> list[tuple[str, array]]:
+    """Rows in random month order with values whose float sum depends on the order."""
+    rng = random.Random(seed)
+    return [
+        (rng.choice(MONTHS), array("d", (rng.choice((1e16, -1e16, 0.1, 3.3)) for _ in CATEGORY_KEYS)))
+        for _ in range(count)
+    ]
+
+
+def _copy(items):
+    # Each grouping gets rows of its own
+    return [(month, array("d", amounts)) for month, amounts in items]
+
+
+def _in_memory(items) -> list[tuple[str, bytes]]:
+    pending: dict = {}
+    for month, amounts in items:
+        pending[month] = amounts if month not in pending else sum_into(pending[month], amounts)
+    return [(month, settle(pending[month]).tobytes()) for month in sorted(pending)]
+
+
+def _spilled(items, budget: int = BUDGET) -> tuple[list[tuple[str, bytes]], int]:
+    groups = SpillingGroupBy(sum_into, budget)
+    for month, amounts in items:
+        groups.add(month, amounts)
+    return [(month, settle(amounts).tobytes()) for month, amounts in groups.items()], groups.spilled
+
+
+def test_spilled_runs_match_in_memory_grouping():
+    items = _items()
+    expected = _in_memory(_copy(items))
+    grouped, spilled = _spilled(_copy(items))
+    assert spilled > 5
+    assert grouped == expected
+    assert [m for m, _ in grouped] == sorted(set(MONTHS))
+
+
+def test_merged_runs_keep_the_order(monkeypatch):
+    # Every few runs are merged into one on disk before the final merge
+    monkeypatch.setattr(spill, "MERGE_FANIN", 3)
+    items = _items(seed=11)
+    grouped, spilled = _spilled(_copy(items), budget=spill.ENTRY_BYTES * 4)
+    assert spilled > 3 * spill.MERGE_FANIN
+    assert grouped == _in_memory(_copy(items))
+
+
+def test_budget_not_reached():
+    items = _items(200)
+    grouped, spilled = _spilled(_copy(items), budget=1 << 30)
+    assert spilled == 0
+    assert grouped == _in_memory(_copy(items))
+
+
+@pytest.mark.parametrize("duplicates", ["sum", "last", "first"])
+def test_person_groups_spill_like_in_memory(duplicates):
+    rng = random.Random(3)
+    rows = [
+        (rng.choice(MONTHS), {rng.choice(("me", "wife")): array("d", [rng.random()]) * len(CATEGORY_KEYS)})
+        for _ in range(1500)
+    ]
+    persons = PersonMap({"Paul": "me", "Codru": "wife"}, duplicates=duplicates)
+
+    def grouped(**kwargs):
+        return [
+            (month, {p: a.tobytes() for p, a in people.items()})
+            for month, people in group_people([(m, dict(p)) for m, p in rows], persons, **kwargs)
+        ]
+
+    stats = Stats()
+    spilled = grouped(memory_budget=BUDGET, stats=stats)
+    assert stats.counters["spilledRuns"] > 5
+    # Spilled runs hold partial sums, so they are summed exactly, as exact in-memory grouping does
+    assert spilled == grouped(exact=True)
+
+
+def test_close_discards_unread_runs():
+    groups = SpillingGroupBy(sum_into, 1)
+    for month, amounts in _items(50):
+        groups.add(month, amounts)
+    assert groups.spilled == 50
+    groups.close()
+    assert list(groups.items()) == []
+
+
+@pytest.mark.parametrize("value, size", [("512K", 512 * 1024), ("64M", 64 << 20), ("1.5g", 3 << 29), ("1000", 1000)])
+def test_parse_size(value, size):
+    assert parse_size(value) == size
+
+
+@pytest.mark.parametrize("value", ["", "64X", "-1M", "0"])
+def test_parse_size_rejects(value):
+    with pytest.raises(ValueError):
+        parse_size(value)
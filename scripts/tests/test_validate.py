@@ -0,0 +1,135 @@
+"""
+BackupValidator: negative and non-finite amounts, duplicate months and dict records, with
+violations citing the input row of converted records ("input.csv row N") or their position
+in the backup ("data[i]"), on the NumPy and stdlib batch checks.
+"""
+
+import subprocess
+import sys
+from array import array
+from pathlib import Path
+
+import pytest
+
+from finance_import import validate
+from finance_import.records import CATEGORY_KEYS, KEY_INDEX, MonthRecord
+from finance_import.validate import BackupValidationError, BackupValidator, validate_backup
+
+SCRIPTS_DIR = Path(__file__).resolve().parent.parent
+
+
+@pytest.fixture(params=["numpy", "stdlib"], autouse=True)
+def batch_check(request, monkeypatch):
+    if request.param == "stdlib":
+        monkeypatch.setattr(validate, "np", None)
+    elif validate.np is None:
+        pytest.skip("NumPy is not installed")
+
+
+def _record(month: str, source: tuple[str, int] | None = None, **values: float) -> MonthRecord:
+    amounts = array("d", [1.0]) * len(CATEGORY_KEYS)
+    for key, value in values.items():
+        amounts[KEY_INDEX[key]] = value
+    return MonthRecord(month, {"me": amounts, "wife": array("d", [0.0]) * len(CATEGORY_KEYS)}, source)
+
+
+def _check(records, max_violations: int = 20) -> BackupValidator:
+    validator = BackupValidator(max_violations)
+    for record in records:
+        validator.check(record)
+    validator.finish()
+    return validator
+
+
+def test_valid_records():
+    validator = _check(_record(f"2025-{m:02d}") for m in range(1, 13))
+    assert validator.ok
+    assert validator.records == 12
+
+
+@pytest.mark.parametrize(
+    "value, message",
+    [(-0.01, "negative: -0.01"), (float("nan"), "not finite: nan"), (float("inf"), "not finite: inf")],
+)
+def test_bad_amounts_cite_the_input_row(value, message):
+    records = [
+        _record("2025-01", ("buget.csv", 2)),
+        _record("2025-02", ("buget.csv", 14), venit=value),
+        _record("2025-03", ("buget.csv", 31)),
+    ]
+    validator = _check(records)
+    assert not validator.ok
+    assert validator.count == 1
+    [violation] = validator.violations
+    assert (violation.index, violation.month, violation.field) == (1, "2025-02", "people.me.venit")
+    assert str(violation) == f"buget.csv row 14 (2025-02) people.me.venit: {message}"
+
+
+def test_records_without_source_cite_their_position():
+    validator = _check([_record("2025-01"), _record("2025-02", economii=float("-inf"))])
+    assert [str(v) for v in validator.violations] == ["data[1] (2025-02) people.me.economii: not finite: -inf"]
+
+
+def test_duplicate_months_across_batches(monkeypatch):
+    monkeypatch.setattr(validate, "BATCH_RECORDS", 2)
+    records = [_record("2025-01"), _record("2025-02"), _record("2025-03", ("b.csv", 9)), _record("2025-01")]
+    validator = _check(records)
+    assert [str(v) for v in validator.violations] == [
+        "data[3] (2025-01) month: duplicate of data[0]",
+    ]
+
+
+def test_violations_are_capped_but_counted():
+    records = [_record(f"2025-{m:02d}", ("b.csv", m + 1), venit=-1.0, bonuri=-1.0) for m in range(1, 7)]
+    validator = _check(records, max_violations=3)
+    assert validator.count == 12
+    assert [v.source for v in validator.violations] == [("b.csv", 2), ("b.csv", 2), ("b.csv", 3)]
+    with pytest.raises(BackupValidationError, match="12 schema violation"):
+        validator.raise_if_invalid()
+
+
+def _dict_record(month: str, **values) -> dict:
+    amounts = {key: 0 for key in CATEGORY_KEYS}
+    amounts.update(values)
+    meta = {"updatedAt": "2025-01-31T10:00:00.000Z", "isSaved": True}
+    return {"month": month, "people": {"me": amounts}, "meta": meta}
+
+
+def test_loaded_backup():
+    records = [_dict_record("2025-01"), _dict_record("2025-02", venit=True), _dict_record("2025-13")]
+    records.append({"month": "2025-04", "people": {"me": {"venit": 1}}, "meta": {"updatedAt": "ieri", "isSaved": 1}})
+    validator = validate_backup({"version": 3, "data": records})
+    messages = [str(v) for v in validator.violations]
+    assert messages[0] == "data[1] (2025-02) people.me.venit: expected a number, got True"
+    assert messages[1] == "data[2] month: expected YYYY-MM, got '2025-13'"
+    assert messages[2].startswith("data[3] (2025-04) people.me: missing ")
+    assert messages[3:] == [
+        "data[3] (2025-04) meta.updatedAt: expected an ISO datetime (UTC), got 'ieri'",
+        "data[3] (2025-04) meta.isSaved: expected a boolean, got 1",
+    ]
+    assert validate_backup({"version": 3, "data": [_dict_record("2025-01")]}).ok
+
+
+def test_converted_table_cites_file_rows(tmp_path, csv_script):
+    path = tmp_path / "buget.csv"
+    path.write_text("luna,venit,economii\n2025-01,100,10\n2025-02,200,-5\n2025-01,50,5\n", encoding="utf-8")
+    validator = _check(csv_script.convert_file(path, sources=True))
+    assert [str(v) for v in validator.violations] == [
+        "buget.csv row 3 (2025-02) people.me.economii: negative: -5.0",
+        "buget.csv row 3 (2025-02) people.wife.economii: negative: -5.0",
+    ]
+
+
+def test_validate_option_keeps_the_old_output(tmp_path):
+    source = tmp_path / "buget.csv"
+    source.write_text("luna,venit\n2025-01,100\n2025-02,-1\n", encoding="utf-8")
+    output = tmp_path / "out.json"
+    output.write_text("{}", encoding="utf-8")
+    result = subprocess.run(
+        [sys.executable, str(SCRIPTS_DIR / "csv-to-finance-import.py"), str(source), str(output), "--validate"],
+        capture_output=True,
+        text=True,
+    )
+    assert result.returncode == 1
+    assert "buget.csv row 3 (2025-02) people.me.venit: negative: -1.0" in result.stdout
+    assert output.read_text(encoding="utf-8") == "{}"
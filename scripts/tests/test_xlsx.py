@@ -0,0 +1,149 @@
+"""
+Streaming .xlsx reader on a workbook built by hand (a zip of sheet XML): cell types and
+dates, sparse and missing rows and cells, <dimension> padding, and sheet choice through
+input_sheets / open_input.
+"""
+
+import zipfile
+from pathlib import Path
+
+import pytest
+
+from finance_import import xlsx
+from finance_import.formats import FORMAT_TABLE, input_sheets, open_input
+from finance_import.xlsx import Workbook
+
+_NS = 'xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"'
+_R_NS = 'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships"'
+_PACKAGE_NS = "http://schemas.openxmlformats.org/package/2006/relationships"
+
+SHARED_STRINGS = [
+    "<si><t>luna</t></si>",
+    "<si><t>venit</t></si>",
+    # Rich text runs are joined; phonetic runs are not part of the text
+    "<si><r><t>chel</t></r><r><t>tuieli</t></r><rPh sb=\"0\" eb=\"1\"><t>x</t></rPh></si>",
+    "<si><t>ianuarie 2025</t></si>",
+]
+
+# Style 0: general; 1: built-in date (14); 2: custom date code; 3: custom number code
+STYLES = (
+    f"<styleSheet {_NS}>"
+    '<numFmts><numFmt numFmtId="164" formatCode="dd/mm/yyyy"/><numFmt numFmtId="165" formatCode="#,##0.00"/></numFmts>'
+    '<cellXfs><xf numFmtId="0"/><xf numFmtId="14"/><xf numFmtId="164"/><xf numFmtId="165"/></cellXfs>'
+    "</styleSheet>"
+)
+
+BUDGET = (
+    '<dimension ref="A1:D5"/><sheetData>'
+    '<row r="1"><c r="A1" t="s"><v>0</v></c><c r="B1" t="s"><v>1</v></c><c r="C1" t="s"><v>2</v></c></row>'
+    '<row r="2"><c r="A2" t="s"><v>3</v></c><c r="B2"><v>1234.5</v></c><c r="C2" s="3"><v>2500</v></c></row>'
+    # Row 3 is missing from the XML; row 4 has only its third cell
+    '<row r="4"><c r="C4"><v>-7.25</v></c></row>'
+    '<row r="5"><c r="A5" t="inlineStr"><is><t>februarie 2025</t></is></c><c r="B5" t="b"><v>1</v></c></row>'
+    "</sheetData>"
+)
+
+DATES = (
+    "<sheetData>"
+    '<row r="1"><c r="A1" s="1"><v>45658</v></c><c r="B1" s="2"><v>45689.75</v></c>'
+    '<c r="C1" s="3"><v>45658</v></c></row>'
+    '<row r="2"><c r="A2" s="1"><v>59</v></c><c r="B2" s="1"><v>61</v></c><c r="C2" t="e"><v>#N/A</v></c></row>'
+    "</sheetData>"
+)
+
+
+def write_workbook(path: Path, sheets: dict[str, str], date1904: bool = False) -> Path:
+    """An .xlsx with sheets (name -> <worksheet> content), the shared strings and styles above."""
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as z:
+        entries = "".join(f'<sheet name="{n}" sheetId="{i}" r:id="rId{i}"/>' for i, n in enumerate(sheets, 1))
+        z.writestr(
+            "xl/workbook.xml",
+            f'<workbook {_NS} {_R_NS}><workbookPr date1904="{int(date1904)}"/><sheets>{entries}</sheets></workbook>',
+        )
+        rels = "".join(
+            f'<Relationship Id="rId{i}" Type="worksheet" Target="worksheets/sheet{i}.xml"/>'
+            for i in range(1, len(sheets) + 1)
+        )
+        z.writestr(
+            "xl/_rels/workbook.xml.rels",
+            f'<Relationships xmlns="{_PACKAGE_NS}">{rels}</Relationships>',
+        )
+        for i, content in enumerate(sheets.values(), 1):
+            z.writestr(f"xl/worksheets/sheet{i}.xml", f'<?xml version="1.0"?><worksheet {_NS}>{content}</worksheet>')
+        z.writestr("xl/sharedStrings.xml", f"<sst {_NS}>{''.join(SHARED_STRINGS)}</sst>")
+        z.writestr("xl/styles.xml", STYLES)
+    return path
+
+
+@pytest.fixture
+def workbook_path(tmp_path) -> Path:
+    return write_workbook(tmp_path / "buget.xlsx", {"Buget": BUDGET, "Date": DATES})
+
+
+EXPECTED_BUDGET = [
+    ["luna", "venit", "cheltuieli", ""],
+    ["ianuarie 2025", "1234,5", "2500", ""],
+    ["", "", "", ""],
+    ["", "", "-7,25", ""],
+    ["februarie 2025", "TRUE", "", ""],
+]
+
+
+def test_cells_and_rows(workbook_path):
+    with Workbook(workbook_path) as workbook:
+        assert workbook.sheets == ["Buget", "Date"]
+        assert list(workbook.rows()) == EXPECTED_BUDGET
+
+
+def test_rows_across_read_chunks(workbook_path, monkeypatch):
+    monkeypatch.setattr(xlsx, "READ_CHUNK", 7)
+    with Workbook(workbook_path) as workbook:
+        assert list(workbook.rows("Buget")) == EXPECTED_BUDGET
+
+
+def test_date_cells(workbook_path):
+    # Serial 60 is Excel's 1900-02-29: dates after it are one day later than the count says
+    with Workbook(workbook_path) as workbook:
+        assert list(workbook.rows("Date")) == [
+            ["01.01.2025", "01.02.2025", "45658"],
+            ["28.02.1900", "01.03.1900", "#N/A"],
+        ]
+
+
+def test_1904_date_system(tmp_path):
+    path = write_workbook(tmp_path / "mac.xlsx", {"Date": DATES}, date1904=True)
+    with Workbook(path) as workbook:
+        assert next(workbook.rows())[0] == "02.01.2029"
+
+
+def test_width_without_dimension(tmp_path):
+    # Without <dimension>, rows are as wide as the widest row so far
+    sheet = (
+        '<sheetData><row r="1"><c r="C1"><v>1</v></c></row><row r="2"><c r="A2"><v>2</v></c></row>'
+        '<row><c r="B3"><v>3</v></c><c r="E3"><v>4</v></c></row></sheetData>'
+    )
+    path = write_workbook(tmp_path / "sparse.xlsx", {"S": sheet})
+    with Workbook(path) as workbook:
+        assert list(workbook.rows()) == [["", "", "1"], ["2", "", ""], ["", "3", "", "", "4"]]
+
+
+def test_sheet_choice(workbook_path):
+    assert input_sheets(workbook_path) == ["Buget", "Date"]
+    assert input_sheets(workbook_path, ["Date"]) == ["Date"]
+    assert input_sheets(workbook_path.with_suffix(".csv")) == [None]
+
+    with open_input(workbook_path) as inp:
+        assert (inp.sheet, inp.name, inp.format) == ("Buget", "buget.xlsx [Buget]", FORMAT_TABLE)
+        assert list(inp.rows()) == EXPECTED_BUDGET
+    with open_input(workbook_path, "Date") as inp:
+        assert inp.name == "buget.xlsx [Date]"
+        assert next(inp.rows())[0] == "01.01.2025"
+    with pytest.raises(ValueError, match="no sheet 'Lipsa'"):
+        open_input(workbook_path, "Lipsa")
+
+
+def test_not_a_workbook(tmp_path):
+    path = tmp_path / "broken.xlsx"
+    path.write_bytes(b"not a zip")
+    with pytest.raises(ValueError, match="not an .xlsx workbook"):
+        Workbook(path)
@@ -1,29 +1,77 @@
 #!/usr/bin/env python3
 """
-Convert budget CSV/TSV (persoana, luna, category columns) to m-finance-dash backup JSON.
+Convert budget CSV/TSV (persoana, luna, category columns) to m-finance-dash backup JSON
+(v3 full backup: records + profiles). --merge-into upserts into an existing exported backup.
 
 Supports:
 - only-1.csv: comma-delimited, single header row (persoana,luna,venit,...,investitii),
   columns 2..27 map directly to categories. Empty rows skipped.
 - buget-lunar.tsv: tab-delimited, two header rows; uses COL_INDEX_TO_KEY for alignment.
+
+The input may also be an .xlsx workbook: its first sheet is read directly, without a CSV
+export (see finance_import.xlsx; convert-to-finance-import.py converts several sheets).
+
+Persons map to profile ids through --persons (a JSON config; default Paul -> me, Codru ->
+wife), and rows are grouped on (month, profile): several rows for the same month and profile,
+within a file or across files, are summed or combined by the config's duplicates policy (see
+finance_import.persons). --sorted streams input that is already in month order, one month at
+a time.
+
+The input may also be a directory or glob: files are parsed in parallel and merged by month
+and person into one backup.
+
+Single-file reruns are incremental through a sidecar cache next to the output (see
+finance_import.cache); --full re-parses everything, --no-cache skips the sidecar. With
+--no-cache a large file (16 MiB or more) is split into row-aligned byte ranges parsed in
+--workers processes (see finance_import.parallel). --memory-budget bounds the month
+aggregates: above the budget they are spilled to temp files as sorted runs and merged by
+month (see finance_import.spill).
+
+--compact, --gzip and --shard-by-year select the output layout (see finance_import.writer);
+--totals adds precomputed dashboard totals (see finance_import.totals); --validate checks the
+records against the app's schema while writing (see finance_import.validate); --columns also
+writes <output>.columns for scripts/finance-query.py (see finance_import.columnar).
+--stats / --stats-json / --profile report stage timings and counters (see finance_import.stats).
 """
 
 import argparse
-import csv
-import json
+import time
+from array import array
 from datetime import datetime, timezone
+from functools import partial
+from itertools import chain
 from pathlib import Path
+from typing import Callable, Iterable, Iterator
 
-SCHEMA_VERSION = 2
-
-# Category keys - must match lib/types.ts CategoryAmounts (order = CSV columns 2..27)
-CATEGORY_KEYS = [
-    "venit", "bonuri", "extra", "rate",
-    "apple", "intretinere", "internet", "gaz", "curent", "telefon", "netflix", "sala",
-    "educatie", "sanatate", "beauty", "haine",
-    "diverse", "transport", "cadouri", "vacante", "casa", "gadgets", "tazz", "alimente",
-    "economii", "investitii",
-]
+from finance_import.batch import expand_inputs, is_batch_input, print_timings, run_batch
+from finance_import.cache import ConversionCache, cache_key, cache_path_for, iter_chunks, records_digest
+from finance_import.cli import add_output_args, new_stats, output_exists, output_key, report_stats, write_output
+from finance_import.formats import (
+    FORMAT_SIMPLE,
+    FORMAT_TSV,
+    ParseOptions,
+    SniffedInput,
+    closing_iter,
+    is_simple_header,
+    open_input,
+    register_parser,
+)
+from finance_import.months import DEFAULT_YEAR_COUNTER, MonthParser, year_from_path
+from finance_import.parallel import map_ranges, read_rows, row_ranges, use_parallel
+from finance_import.persons import DEFAULT_PERSONS, PersonMap, group_people, load_persons
+from finance_import.records import CATEGORY_KEYS, KEY_INDEX, MonthRecord, MonthSum, cite_rows, new_amounts
+from finance_import.stats import (
+    SKIP_BAD_MONTH,
+    SKIP_EMPTY_ROW,
+    SKIP_NO_MONTH,
+    SKIP_UNKNOWN_PERSON,
+    Stats,
+    count_zero_fallbacks,
+    stage,
+    timed,
+)
+from finance_import.writer import output_target
+from finance_import.xlsx import WORKBOOK_SUFFIXES
 
 # TSV (buget-lunar.tsv) column index -> category key when not using direct CSV mapping
 COL_INDEX_TO_KEY: list[tuple[int, str]] = [
@@ -34,21 +82,6 @@ COL_INDEX_TO_KEY: list[tuple[int, str]] = [
     (19, "diverse"), (20, "transport"), (21, "alimente"), (22, "economii"), (23, "investitii"),
 ]
 
-RO_MONTHS = {
-    "ianuarie": "01", "februarie": "02", "martie": "03", "aprilie": "04", "mai": "05",
-    "iunie": "06", "iulie": "07", "august": "08", "septembrie": "09",
-    "octombrie": "10", "noiembrie": "11", "decembrie": "12",
-}
-
-
-def parse_month(luna: str, default_year: int = 2025) -> str | None:
-    if not luna or not luna.strip():
-        return None
-    s = luna.strip().lower()
-    if s in RO_MONTHS:
-        return f"{default_year}-{RO_MONTHS[s]}"
-    return None
-
 
 def parse_val(x: str) -> float:
     if not x or not str(x).strip():
@@ -62,101 +95,594 @@ def parse_val(x: str) -> float:
 
 def _is_simple_csv_header(row: list[str]) -> bool:
     """First row is persoana,luna,venit,...,investitii with 28+ columns."""
-    if len(row) < 28:
-        return False
-    a, b = (row[0] or "").strip().lower(), (row[1] or "").strip().lower()
-    return a == "persoana" and b == "luna"
+    return is_simple_header(row)
 
 
-def _row_to_amounts_direct(row: list[str]) -> dict[str, float]:
+def _row_to_amounts_direct(row: list[str]) -> array:
     """Columns 2..27 map to CATEGORY_KEYS in order (only-1.csv format)."""
-    amounts = {k: 0.0 for k in CATEGORY_KEYS}
-    for i, key in enumerate(CATEGORY_KEYS):
-        idx = 2 + i
-        if idx < len(row):
-            amounts[key] = parse_val(row[idx])
+    amounts = new_amounts()
+    for i in range(min(len(CATEGORY_KEYS), len(row) - 2)):
+        amounts[i] = parse_val(row[2 + i])
     return amounts
 
 
-def _row_to_amounts_tsv(row: list[str]) -> dict[str, float]:
+def _row_to_amounts_tsv(row: list[str]) -> array:
     """Use COL_INDEX_TO_KEY for buget-lunar.tsv alignment."""
-    amounts = {k: 0.0 for k in CATEGORY_KEYS}
+    amounts = new_amounts()
     for col_idx, key in COL_INDEX_TO_KEY:
         if col_idx < len(row):
-            amounts[key] = parse_val(row[col_idx])
+            amounts[KEY_INDEX[key]] = parse_val(row[col_idx])
     return amounts
 
 
+RowToAmounts = Callable[[list[str]], array]
+
+# Amount columns each row -> amounts function reads (for counting cells that fell back to 0.0)
+AMOUNT_COLUMNS: dict[RowToAmounts, list[int]] = {
+    _row_to_amounts_direct: list(range(2, 2 + len(CATEGORY_KEYS))),
+    _row_to_amounts_tsv: [col_idx for col_idx, _ in COL_INDEX_TO_KEY],
+}
+
+
+def default_year_for(input_path: Path) -> int:
+    """Year for bare month names: the year in the file name (buget-2025.tsv), else the current year."""
+    return year_from_path(input_path) or datetime.now(timezone.utc).year
+
+
+def _read_header(rows: Iterator[list[str]], input_path: Path, fmt: str) -> tuple[list[list[str]], RowToAmounts]:
+    """
+    Consume the header row(s) from rows; returns them and the row -> amounts function.
+    fmt is the sniffed format: simple CSV (one header, columns 2..27 = categories); anything
+    else is read as the two-header-row TSV layout.
+    """
+    first = next(rows, None)
+    if first is None:
+        raise ValueError(f"File is empty: {input_path}")
+    if fmt == FORMAT_SIMPLE:
+        return [first], _row_to_amounts_direct
+    second = next(rows, None)
+    return [first] + ([second] if second is not None else []), _row_to_amounts_tsv
+
+
+class PersonRows:
+    """
+    The kept data rows as (month, profile_id, amounts). A row without luna belongs to the month
+    of the rows above it; month is the month in effect (initially the one earlier rows ended
+    in, then updated as rows are read). With stats, counts rows, skipped rows by reason and
+    amount cells that fell back to 0.0. With first_rows, the row number of each month's first
+    kept row is recorded in it (month -> row number, the first data row being start_row).
+    """
+
+    def __init__(
+        self,
+        data_rows: Iterable[list[str]],
+        row_to_amounts: RowToAmounts,
+        parse_month: Callable[[str], str | None],
+        month: str | None = None,
+        stats: Stats | None = None,
+        persons: PersonMap = DEFAULT_PERSONS,
+        first_rows: dict[str, int] | None = None,
+        start_row: int = 0,
+    ) -> None:
+        self.data_rows = data_rows
+        self.row_to_amounts = row_to_amounts
+        self.parse_month = parse_month
+        self.month = month
+        self.stats = stats
+        self.persons = persons
+        self.first_rows = first_rows
+        self.start_row = start_row
+
+    def __iter__(self) -> Iterator[tuple[str, str, array]]:
+        stats = self.stats
+        first_rows = self.first_rows
+        amount_columns = AMOUNT_COLUMNS.get(self.row_to_amounts, []) if stats is not None else []
+        for row_number, row in enumerate(self.data_rows, self.start_row):
+            if stats is not None:
+                stats.count("rows")
+            if not row:
+                if stats is not None:
+                    stats.skip(SKIP_EMPTY_ROW)
+                continue
+            persoana = (row[0] or "").strip()
+            luna = (row[1] or "").strip() if len(row) > 1 else ""
+            # Skip empty rows (e.g. only-1.csv row 2)
+            if not persoana and not luna and len(row) <= 2:
+                if stats is not None:
+                    stats.skip(SKIP_EMPTY_ROW)
+                continue
+            profile_id = self.persons.get(persoana)
+            if profile_id is None:
+                if stats is not None:
+                    stats.skip(SKIP_UNKNOWN_PERSON)
+                continue
+            if luna:
+                month = self.parse_month(luna)
+                if month:
+                    self.month = month
+                elif stats is not None:
+                    # The row still counts for the month above it, if there is one
+                    stats.count("badMonthCells")
+            if not self.month:
+                if stats is not None:
+                    stats.skip(SKIP_BAD_MONTH if luna else SKIP_NO_MONTH)
+                continue
+
+            if first_rows is not None:
+                first_rows.setdefault(self.month, row_number)
+            yield self.month, profile_id, self.row_to_amounts(row)
+            if stats is not None:
+                cells = [row[i] if i < len(row) else "" for i in amount_columns]
+                stats.count("zeroFallbackCells", count_zero_fallbacks(cells, (parse_val(c) for c in cells)))
+
+
+def convert_rows(
+    data_rows: Iterable[list[str]],
+    row_to_amounts: RowToAmounts,
+    parse_month: Callable[[str], str | None],
+    current_month_str: str | None = None,
+    stats: Stats | None = None,
+    persons: PersonMap = DEFAULT_PERSONS,
+    first_rows: dict[str, int] | None = None,
+    start_row: int = 0,
+    exact: bool = False,
+) -> tuple[dict[str, dict[str, array | MonthSum]], str | None]:
+    """
+    Group data rows into month -> {profile_id: amounts} (see PersonRows, also for first_rows
+    and start_row); current_month_str is the month in effect when data_rows continue earlier
+    rows. Rows for a profile the month already has are combined by persons' duplicates policy
+    (with exact, for rows that are one piece of a file, sums are exact and stay MonthSum).
+    Returns the months, in first-seen order, and the month in effect after the last row.
+    """
+    people_by_month: dict[str, dict[str, array | MonthSum]] = {}
+    rows = PersonRows(data_rows, row_to_amounts, parse_month, current_month_str, stats, persons, first_rows, start_row)
+    add = persons.add
+    current: str | None = None
+    people: dict[str, array | MonthSum] = {}
+    for month, profile_id, amounts in rows:
+        if month != current:
+            people = people_by_month.get(month)
+            if people is None:
+                people = people_by_month[month] = {}
+            current = month
+        if profile_id in people:
+            add(people, profile_id, amounts, stats, month, exact)
+        else:
+            people[profile_id] = amounts
+    return people_by_month, rows.month
+
+
+def _opens_month(row: list[str], parse_month: Callable[[str], str | None], persons: PersonMap) -> bool:
+    """True when convert_rows would take this row's month without looking at the rows above."""
+    if len(row) < 2 or persons.get((row[0] or "").strip()) is None:
+        return False
+    luna = (row[1] or "").strip()
+    return bool(luna) and parse_month(luna) is not None
+
+
+def _parse_people_range(
+    path: Path,
+    start: int,
+    end: int,
+    delimiter: str,
+    row_to_amounts: RowToAmounts,
+    year: int,
+    persons: PersonMap,
+    want_rows: bool = False,
+) -> tuple[
+    list[list[str]], dict[str, dict[str, array | MonthSum]], str | None, dict[str, int], dict[str, int], dict[str, int]
+]:
+    """
+    Worker: convert_rows over the rows in bytes [start, end) of path. Rows before the first row
+    that names its own month depend on the range before this one, so they are returned
+    unparsed. Returns (those rows, months, month after the last row, counters, skips, and with
+    want_rows each month's first row numbered from 0 at the range's first row).
+    """
+    stats = Stats()
+    parse_month = MonthParser(year, stats=stats)
+    rows = read_rows(path, start, end, delimiter)
+    leading: list[list[str]] = []
+    for row in rows:
+        if _opens_month(row, parse_month, persons):
+            rows = chain([row], rows)
+            break
+        leading.append(row)
+    first_rows: dict[str, int] | None = {} if want_rows else None
+    people_by_month, end_state = convert_rows(
+        rows,
+        row_to_amounts,
+        parse_month,
+        stats=stats,
+        persons=persons,
+        first_rows=first_rows,
+        start_row=len(leading),
+        exact=True,
+    )
+    return leading, people_by_month, end_state, stats.counters, stats.skipped, first_rows or {}
+
+
+def _parallel_people(
+    inp: SniffedInput,
+    header_rows: int,
+    row_to_amounts: RowToAmounts,
+    year: int,
+    stats: Stats | None,
+    workers: int | None,
+    persons: PersonMap,
+    first_rows: dict[str, int] | None = None,
+) -> Iterator[tuple[str, dict[str, array | MonthSum]]]:
+    """
+    convert_rows for one large file: byte ranges are parsed in worker processes and their
+    (month, people) are yielded in file order; each range's leading rows are parsed here with
+    the month the previous range ended in, so grouping the result gives the same months as a
+    sequential pass (and the same first_rows, see PersonRows).
+    """
+    _, ranges = row_ranges(inp.path, header_rows)
+    parse = partial(
+        _parse_people_range,
+        delimiter=inp.delimiter,
+        row_to_amounts=row_to_amounts,
+        year=year,
+        persons=persons,
+        want_rows=first_rows is not None,
+    )
+    parse_month = MonthParser(year, stats=stats)
+    state: str | None = None
+    row_offset = header_rows + 1
+    for leading, months, end_state, counters, skipped, part_rows in map_ranges(parse, inp.path, ranges, workers):
+        if leading:
+            lead_months, state = convert_rows(
+                leading, row_to_amounts, parse_month, state, stats, persons, first_rows, row_offset, exact=True
+            )
+            yield from lead_months.items()
+        if first_rows is not None:
+            for month, n in part_rows.items():
+                first_rows.setdefault(month, row_offset + n)
+        yield from months.items()
+        if stats is not None:
+            stats.add_counts(counters, skipped)
+        state = end_state or state
+        row_offset += len(leading) + counters.get("rows", 0)
+
+
+def _parse_people(
+    inp: SniffedInput,
+    rows: Iterator[list[str]],
+    header_rows: int,
+    row_to_amounts: RowToAmounts,
+    year: int,
+    stats: Stats | None,
+    workers: int | None,
+    memory_budget: int | None = None,
+    persons: PersonMap = DEFAULT_PERSONS,
+    sorted_input: bool = False,
+    sources: bool = False,
+) -> Iterable[MonthRecord]:
+    """
+    Month records for the data rows, sorted by month, grouped on (month, profile) by
+    group_people; large files are split across workers (whose partial sums are combined
+    exactly). With sources, each record cites its month's first row (MonthRecord.source).
+    With sorted_input (rows in month order), each month is produced as soon as the next one
+    starts. With memory_budget (bytes), months beyond the budget are spilled to temp files as
+    sorted runs and merged (see finance_import.spill). In both cases the records are produced
+    lazily and read inp as they go; otherwise they are a list.
+    """
+    first_rows: dict[str, int] | None = {} if sources else None
+    parse_month = MonthParser(year, stats=stats)
+    months: Iterable[tuple[str, dict[str, array | MonthSum]]]
+    if use_parallel(inp.path, workers):
+        items = _parallel_people(inp, header_rows, row_to_amounts, year, stats, workers, persons, first_rows)
+        months = group_people(items, persons, sorted_input, memory_budget, stats, exact=True)
+    elif sorted_input or memory_budget:
+        person_rows = PersonRows(rows, row_to_amounts, parse_month, None, stats, persons, first_rows, header_rows + 1)
+        items = ((month, {profile_id: amounts}) for month, profile_id, amounts in person_rows)
+        months = group_people(items, persons, sorted_input, memory_budget, stats)
+    else:
+        # All months are held anyway: group the rows as they are read (plain sums, nothing to
+        # settle) and only put the months in order
+        people_by_month, _ = convert_rows(
+            rows, row_to_amounts, parse_month, None, stats, persons, first_rows, header_rows + 1
+        )
+        months = sorted(people_by_month.items())
+    records = cite_rows((MonthRecord(month, people) for month, people in months), inp.name, first_rows)
+    if sorted_input or memory_budget:
+        return records
+    with stage(stats, "parsing"):
+        return list(records)
+
+
+def convert_file(
+    input_path: Path,
+    default_year: int | None = None,
+    stats: Stats | None = None,
+    workers: int | None = 1,
+    memory_budget: int | None = None,
+    persons: PersonMap = DEFAULT_PERSONS,
+    sorted_input: bool = False,
+    sources: bool = False,
+) -> Iterable[MonthRecord]:
+    """
+    Parse one CSV/TSV to month records, sorted by month (a list, or an iterator that reads the
+    file as it goes with memory_budget or sorted_input). Only profiles that have a row for a
+    month appear in that month's record. Bare month names ("ianuarie") use default_year, or
+    default_year_for(input_path) when None. A large file is split into byte ranges parsed by up
+    to workers processes (see finance_import.parallel). With sources, each record cites its
+    month's first row (MonthRecord.source).
+    """
+    with stage(stats, "format detection"):
+        inp = open_input(input_path)
+    try:
+        rows = iter(timed(stats, inp.rows(), "read"))
+        header, row_to_amounts = _read_header(rows, input_path, inp.format)
+        year = default_year or default_year_for(input_path)
+        records = _parse_people(
+            inp, rows, len(header), row_to_amounts, year, stats, workers, memory_budget, persons, sorted_input, sources
+        )
+    except BaseException:
+        inp.close()
+        raise
+    if isinstance(records, list):
+        inp.close()
+    else:
+        records = closing_iter(records, inp)
+    return timed(stats, records, "aggregation")
+
+
+def convert_cached(
+    input_path: Path,
+    cache_file: Path,
+    default_year: int | None = None,
+    full: bool = False,
+    stats: Stats | None = None,
+    persons: PersonMap = DEFAULT_PERSONS,
+) -> tuple[list[MonthRecord], ConversionCache]:
+    """
+    Like convert_file, but reuse the sidecar cache so only changed or appended row ranges are
+    parsed. full ignores the existing cache. The caller saves the cache after writing.
+    Stats only count the rows parsed in this run, except DEFAULT_YEAR_COUNTER, which the
+    cache remembers for the ranges it reuses.
+    """
+    year = default_year or default_year_for(input_path)
+    with stage(stats, "format detection"):
+        inp = open_input(input_path)
+    with inp:
+        rows = iter(timed(stats, inp.rows(), "read"))
+        header, row_to_amounts = _read_header(rows, input_path, inp.format)
+        key = cache_key("tsv-to-finance-json", header, year, persons.fingerprint())
+        cache = ConversionCache(cache_file, key, enabled=not full)
+        month_stats = Stats()
+        parse_month = MonthParser(year, stats=month_stats)
+
+        def parse_chunk(chunk: list[list[str]], state: str | None, offset: int):
+            with stage(stats, "parsing"):
+                # Rows are always tracked here, so reused ranges can be cited by a later --validate run
+                first_rows: dict[str, int] = {}
+                people_by_month, end_state = convert_rows(
+                    chunk,
+                    row_to_amounts,
+                    parse_month,
+                    state,
+                    stats,
+                    persons,
+                    first_rows,
+                    len(header) + offset + 1,
+                    exact=True,
+                )
+                records = [MonthRecord(m, p, (inp.name, first_rows[m])) for m, p in people_by_month.items()]
+                return records, end_state
+
+        first_rows: dict[str, int] = {}
+
+        def items() -> Iterator[tuple[str, dict[str, array | MonthSum]]]:
+            # Chunks in file order, so the duplicates policy sees rows across chunks in file order
+            for part in cache.convert(iter_chunks(rows), parse_chunk):
+                for r in part:
+                    if r.source is not None:
+                        first_rows.setdefault(r.month, r.source[1])
+                    yield r.month, r.people
+
+        with stage(stats, "aggregation"):
+            months = group_people(items(), persons, stats=stats, exact=True)
+            records = list(cite_rows((MonthRecord(month, people) for month, people in months), inp.name, first_rows))
+    defaulted = month_stats.counters.get(DEFAULT_YEAR_COUNTER, 0)
+    if not defaulted and cache.reused:
+        defaulted = cache.info.get(DEFAULT_YEAR_COUNTER, 0)
+    cache.info[DEFAULT_YEAR_COUNTER] = defaulted
+    if stats is not None:
+        stats.count(DEFAULT_YEAR_COUNTER, defaulted)
+    return records, cache
+
+
+def convert_batch_file(
+    input_path: Path, default_year: int | None = None, persons: PersonMap = DEFAULT_PERSONS, sources: bool = False
+) -> tuple[list[MonthRecord], dict[str, int], dict[str, int]]:
+    """Batch worker: convert_file's records, with the file's counters and skips (workers have their own Stats)."""
+    stats = Stats()
+    records = list(convert_file(input_path, default_year, stats, persons=persons, sources=sources))
+    return records, stats.counters, stats.skipped
+
+
+def _fill_people(record: MonthRecord, profile_ids: Iterable[str] = DEFAULT_PERSONS.profile_ids) -> MonthRecord:
+    """Every record has every profile; a missing one gets zeros (one shared zero vector)."""
+    zeros = new_amounts()
+    record.people = {p: record.people.get(p, zeros) for p in profile_ids}
+    return record
+
+
+def parse_people(rows: Iterator[list[str]], options: ParseOptions) -> Iterable[MonthRecord]:
+    """Registered parser for the simple CSV and two-header TSV formats."""
+    stats = options.stats
+    persons = options.persons or DEFAULT_PERSONS
+    fill = partial(_fill_people, profile_ids=persons.profile_ids)
+    fmt = FORMAT_SIMPLE if is_simple_header(next(rows, None) or []) else FORMAT_TSV
+    row_to_amounts = _row_to_amounts_direct if fmt == FORMAT_SIMPLE else _row_to_amounts_tsv
+    header_rows = 1
+    if fmt == FORMAT_TSV and next(rows, None) is not None:  # second header row
+        header_rows = 2
+    year = options.default_year or datetime.now(timezone.utc).year
+    if options.source is not None:
+        records = _parse_people(
+            options.source,
+            rows,
+            header_rows,
+            row_to_amounts,
+            year,
+            stats,
+            options.workers,
+            options.memory_budget,
+            persons,
+            options.sorted_input,
+            options.sources,
+        )
+        return timed(stats, map(fill, records), "aggregation")
+    with stage(stats, "parsing"):
+        people_by_month, _ = convert_rows(
+            rows, row_to_amounts, MonthParser(year, stats=stats), stats=stats, persons=persons
+        )
+    with stage(stats, "aggregation"):
+        months = group_people(people_by_month.items(), persons, stats=stats)
+        return [fill(MonthRecord(month, people)) for month, people in months]
+
+
+register_parser(FORMAT_SIMPLE, parse_people)
+register_parser(FORMAT_TSV, parse_people)
+
+
 def main() -> None:
     root = Path(__file__).resolve().parent.parent
     parser = argparse.ArgumentParser(description="Convert budget CSV/TSV to finance-import.json")
-    parser.add_argument("input", nargs="?", default=str(root / "data" / "only-1.csv"), help="Input CSV or TSV path")
+    parser.add_argument(
+        "input",
+        nargs="?",
+        default=str(root / "data" / "only-1.csv"),
+        help="Input CSV or TSV path, directory or glob",
+    )
     parser.add_argument("-o", "--output", default=str(root / "data" / "finance-import.json"), help="Output JSON path")
+    parser.add_argument(
+        "--year",
+        type=int,
+        default=None,
+        help="Year for month names without a year (default: year in the file name, else the current year)",
+    )
+    parser.add_argument(
+        "--full", action="store_true", help="Ignore the sidecar cache and re-parse every row (the cache is rebuilt)"
+    )
+    parser.add_argument("--no-cache", action="store_true", help="Do not read or write the sidecar cache")
+    parser.add_argument(
+        "--persons",
+        metavar="PATH",
+        help="JSON map of persoana values to profile ids and the duplicate-row policy (default: Paul -> me, "
+        "Codru -> wife, duplicates summed; see finance_import.persons)",
+    )
+    parser.add_argument(
+        "--sorted",
+        action="store_true",
+        help="Input rows are in month order: write each month as soon as the next one starts (single file; "
+        "implies --no-cache)",
+    )
+    add_output_args(
+        parser,
+        workers_help="Worker processes for directory/glob input, or for one large file with --no-cache "
+        "(default: one per CPU)",
+        memory_budget_help="Bound the month aggregates to SIZE (e.g. 64M): sorted runs are spilled to temp files "
+        "and merged (single file; implies --no-cache)",
+    )
     args = parser.parse_args()
 
-    input_path = Path(args.input)
     out_path = Path(args.output)
-    if not input_path.exists():
-        raise SystemExit(f"Input file not found: {input_path}")
-
-    delimiter = "," if input_path.suffix.lower() == ".csv" else "\t"
-    rows = list(csv.reader(input_path.open(encoding="utf-8-sig"), delimiter=delimiter))
-    if not rows:
-        raise SystemExit("File is empty")
-
-    # Detect format: simple CSV (one header, columns 2..27 = categories) vs TSV (two header rows)
-    use_direct = delimiter == "," and _is_simple_csv_header(rows[0])
-    if use_direct:
-        data_rows = rows[1:]  # skip single header
-        row_to_amounts = _row_to_amounts_direct
+    target = output_target(out_path, args.gzip, args.shard_by_year)
+    if is_batch_input(args.input):
+        paths = expand_inputs(args.input, (".csv", ".tsv", *WORKBOOK_SUFFIXES))
+        if not paths:
+            raise SystemExit(f"No CSV/TSV files match: {args.input}")
     else:
-        data_rows = rows[2:] if len(rows) >= 3 else []  # skip two header rows
-        row_to_amounts = _row_to_amounts_tsv
+        paths = [Path(args.input)]
+        if not paths[0].exists():
+            raise SystemExit(f"Input file not found: {paths[0]}")
 
-    now_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
-    records_by_month: dict[str, dict] = {}
-    current_month_str: str | None = None
-    default_year = 2025
-
-    for row in data_rows:
-        if not row:
-            continue
-        persoana = (row[0] or "").strip()
-        luna = (row[1] or "").strip() if len(row) > 1 else ""
-        # Skip empty rows (e.g. only-1.csv row 2)
-        if not persoana and not luna and len(row) <= 2:
-            continue
-        if persoana not in ("Paul", "Codru"):
-            continue
-        if luna:
-            month = parse_month(luna, default_year)
-            if month:
-                current_month_str = month
-        if not current_month_str:
-            continue
-
-        amounts = row_to_amounts(row)
-
-        if current_month_str not in records_by_month:
-            records_by_month[current_month_str] = {
-                "month": current_month_str,
-                "people": {
-                    "me": {k: 0.0 for k in CATEGORY_KEYS},
-                    "wife": {k: 0.0 for k in CATEGORY_KEYS},
-                },
-                "meta": {"updatedAt": now_iso, "isSaved": False},
-            }
-        rec = records_by_month[current_month_str]
-        if persoana == "Paul":
-            rec["people"]["me"] = amounts
+    try:
+        persons = load_persons(Path(args.persons)) if args.persons else DEFAULT_PERSONS
+    except (OSError, ValueError) as e:
+        raise SystemExit(str(e))
+
+    stats = new_stats(args, "tsv-to-finance-json", target)
+
+    def print_year_notices(defaulted: list[Path]) -> None:
+        """Bare month names (no year) took the year from the file name or the clock: say so."""
+        for path in defaulted if args.year is None else []:
+            if year_from_path(path) is None:
+                print(f"No year in file name {path.name}; using {default_year_for(path)} (pass --year to override)")
+
+    cache = None
+    # Inputs whose bare month names took the default year (batch input: known per file)
+    defaulted: list[Path] = []
+    start = time.perf_counter()
+    try:
+        single = len(paths) == 1 and not is_batch_input(args.input)
+        if single and not (args.no_cache or args.memory_budget or args.sorted):
+            merged, cache = convert_cached(paths[0], cache_path_for(out_path), args.year, args.full, stats, persons)
+        elif len(paths) == 1:
+            merged = convert_file(
+                paths[0], args.year, stats, args.workers, args.memory_budget, persons, args.sorted, args.validate
+            )
         else:
-            rec["people"]["wife"] = amounts
+            with stats.stage("parsing"):
+                file_results = run_batch(
+                    paths,
+                    partial(convert_batch_file, default_year=args.year, persons=persons, sources=args.validate),
+                    args.workers,
+                )
+            results = []
+            for path, (file_records, counters, skipped), seconds in file_results:
+                stats.add_counts(counters, skipped)
+                if counters.get(DEFAULT_YEAR_COUNTER):
+                    defaulted.append(path)
+                results.append((path, file_records, seconds))
+            with stats.stage("aggregation"):
+                # Files in input order: a person's rows in several files are duplicates too
+                # Each month cites the first file's row for it (later assignments win, hence reversed)
+                sources = {r.month: r.source for _, records, _ in reversed(results) for r in reversed(records)}
+                items = ((r.month, r.people) for _, records, _ in results for r in records)
+                merged = [
+                    MonthRecord(month, people, sources[month])
+                    for month, people in group_people(items, persons, stats=stats)
+                ]
+    except ValueError as e:
+        raise SystemExit(str(e))
+    if cache is not None:
+        print(f"Parsed {cache.parsed} row range(s), reused {cache.reused} from {cache.path.name}")
+        stats.info.update(rangesParsed=cache.parsed, rangesReused=cache.reused)
+    elif len(paths) > 1:
+        print_timings(results, time.perf_counter() - start)
+
+    # Without the cache, records stream into the writer (lazily grouped with --sorted / --memory-budget)
+    fill = partial(_fill_people, profile_ids=persons.profile_ids)
+    records: Iterable[MonthRecord] = timed(stats, map(fill, merged), "aggregation")
+    if cache is not None:
+        records = list(records)
+        digest = output_key(args, records_digest(records))
+        # A merge target can change between runs, so merged output is always rewritten
+        if not args.merge_into and digest == cache.output_digest and output_exists(args, target):
+            cache.save(digest)
+            print_year_notices(paths if stats.counters.get(DEFAULT_YEAR_COUNTER) else [])
+            print(f"Output unchanged: {target}")
+            report_stats(args, stats)
+            return
 
-    records = sorted(records_by_month.values(), key=lambda r: r["month"])
-    schema = {"version": SCHEMA_VERSION, "data": records}
-    out_path.parent.mkdir(parents=True, exist_ok=True)
-    out_path.write_text(json.dumps(schema, ensure_ascii=False, indent=2), encoding="utf-8")
-    print(f"Wrote {len(records)} month(s) to {out_path}")
+    now_iso = datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%S.000Z")
+    try:
+        count = write_output(args, records, now_iso, stats, persons.profiles())
+    except ValueError as e:
+        # A bad merge target, a schema violation (--validate), or sorted/duplicate-row errors of streamed input
+        raise SystemExit(str(e))
+    if cache is not None:
+        cache.save(digest)
+    # A single input's records may stream into the writer: its months are all parsed only now
+    if len(paths) == 1 and stats.counters.get(DEFAULT_YEAR_COUNTER):
+        defaulted = paths
+    print_year_notices(defaulted)
+    print(f"Wrote {count} month(s) to {target}")
+    report_stats(args, stats)
 
 
 if __name__ == "__main__":
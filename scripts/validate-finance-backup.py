@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Check a backup file against the app's schema before importing it.
+
+Usage:
+  python scripts/validate-finance-backup.py data/finance-import.json
+  python scripts/validate-finance-backup.py backup.json.gz --max-errors 100
+
+Every record is checked as the app's MonthRecordSchema would (see finance_import.validate);
+the first violations are printed with the record's position in the backup's data array.
+Exits with status 1 when there are violations.
+"""
+
+import argparse
+import gzip
+import json
+import time
+from pathlib import Path
+
+from finance_import.validate import DEFAULT_MAX_VIOLATIONS, validate_backup
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Validate a backup JSON against the app's schema.")
+    parser.add_argument("backup", help="Backup JSON (.gz is decompressed)")
+    parser.add_argument(
+        "--max-errors",
+        type=int,
+        default=DEFAULT_MAX_VIOLATIONS,
+        help=f"Violations to print (default: {DEFAULT_MAX_VIOLATIONS})",
+    )
+    args = parser.parse_args()
+
+    path = Path(args.backup)
+    opener = gzip.open if path.suffix == ".gz" else open
+    try:
+        with opener(path, "rt", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"Error: {path} is not readable JSON: {e}")
+        raise SystemExit(1)
+
+    start = time.perf_counter()
+    validator = validate_backup(data, args.max_errors)
+    seconds = time.perf_counter() - start
+    if validator.ok:
+        print(f"{path}: {validator.records} record(s) valid ({seconds:.3f}s)")
+        return
+    print(f"{path}: {validator.count} violation(s) in {validator.records} record(s) ({seconds:.3f}s)")
+    for violation in validator.violations:
+        print(f"  {violation}")
+    if validator.count > len(validator.violations):
+        print(f"  ... and {validator.count - len(validator.violations)} more")
+    raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()